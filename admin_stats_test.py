@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Admin Stats Testing
+GET /admin/stats reads a materialized snapshot instead of aggregating the
+donation, purchase and user tables, so its latency should not grow with
+history. The suite adds donations to a probe project in stages, times
+/admin/stats at every stage and fails when latency grows with the table.
+
+It also checks that the snapshot moved by exactly the donations made, that
+today's bucket in GET /admin/stats/series did too, that the monthly series
+agrees with the daily one, and that POST /admin/stats/reconcile (a rebuild
+from the source tables) finds no drift.
+
+The probe project and its donations are deleted afterwards
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, datetime, timezone
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+from tests.load import percentile
+
+TAG = "admin-stats-probe"
+AMOUNT = 100
+
+def fetch_stats():
+    response = client.get(f"{BASE_URL}/admin/stats")
+    return response.json() if response.status_code == 200 else None
+
+def fetch_series(**params):
+    response = client.get(f"{BASE_URL}/admin/stats/series", params=params)
+    return response.json()['series'] if response.status_code == 200 else None
+
+def time_stats(repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        client.get(f"{BASE_URL}/admin/stats")
+        latencies.append(time.perf_counter() - start)
+    return percentile(sorted(latencies), 50)
+
+def add_donations(project_id, count, workers):
+    """Post `count` donations; returns how many were accepted"""
+    call = load.Call("POST /donations", "POST", "/donations", build=lambda: {'json': {
+        "projectId": project_id, "amount": AMOUNT, "donorName": TAG
+    }})
+    report = load.run_load([call], BASE_URL, workers=workers, total_requests=count)
+    return report.total().summary(report.elapsed)['status'].get(200, 0)
+
+def today_bucket():
+    today = datetime.now(timezone.utc).date().isoformat()
+    series = fetch_series(interval='day', **{'from': today, 'to': today})
+    return series[0] if series else None
+
+def check_series():
+    """Monthly buckets must equal the sum of their daily buckets"""
+    today = datetime.now(timezone.utc).date()
+    month_start = date(today.year, today.month, 1)
+    days = fetch_series(interval='day', **{'from': month_start.isoformat(), 'to': today.isoformat()})
+    months = fetch_series(interval='month', **{'from': month_start.isoformat(), 'to': today.isoformat()})
+    if days is None or months is None or len(months) != 1:
+        return "❌ /admin/stats/series did not return the current month"
+    for field in ('donationTotal', 'donationCount', 'purchaseTotal', 'purchaseCount', 'newUsers'):
+        daily = sum(bucket[field] for bucket in days)
+        if abs(daily - months[0][field]) > 0.005:
+            return f"❌ {months[0]['period']} {field}: monthly {months[0][field]} vs daily sum {daily}"
+    return f"✅ {months[0]['period']} monthly totals match the sum of {len(days)} daily buckets"
+
+def run_stats_suite(stages, repeats=20, max_growth=1.5, slack_ms=5.0, workers=16):
+    """Grow donations stage by stage and return the number of failed checks"""
+    print("ADMIN STATS TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{repeats} timed requests per stage")
+    print("="*80)
+
+    response = client.post(f"{BASE_URL}/projects", json={
+        "title": f"{TAG} project", "description": "Donations for admin stats timing", "goalAmount": 1000000000
+    })
+    if response.status_code != 200:
+        print("❌ Could not create the probe project")
+        return 1
+    project_id = response.json()['id']
+
+    failures = 0
+    try:
+        before, bucket_before = fetch_stats(), today_bucket()
+        if before is None or bucket_before is None:
+            print("❌ /admin/stats or /admin/stats/series is unavailable")
+            return 1
+
+        timings, accepted = [], 0
+        print(f"\n{'donations added':>16}{'p50 ms':>10}")
+        for rows in stages:
+            if rows > accepted:
+                accepted += add_donations(project_id, rows - accepted, workers)
+            timings.append(time_stats(repeats))
+            print(f"{accepted:>16}{timings[-1] * 1000:>10.2f}")
+
+        print("\nChecks:")
+        budget = timings[0] * max_growth + slack_ms / 1000
+        ok = timings[-1] <= budget
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} /admin/stats p50 {timings[0] * 1000:.2f}ms -> {timings[-1] * 1000:.2f}ms "
+              f"(budget {budget * 1000:.2f}ms)")
+
+        after, bucket_after = fetch_stats(), today_bucket()
+        grew = after['donations']['total'] - before['donations']['total']
+        counted = after['donations']['count'] - before['donations']['count']
+        ok = abs(grew - accepted * AMOUNT) < 0.005 and counted == accepted
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Snapshot grew by {counted} donations / {grew:,.0f} "
+              f"for {accepted} accepted ({accepted * AMOUNT:,.0f})")
+
+        day_grew = bucket_after['donationCount'] - bucket_before['donationCount']
+        ok = day_grew == accepted
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Today's bucket grew by {day_grew} donations")
+
+        line = check_series()
+        failures += line.startswith("❌")
+        print(line)
+
+        response = client.post(f"{BASE_URL}/admin/stats/reconcile")
+        if response.status_code == 200:
+            rebuilt = response.json()
+            ok = (abs(rebuilt['donationTotal'] - after['donations']['total']) < 0.005
+                  and rebuilt['donationCount'] == after['donations']['count'])
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} Reconcile from the source tables: {rebuilt['donationCount']} donations, "
+                  f"{'no drift' if ok else 'snapshot had drifted'}")
+        else:
+            failures += 1
+            print(f"❌ POST /admin/stats/reconcile returned {response.status_code}")
+    finally:
+        client.delete(f"{BASE_URL}/projects/{project_id}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialized admin stats latency and consistency")
+    parser.add_argument('--stages', default="0,1000,5000", help="cumulative probe donations per stage")
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--max-growth', type=float, default=1.5, help="allowed latency ratio last/first stage")
+    parser.add_argument('--slack-ms', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+    require_app()
+
+    stages = [int(s) for s in args.stages.split(',')]
+    failures = run_stats_suite(stages, args.repeats, args.max_growth, args.slack_ms, args.workers)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,9 @@
 import NextAuth from 'next-auth'
 import GoogleProvider from 'next-auth/providers/google'
 import CredentialsProvider from 'next-auth/providers/credentials'
-import { PrismaClient } from '@prisma/client'
-import bcrypt from 'bcryptjs'
-
-const prisma = new PrismaClient()
+import { prisma } from '@/lib/prisma'
+import { verifyPassword } from '@/lib/passwords'
+import { recordStats, roleDelta } from '@/lib/stats'
 
 export const authOptions = {
   providers: [
@@ -31,7 +30,7 @@ export const authOptions = {
           throw new Error('Invalid credentials')
         }
 
-        const isValid = await bcrypt.compare(credentials.password, user.password)
+        const isValid = await verifyPassword(credentials.password, user.password)
 
         if (!isValid) {
           throw new Error('Invalid credentials')
@@ -56,14 +55,17 @@ export const authOptions = {
           })
 
           if (!existingUser) {
-            await prisma.user.create({
-              data: {
-                email: user.email,
-                name: user.name,
-                image: user.image,
-                emailVerified: new Date(),
-                role: 'USER'
-              }
+            await prisma.$transaction(async (tx) => {
+              await tx.user.create({
+                data: {
+                  email: user.email,
+                  name: user.name,
+                  image: user.image,
+                  emailVerified: new Date(),
+                  role: 'USER'
+                }
+              })
+              await recordStats(tx, { ...roleDelta('USER'), newUsers: 1 })
             })
           }
         } catch (error) {
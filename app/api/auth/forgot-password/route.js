@@ -1,9 +1,8 @@
-import { PrismaClient } from '@prisma/client'
+import { prisma } from '@/lib/prisma'
 import { NextResponse } from 'next/server'
 import { v4 as uuidv4 } from 'uuid'
 import crypto from 'crypto'
-
-const prisma = new PrismaClient()
+import { enqueueEmail, mailQueue, passwordResetEmail } from '@/lib/mail'
 
 export async function POST(request) {
   try {
@@ -26,47 +25,43 @@ export async function POST(request) {
       })
     }
 
-    // Delete any existing tokens for this email
-    await prisma.passwordResetToken.deleteMany({
-      where: { email: email.toLowerCase() }
-    })
-
     // Generate secure token
     const token = crypto.randomBytes(32).toString('hex')
-    
-    // Create new reset token (expires in 1 hour)
-    await prisma.passwordResetToken.create({
-      data: {
-        id: uuidv4(),
-        email: email.toLowerCase(),
-        token,
-        expiresAt: new Date(Date.now() + 60 * 60 * 1000) // 1 hour
-      }
-    })
-
-    // In production, you would send an email here
-    // For now, we'll log the reset link (MOCKED)
     const resetUrl = `${process.env.NEXT_PUBLIC_BASE_URL}/reset-password?token=${token}`
-    
-    console.log('===========================================')
-    console.log('PASSWORD RESET REQUEST (MOCKED EMAIL)')
-    console.log('===========================================')
-    console.log(`To: ${email}`)
-    console.log(`Reset URL: ${resetUrl}`)
-    console.log('===========================================')
+    const expiresAt = new Date(Date.now() + 60 * 60 * 1000) // 1 hour
 
-    // TODO: Integrate with email service (SendGrid, Resend, etc.)
-    // await sendEmail({
-    //   to: email,
-    //   subject: 'Reset Your G2 Melody Password',
-    //   html: `
-    //     <h1>Password Reset</h1>
-    //     <p>You requested to reset your password.</p>
-    //     <p>Click the link below to reset your password (valid for 1 hour):</p>
-    //     <a href="${resetUrl}">Reset Password</a>
-    //     <p>If you didn't request this, please ignore this email.</p>
-    //   `
-    // })
+    // Replace any existing tokens for this email and queue the reset email
+    // together; the mail queue sends it after the response
+    const writes = [
+      prisma.passwordResetToken.deleteMany({
+        where: { email: email.toLowerCase() }
+      }),
+      prisma.passwordResetToken.create({
+        data: {
+          id: uuidv4(),
+          email: email.toLowerCase(),
+          token,
+          expiresAt
+        }
+      })
+    ]
+    if (mailQueue.configured) {
+      // Not sent once the token has expired
+      writes.push(enqueueEmail(prisma, { ...passwordResetEmail(email, resetUrl), expiresAt }))
+    }
+    await prisma.$transaction(writes)
+
+    if (mailQueue.configured) {
+      mailQueue.wake()
+    } else {
+      // No SMTP relay: log the reset link (MOCKED) instead
+      console.log('===========================================')
+      console.log('PASSWORD RESET REQUEST (MOCKED EMAIL)')
+      console.log('===========================================')
+      console.log(`To: ${email}`)
+      console.log(`Reset URL: ${resetUrl}`)
+      console.log('===========================================')
+    }
 
     return NextResponse.json({ 
       success: true, 
@@ -1,8 +1,6 @@
-import { PrismaClient } from '@prisma/client'
+import { prisma } from '@/lib/prisma'
 import { NextResponse } from 'next/server'
-import bcrypt from 'bcryptjs'
-
-const prisma = new PrismaClient()
+import { hashPassword } from '@/lib/passwords'
 
 export async function POST(request) {
   try {
@@ -42,7 +40,7 @@ export async function POST(request) {
     }
 
     // Hash new password
-    const hashedPassword = await bcrypt.hash(password, 10)
+    const hashedPassword = await hashPassword(password, 10)
 
     // Update user password
     await prisma.user.update({
@@ -4,42 +4,20 @@ G2 Melody Backend API Testing Script
 Tests file upload and project CRUD operations
 """
 
-import requests
+import argparse
 import json
 import io
 import os
-from PIL import Image
 import tempfile
 
+from tests.load import Call, parse_mix, print_report, run_load, run_ramp
+
 # Configuration
-BASE_URL = "https://music-admin-5.preview.emergentagent.com/api"
+from tests.config import BASE_URL
+from tests.fixtures import create_test_image
+from tests.http_client import client
 HEADERS = {"Content-Type": "application/json"}
 
-def create_test_image(size_mb=1, format='JPEG'):
-    """Create a test image of specified size in MB"""
-    # Calculate dimensions for target file size
-    # Rough estimate: 1MB ≈ 1000x1000 pixels for JPEG
-    if size_mb <= 0.1:
-        width, height = 300, 300
-    elif size_mb <= 0.5:
-        width, height = 500, 500
-    elif size_mb <= 1:
-        width, height = 800, 800
-    elif size_mb <= 2:
-        width, height = 1200, 1200
-    else:
-        width, height = 2000, 2000
-    
-    # Create image
-    img = Image.new('RGB', (width, height), color='red')
-    
-    # Save to bytes
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format=format, quality=95)
-    img_bytes.seek(0)
-    
-    return img_bytes
-
 def test_file_upload_api():
     """Test POST /api/upload endpoint"""
     print("\n" + "="*60)
@@ -52,7 +30,7 @@ def test_file_upload_api():
         test_image = create_test_image(1, 'JPEG')
         files = {'file': ('test.jpg', test_image, 'image/jpeg')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -75,7 +53,7 @@ def test_file_upload_api():
         large_image = create_test_image(3, 'JPEG')  # 3MB image
         files = {'file': ('large.jpg', large_image, 'image/jpeg')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
@@ -97,7 +75,7 @@ def test_file_upload_api():
         text_content = "This is not an image file"
         files = {'file': ('test.txt', io.StringIO(text_content), 'text/plain')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
@@ -115,7 +93,7 @@ def test_file_upload_api():
     # Test 4: No file provided
     print("\n4. Testing no file provided...")
     try:
-        response = requests.post(f"{BASE_URL}/upload", files={})
+        response = client.post(f"{BASE_URL}/upload", files={})
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
@@ -136,7 +114,7 @@ def test_file_upload_api():
         test_image = create_test_image(0.5, 'PNG')
         files = {'file': ('test.png', test_image, 'image/png')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -158,7 +136,7 @@ def test_projects_crud():
     # First, get existing projects to find one to update/delete
     print("\n1. Getting existing projects...")
     try:
-        response = requests.get(f"{BASE_URL}/projects")
+        response = client.get(f"{BASE_URL}/projects")
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -192,7 +170,7 @@ def test_project_update(project_id):
             "status": "CURRENT"
         }
         
-        response = requests.put(
+        response = client.put(
             f"{BASE_URL}/projects/{project_id}",
             headers=HEADERS,
             data=json.dumps(update_data)
@@ -207,7 +185,7 @@ def test_project_update(project_id):
             print(f"   New Goal Amount: {updated_project.get('goalAmount')}")
             
             # Verify the update by fetching the project
-            verify_response = requests.get(f"{BASE_URL}/projects/{project_id}")
+            verify_response = client.get(f"{BASE_URL}/projects/{project_id}")
             if verify_response.status_code == 200:
                 verified_project = verify_response.json()
                 if verified_project.get('title') == update_data['title']:
@@ -238,7 +216,7 @@ def test_project_creation_and_deletion():
         }
         
         # Create project
-        response = requests.post(
+        response = client.post(
             f"{BASE_URL}/projects",
             headers=HEADERS,
             data=json.dumps(project_data)
@@ -254,7 +232,7 @@ def test_project_creation_and_deletion():
             
             # Now delete the project
             print(f"\n4. Testing project deletion (DELETE /api/projects/{project_id})...")
-            delete_response = requests.delete(f"{BASE_URL}/projects/{project_id}")
+            delete_response = client.delete(f"{BASE_URL}/projects/{project_id}")
             print(f"Delete Status Code: {delete_response.status_code}")
             
             if delete_response.status_code == 200:
@@ -263,7 +241,7 @@ def test_project_creation_and_deletion():
                 print(f"   Response: {delete_data}")
                 
                 # Verify deletion by trying to fetch the project
-                verify_response = requests.get(f"{BASE_URL}/projects/{project_id}")
+                verify_response = client.get(f"{BASE_URL}/projects/{project_id}")
                 if verify_response.status_code == 404:
                     print(f"✅ VERIFIED: Project no longer exists")
                     return True
@@ -280,8 +258,84 @@ def test_project_creation_and_deletion():
         print(f"❌ ERROR: {str(e)}")
         return False
 
+def build_load_mix(project_id=None):
+    """Weighted mix of the calls exercised by this suite, for load mode"""
+    def upload_image():
+        return {'files': {'file': ('test.jpg', create_test_image(0.1, 'JPEG'), 'image/jpeg')}}
+
+    def upload_invalid():
+        return {'files': {'file': ('test.txt', io.BytesIO(b"not an image"), 'text/plain')}}
+
+    calls = [
+        Call('list_projects', 'GET', '/projects', weight=6),
+        Call('list_current', 'GET', '/projects?status=current', weight=2),
+        Call('upload_image', 'POST', '/upload', weight=1, build=upload_image),
+        Call('upload_invalid', 'POST', '/upload', weight=1, build=upload_invalid, ok_status=(400,)),
+    ]
+    if project_id:
+        calls.append(Call('get_project', 'GET', f'/projects/{project_id}', weight=3))
+    return calls
+
+def run_load_mode(args):
+    """Replay the suite's calls concurrently and report latency percentiles"""
+    print("G2 MELODY BACKEND LOAD TEST")
+    print(f"Base URL: {BASE_URL}")
+
+    project_id = None
+    try:
+        response = client.get(f"{BASE_URL}/projects", timeout=args.timeout)
+        if response.status_code == 200 and response.json():
+            project_id = response.json()[0]['id']
+    except Exception as e:
+        print(f"❌ ERROR: Could not list projects: {str(e)}")
+
+    calls = parse_mix(args.mix, build_load_mix(project_id))
+    print(f"Mix: {', '.join(f'{c.name}={c.weight:g}' for c in calls)}")
+
+    if args.ramp:
+        stages = [int(n) for n in args.ramp.split(',')]
+        _, failed_at = run_ramp(
+            calls, BASE_URL, stages, args.duration,
+            max_error_rate=args.max_error_rate,
+            max_p99=args.max_p99,
+            seed=args.seed,
+            timeout=args.timeout,
+        )
+        if failed_at:
+            print(f"\n❌ API degraded at {failed_at} concurrent workers")
+        else:
+            print(f"\n✅ API held up through {stages[-1]} concurrent workers")
+        return
+
+    report = run_load(
+        calls, BASE_URL,
+        workers=args.workers,
+        duration=args.duration if args.requests is None else None,
+        total_requests=args.requests,
+        seed=args.seed,
+        timeout=args.timeout,
+    )
+    print_report(report)
+
 def main():
     """Main testing function"""
+    parser = argparse.ArgumentParser(description="G2 Melody backend API tests")
+    parser.add_argument('--load', action='store_true', help="run the concurrent load mode instead of the functional tests")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent workers in load mode")
+    parser.add_argument('--duration', type=float, default=30, help="seconds per load run (or per ramp stage)")
+    parser.add_argument('--requests', type=int, default=None, help="stop after this many requests instead of --duration")
+    parser.add_argument('--ramp', default=None, help="comma-separated worker counts, e.g. 1,2,4,8,16,32")
+    parser.add_argument('--max-error-rate', type=float, default=0.05, help="ramp stops when a stage exceeds this error rate")
+    parser.add_argument('--max-p99', type=float, default=None, help="ramp stops when a stage's p99 exceeds this many seconds")
+    parser.add_argument('--mix', default=None, help="weight overrides, e.g. list_projects=10,upload_image=0")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+
+    if args.load:
+        run_load_mode(args)
+        return
+
     print("G2 MELODY BACKEND API TESTING")
     print("Testing File Upload and Project CRUD APIs")
     print(f"Base URL: {BASE_URL}")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Bulk Application Review Testing
+POST /admin/member-applications/bulk approves or rejects a list of
+applications (lib/applications.js). They go in chunked transactions, with
+each chunk's temporary passwords hashed in parallel in the password pool and
+the emails queued rather than sent.
+
+The suite submits a batch of probe applications, as after an audition
+intake. It approves some of them one at a time through the single approve
+route, the way an admin clicking through the list would, and approves the
+rest with bulk requests, then compares applications per second. It also
+rejects a batch in bulk and checks the per-item results: every id gets one
+result, a second review reports already_processed, unknown ids report
+not_found, and bulk-approved members can log in with their temporary
+password.
+
+There is no route that deletes applications or members, so probes are named
+with the probe tag and left in place.
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+
+TAG = "bulk-review-probe"
+PARTS = ("soprano", "alto", "tenor", "bass")
+
+def apply(run_id, index):
+    response = client.post(f"{BASE_URL}/membership-application", json={
+        "fullName": f"{TAG} {run_id} {index}", "email": f"{TAG}-{run_id}-{index}@example.com",
+        "vocalPart": PARTS[index % len(PARTS)]
+    })
+    return response.json()['applicationId'] if response.status_code == 200 else None
+
+def bulk(action, ids, reason=None):
+    payload = {"action": action, "ids": ids}
+    if reason:
+        payload["reason"] = reason
+    response = client.post(f"{BASE_URL}/admin/member-applications/bulk", json=payload)
+    return response.json() if response.status_code == 200 else None
+
+def approve_one_by_one(ids):
+    """Approve through the single route, one request after another; returns (seconds, failures)"""
+    started = time.perf_counter()
+    failed = 0
+    for application_id in ids:
+        response = client.post(f"{BASE_URL}/admin/member-applications/{application_id}/approve", json={})
+        failed += response.status_code != 200
+    return time.perf_counter() - started, failed
+
+def approve_in_bulk(ids, request_size):
+    """Approve with bulk requests of `request_size` ids; returns (seconds, results)"""
+    started = time.perf_counter()
+    results = []
+    for start in range(0, len(ids), request_size):
+        response = bulk("approve", ids[start:start + request_size])
+        results.extend(response['results'] if response else [])
+    return time.perf_counter() - started, results
+
+def check_results(approved_ids, results, rejected_ids, rejected):
+    """Problems with the per-item results, as a list of strings"""
+    problems = []
+    if [r['id'] for r in results] != approved_ids:
+        problems.append(f"{len(results)} approve results for {len(approved_ids)} ids, or out of order")
+    not_approved = [r for r in results if r['status'] != 'approved' or not r.get('member', {}).get('temporaryPassword')]
+    if not_approved:
+        problems.append(f"{len(not_approved)} applications not approved, e.g. {not_approved[0]}")
+    if not rejected or [r['id'] for r in rejected['results']] != rejected_ids or \
+            rejected['summary'] != {'rejected': len(rejected_ids)}:
+        problems.append(f"bulk reject summary {rejected and rejected['summary']}")
+    return problems
+
+def check_review_rules(approved_ids, rejected_ids):
+    """Repeat and unknown ids in one request; returns problems"""
+    unknown = str(uuid.uuid4())
+    ids = approved_ids[:3] + approved_ids[:1] + rejected_ids[:2] + [unknown]
+    response = bulk("approve", ids)
+    if not response:
+        return ["bulk approve of already reviewed ids failed"]
+    problems = []
+    expected = {'already_processed': len(approved_ids[:3]) + len(rejected_ids[:2]), 'not_found': 1}
+    if response['summary'] != expected:
+        problems.append(f"second review summary {response['summary']}, expected {expected}")
+    if response['processed'] != len(ids) - 1:
+        problems.append(f"a repeated id got {response['processed'] - len(ids) + 2} results")
+    return problems
+
+def check_logins(results, sample):
+    """Log in as a sample of bulk-approved members; returns problems"""
+    problems = []
+    for result in random.Random(0).sample(results, min(sample, len(results))):
+        member = result['member']
+        response = client.post(f"{BASE_URL}/members/login", json={
+            "email": member['email'], "password": member['temporaryPassword']
+        })
+        if response.status_code != 200:
+            problems.append(f"{member['email']} could not log in ({response.status_code})")
+    return problems
+
+def run_bulk_suite(single=20, approvals=200, rejections=50, request_size=100, min_speedup=2.0, logins=5):
+    """Approve probe applications singly and in bulk; return the number of failed checks"""
+    print("BULK APPLICATION REVIEW TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{single} single approvals, {approvals} bulk approvals ({request_size} per request), "
+          f"{rejections} bulk rejections")
+    print("="*80)
+
+    run_id = uuid.uuid4().hex[:8]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(lambda i: apply(run_id, i), range(single + approvals + rejections)))
+    if not all(ids):
+        print(f"❌ Only {sum(map(bool, ids))} of {len(ids)} probe applications were accepted")
+        return 1
+    print(f"Submitted {len(ids)} probe applications ({TAG}-{run_id}-*@example.com)")
+    single_ids, approved_ids = ids[:single], ids[single:single + approvals]
+    rejected_ids = ids[single + approvals:]
+
+    single_seconds, single_failed = approve_one_by_one(single_ids)
+    bulk_seconds, results = approve_in_bulk(approved_ids, request_size)
+    started = time.perf_counter()
+    rejected = bulk("reject", rejected_ids, "Thank you for auditioning; the choir is full this term")
+    reject_seconds = time.perf_counter() - started
+
+    single_rate = single / single_seconds if single_seconds else 0
+    bulk_rate = approvals / bulk_seconds if bulk_seconds else 0
+    reject_rate = rejections / reject_seconds if reject_seconds else 0
+    print(f"\n{'path':<22}{'applications':>14}{'seconds':>10}{'per second':>12}")
+    print(f"{'approve one by one':<22}{single:>14}{single_seconds:>10.2f}{single_rate:>12.1f}")
+    print(f"{'approve in bulk':<22}{approvals:>14}{bulk_seconds:>10.2f}{bulk_rate:>12.1f}")
+    print(f"{'reject in bulk':<22}{rejections:>14}{reject_seconds:>10.2f}{reject_rate:>12.1f}")
+
+    print("\nChecks:")
+    failures = 0
+    speedup = bulk_rate / single_rate if single_rate else 0
+    ok = speedup >= min_speedup and not single_failed
+    failures += not ok
+    print(f"{'✅' if ok else '❌'} Bulk approval {speedup:.1f}x the single route's throughput "
+          f"(need {min_speedup:g}x), {single_failed} single approvals failed")
+
+    problems = check_results(approved_ids, results, rejected_ids, rejected)
+    problems += check_review_rules(approved_ids, rejected_ids)
+    failures += bool(problems)
+    if problems:
+        print(f"❌ {len(problems)} problems with the per-item results, e.g. {problems[0]}")
+    else:
+        print("✅ One result per id in request order; repeats, reviewed and unknown ids reported per item")
+
+    problems = check_logins([r for r in results if r.get('member')], logins)
+    failures += bool(problems)
+    print(f"❌ {problems[0]}" if problems else f"✅ {logins} bulk-approved members logged in with their temporary password")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk member application review throughput")
+    parser.add_argument('--single', type=int, default=20, help="applications approved through the single route")
+    parser.add_argument('--approvals', type=int, default=200, help="applications approved in bulk")
+    parser.add_argument('--rejections', type=int, default=50, help="applications rejected in bulk")
+    parser.add_argument('--request-size', type=int, default=100, help="ids per bulk request")
+    parser.add_argument('--min-speedup', type=float, default=2.0, help="required bulk/single throughput ratio")
+    parser.add_argument('--logins', type=int, default=5, help="bulk-approved members to log in as")
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_bulk_suite(args.single, args.approvals, args.rejections, args.request_size,
+                              args.min_speedup, args.logins)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
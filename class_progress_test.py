@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Lesson Progress Class Testing
+Simulates a class of learners watching the lessons of one course at the
+same time. Every learner sends watch-time heartbeats while a lesson plays,
+then marks it completed twice (a double click), and finishes only part of
+the course. The class runs twice: once posting every event to
+POST /lesson-progress and once sending heartbeats through
+POST /lesson-progress/batch.
+
+Afterwards every enrollment must count exactly the lessons its learner
+completed, with the matching percentage, and every lesson's watch time must
+equal the heartbeats sent. Heartbeat watch time is written behind
+(lib/counters.js), so the suite flushes the counters before checking. Each
+heartbeat posted on its own must still answer with the progress row and the
+watch time so far. The probe course is deleted at the end, which removes
+its lessons, enrollments and progress
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+from tests.load import percentile
+
+TAG = "class-progress-probe"
+
+class Learner:
+    """One learner working through the course; records request latencies"""
+
+    def __init__(self, user_id, lessons, heartbeats, watch_seconds, completes, batch_size):
+        self.user_id = user_id
+        self.lessons = lessons
+        self.heartbeats = heartbeats
+        self.watch_seconds = watch_seconds
+        self.completes = completes
+        self.batch_size = batch_size
+        self.latencies = []
+        self.errors = 0
+        self.events = 0
+        self.watched = {}
+        self.wrong_rows = []
+
+    def _post(self, path, payload):
+        start = time.perf_counter()
+        response = client.post(f"{BASE_URL}{path}", json=payload)
+        self.latencies.append(time.perf_counter() - start)
+        self.errors += response.status_code != 200
+        return response
+
+    def _send(self, events):
+        self.events += len(events)
+        if self.batch_size:
+            for i in range(0, len(events), self.batch_size):
+                self._post("/lesson-progress/batch", {"events": events[i:i + self.batch_size]})
+        else:
+            for event in events:
+                response = self._post("/lesson-progress", event)
+                if "watchTime" not in event or response.status_code != 200:
+                    continue
+                # A heartbeat answers with the progress row, buffered watch time included
+                self.watched[event['lessonId']] = self.watched.get(event['lessonId'], 0) + event['watchTime']
+                row = response.json()
+                if not row.get('id') or 'completed' not in row or row['watchTime'] != self.watched[event['lessonId']]:
+                    self.wrong_rows.append(row)
+
+    def run(self):
+        client.post(f"{BASE_URL}/enrollments", json={"userId": self.user_id, "courseId": self.lessons[0]['courseId']})
+        for index, lesson in enumerate(self.lessons):
+            heartbeat = {"userId": self.user_id, "lessonId": lesson['id'], "watchTime": self.watch_seconds}
+            self._send([heartbeat] * self.heartbeats)
+            if index < self.completes:
+                done = {"userId": self.user_id, "lessonId": lesson['id'], "completed": True}
+                # A double click must not count the lesson twice
+                self._send([done])
+                self._send([done])
+        return self
+
+def setup_course(lesson_count):
+    response = client.post(f"{BASE_URL}/courses", json={"title": f"{TAG} course", "level": "Beginner"})
+    if response.status_code != 200:
+        return None, []
+    course_id = response.json()['id']
+    lessons = []
+    for order in range(lesson_count):
+        response = client.post(f"{BASE_URL}/lessons", json={
+            "courseId": course_id, "title": f"{TAG} lesson {order + 1}", "order": order, "duration": 10
+        })
+        if response.status_code == 200:
+            lessons.append(response.json())
+    return course_id, lessons
+
+def check_learner(learner, lesson_count):
+    """Problems with one learner's counters, as a list of strings"""
+    problems = []
+    enrollments = client.get(f"{BASE_URL}/enrollments", params={'userId': learner.user_id}).json()
+    enrollment = next((e for e in enrollments if e['courseId'] == learner.lessons[0]['courseId']), None)
+    expected_percent = round(learner.completes * 100 / lesson_count)
+    if not enrollment:
+        problems.append("no enrollment")
+    elif enrollment['completedLessons'] != learner.completes or enrollment['progress'] != expected_percent:
+        problems.append(f"enrollment {enrollment['completedLessons']} lessons / {enrollment['progress']}%, "
+                        f"expected {learner.completes} / {expected_percent}%")
+
+    rows = client.get(f"{BASE_URL}/lesson-progress", params={'userId': learner.user_id}).json()
+    expected_watch = learner.heartbeats * learner.watch_seconds
+    for row in rows:
+        if row['watchTime'] != expected_watch:
+            problems.append(f"lesson {row['lessonId']} watch time {row['watchTime']}s, expected {expected_watch}s")
+    if learner.wrong_rows:
+        problems.append(f"{len(learner.wrong_rows)} heartbeat responses without the progress row so far, "
+                        f"e.g. {learner.wrong_rows[0]}")
+    completed = sum(1 for row in rows if row['completed'])
+    if completed != learner.completes:
+        problems.append(f"{completed} lessons marked completed, expected {learner.completes}")
+    return problems
+
+def run_class(lessons, learners, heartbeats, watch_seconds, completes, batch_size):
+    run_id = uuid.uuid4().hex[:8]
+    class_ = [Learner(f"{TAG}-{run_id}-{i}", lessons, heartbeats, watch_seconds, completes, batch_size)
+              for i in range(learners)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=learners) as pool:
+        list(pool.map(Learner.run, class_))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for learner in class_ for latency in learner.latencies)
+    return class_, {
+        "requests": len(latencies),
+        "events": sum(learner.events for learner in class_),
+        "errors": sum(learner.errors for learner in class_),
+        "elapsed": elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+    }
+
+def run_progress_suite(learners=30, lesson_count=8, heartbeats=12, watch_seconds=5, batch_size=12,
+                       min_speedup=1.0):
+    """Run the class per event and batched; return the number of failed checks"""
+    print("LESSON PROGRESS CLASS TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{learners} learners, {lesson_count} lessons, {heartbeats} heartbeats of {watch_seconds}s per lesson")
+    print("="*80)
+
+    course_id, lessons = setup_course(lesson_count)
+    if not course_id or len(lessons) != lesson_count:
+        print("❌ Could not create the probe course and lessons")
+        if course_id:
+            client.delete(f"{BASE_URL}/courses/{course_id}")
+        return 1
+    completes = max(1, lesson_count * 3 // 4)
+
+    failures = 0
+    results = {}
+    try:
+        print(f"\n{'mode':<10}{'requests':>10}{'events':>9}{'events/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for mode, size in (("single", 0), ("batch", batch_size)):
+            class_, summary = run_class(lessons, learners, heartbeats, watch_seconds, completes, size)
+            results[mode] = summary
+            rate = summary['events'] / summary['elapsed']
+            print(f"{mode:<10}{summary['requests']:>10}{summary['events']:>9}{rate:>10.0f}"
+                  f"{summary['p50'] * 1000:>9.1f}{summary['p99'] * 1000:>9.1f}{summary['errors']:>8}")
+
+            client.post(f"{BASE_URL}/admin/counters/flush")
+            problems = {learner.user_id: check_learner(learner, lesson_count) for learner in class_}
+            bad = {user: found for user, found in problems.items() if found}
+            ok = not bad and not summary['errors']
+            failures += not ok
+            if ok:
+                print(f"  ✅ {len(class_)} enrollments at {completes}/{lesson_count} lessons, watch time exact")
+            else:
+                user, found = next(iter(bad.items()), (None, [f"{summary['errors']} failed requests"]))
+                print(f"  ❌ {len(bad)} learners with wrong counters, e.g. {user}: {'; '.join(found)}")
+
+        single = results['single']['events'] / results['single']['elapsed']
+        batch = results['batch']['events'] / results['batch']['elapsed']
+        ok = batch >= single * min_speedup
+        failures += not ok
+        print(f"\n{'✅' if ok else '❌'} Batched heartbeats: {batch:.0f} events/s vs {single:.0f} per event "
+              f"({batch / single:.1f}x, need {min_speedup:g}x)")
+    finally:
+        client.delete(f"{BASE_URL}/courses/{course_id}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="A class of learners posting lesson progress concurrently")
+    parser.add_argument('--learners', type=int, default=30)
+    parser.add_argument('--lessons', type=int, default=8)
+    parser.add_argument('--heartbeats', type=int, default=12, help="heartbeats per lesson")
+    parser.add_argument('--watch-seconds', type=int, default=5, help="watch time per heartbeat")
+    parser.add_argument('--batch-size', type=int, default=12, help="events per batch request")
+    parser.add_argument('--min-speedup', type=float, default=1.0, help="required batch/single events per second")
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_progress_suite(args.learners, args.lessons, args.heartbeats, args.watch_seconds,
+                                  args.batch_size, args.min_speedup)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
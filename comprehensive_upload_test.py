@@ -4,32 +4,12 @@ Comprehensive File Upload API Testing
 Tests all validation scenarios as requested
 """
 
-import requests
 import json
 import io
-from PIL import Image
 
-BASE_URL = "https://music-admin-5.preview.emergentagent.com/api"
-
-def create_test_image(size_mb=1, format='JPEG'):
-    """Create a test image of specified size in MB"""
-    if size_mb <= 0.1:
-        width, height = 200, 200
-    elif size_mb <= 0.5:
-        width, height = 400, 400
-    elif size_mb <= 1:
-        width, height = 600, 600
-    elif size_mb <= 2:
-        width, height = 1000, 1000
-    else:
-        width, height = 1500, 1500
-    
-    img = Image.new('RGB', (width, height), color='red')
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format=format, quality=95)
-    img_bytes.seek(0)
-    
-    return img_bytes
+from tests.config import BASE_URL
+from tests.fixtures import create_test_image
+from tests.http_client import client
 
 def test_comprehensive_upload():
     """Test all upload scenarios as specified in the requirements"""
@@ -42,7 +22,7 @@ def test_comprehensive_upload():
         test_image = create_test_image(1, 'JPEG')
         files = {'file': ('test.jpg', test_image, 'image/jpeg')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -68,7 +48,7 @@ def test_comprehensive_upload():
         test_image = create_test_image(0.5, 'PNG')
         files = {'file': ('test.png', test_image, 'image/png')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -86,7 +66,7 @@ def test_comprehensive_upload():
         test_image = create_test_image(0.3, 'GIF')
         files = {'file': ('test.gif', test_image, 'image/gif')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -104,7 +84,7 @@ def test_comprehensive_upload():
         test_image = create_test_image(0.4, 'WEBP')
         files = {'file': ('test.webp', test_image, 'image/webp')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -122,7 +102,7 @@ def test_comprehensive_upload():
         large_image = create_test_image(3, 'JPEG')  # 3MB image
         files = {'file': ('large.jpg', large_image, 'image/jpeg')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
@@ -146,7 +126,7 @@ def test_comprehensive_upload():
         text_content = b"This is not an image file"
         files = {'file': ('test.txt', io.BytesIO(text_content), 'text/plain')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
@@ -165,7 +145,7 @@ def test_comprehensive_upload():
     # Test 7: No file provided - SHOULD FAIL
     print("\n7. Testing no file provided - should reject...")
     try:
-        response = requests.post(f"{BASE_URL}/upload", files={})
+        response = client.post(f"{BASE_URL}/upload", files={})
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
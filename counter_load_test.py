@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Counter Testing
+Track plays (GET /music/:id), purchase downloads
+(POST /purchases/:id/download), watch-time heartbeats (POST /lesson-progress)
+and practice minutes (POST /practice-sessions) go to write-behind counters
+(lib/counters.js). Increments are summed in memory per row and written by a
+flush every COUNTER_FLUSH_INTERVAL_MS, so a popular track or a class on one
+lesson no longer queues on a row lock per request.
+
+The suite creates a probe track, a purchase of it, and a lesson, then
+drives a weighted mix of the four routes at one hot track and purchase, a
+class of learners and a few practicing users. While the load runs it samples
+GET /admin/counters to see how much a crash would have lost. Afterwards it
+flushes the counters and checks that every count equals the successful
+requests, to the increment.
+
+Compare with every increment written through: run once with
+COUNTER_FLUSH_INTERVAL_MS=0 and --save, then again with write-behind and
+--compare.
+
+There is no route that deletes purchases, so the probe track and purchase
+are named with the probe tag and left in place. The probe course is
+deleted at the end, which removes its lesson and progress.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+
+TAG = "counter-probe"
+WATCH_SECONDS = 5
+PRACTICE_MINUTES = 15
+
+def setup(run_id, learners, practicers):
+    """Probe track, purchase, course and lesson; returns ids or None"""
+    track = client.post(f"{BASE_URL}/music", json={"title": f"{TAG} {run_id}", "artist": TAG, "price": 500})
+    if track.status_code != 200:
+        return None
+    purchase = client.post(f"{BASE_URL}/purchases", json={"musicId": track.json()['id'],
+                                                            "guestEmail": f"{TAG}-{run_id}@example.com"})
+    course = client.post(f"{BASE_URL}/courses", json={"title": f"{TAG} {run_id}", "level": "Beginner"})
+    if purchase.status_code != 200 or course.status_code != 200:
+        return None
+    lesson = client.post(f"{BASE_URL}/lessons", json={"courseId": course.json()['id'], "title": f"{TAG} lesson",
+                                                     "order": 0, "duration": 10})
+    if lesson.status_code != 200:
+        client.delete(f"{BASE_URL}/courses/{course.json()['id']}")
+        return None
+    return {
+        "track": track.json()['id'], "purchase": purchase.json()['id'], "course": course.json()['id'],
+        "lesson": lesson.json()['id'],
+        "learners": [f"{TAG}-{run_id}-learner-{i}" for i in range(learners)],
+        "practicers": [f"{TAG}-{run_id}-user-{i}" for i in range(practicers)],
+    }
+
+def counter_calls(ids):
+    """The weighted mix; every call adds one known amount to one counter"""
+    return [
+        load.Call("play", "GET", f"/music/{ids['track']}", weight=4),
+        load.Call("download", "POST", f"/purchases/{ids['purchase']}/download", weight=1),
+        load.Call("heartbeat", "POST", "/lesson-progress", weight=4, build=lambda: {"json": {
+            "userId": random.choice(ids['learners']), "lessonId": ids['lesson'], "watchTime": WATCH_SECONDS}}),
+        load.Call("practice", "POST", "/practice-sessions", weight=1, build=lambda: {"json": {
+            "userId": random.choice(ids['practicers']), "duration": PRACTICE_MINUTES}}),
+    ]
+
+class PendingSampler:
+    """Polls GET /admin/counters during the load for the most that was
+    buffered at once: what a crash at that moment would have lost"""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.samples = 0
+        self.most_increments = 0
+        self.oldest_ms = 0.0
+        self.stats = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            response = client.get(f"{BASE_URL}/admin/counters")
+            if response.status_code != 200:
+                continue
+            self.stats = response.json()
+            self.samples += 1
+            increments = sum(c['increments'] for c in self.stats['pending'].values())
+            self.most_increments = max(self.most_increments, increments)
+            if self.stats['oldestPendingAt']:
+                oldest = datetime.fromisoformat(self.stats['oldestPendingAt'].replace("Z", "+00:00"))
+                self.oldest_ms = max(self.oldest_ms, (datetime.now(timezone.utc) - oldest).total_seconds() * 1000)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def succeeded(report, name):
+    """(requests that returned 200, requests whose outcome is unknown)"""
+    status = report.routes[name].status_counts
+    return status.get(200, 0), sum(count for code, count in status.items() if not isinstance(code, int))
+
+def read_counts(ids):
+    """Flush, then read each counter back; returns {call: count} in units of one request"""
+    client.post(f"{BASE_URL}/admin/counters/flush")
+    # Both routes report the count including their own increment
+    plays = client.get(f"{BASE_URL}/music/{ids['track']}").json()['plays']
+    downloads = client.post(f"{BASE_URL}/purchases/{ids['purchase']}/download").json()['downloadCount'] - 1
+    rows = client.get(f"{BASE_URL}/lesson-progress", params={"lessonId": ids['lesson']}).json()
+    watch = sum(row['watchTime'] for row in rows)
+    minutes = sum(client.get(f"{BASE_URL}/user-stats", params={"userId": user}).json()['totalPracticeMinutes']
+                  for user in ids['practicers'])
+    return {"play": plays, "download": downloads, "heartbeat": watch / WATCH_SECONDS,
+            "practice": minutes / PRACTICE_MINUTES}
+
+def check_counts(report, counts):
+    """Counts that differ from the successful requests; returns problems"""
+    problems = []
+    for name, count in counts.items():
+        ok, unknown = succeeded(report, name)
+        if not ok <= count <= ok + unknown:
+            problems.append(f"{name} counted {count:g} for {ok} successful requests"
+                            + (f" ({unknown} with unknown outcome)" if unknown else ""))
+    return problems
+
+def run_counter_suite(workers=16, duration=10, learners=30, practicers=5, max_pending_ms=3000,
+                      save=None, compare=None, min_speedup=2.0):
+    """Drive the counter routes and check throughput and counts; return the number of failed checks"""
+    print("WRITE-BEHIND COUNTER TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{workers} workers for {duration}s, {learners} learners on one lesson, {practicers} practicing users")
+    print("="*80)
+
+    run_id = uuid.uuid4().hex[:8]
+    ids = setup(run_id, learners, practicers)
+    if not ids:
+        print("❌ Could not create the probe track, purchase and lesson")
+        return 1
+    failures = 0
+    try:
+        with PendingSampler() as sampler:
+            report = load.run_load(counter_calls(ids), BASE_URL, workers=workers, duration=duration)
+        load.print_report(report)
+        throughput = report.total().summary(report.elapsed)['throughput']
+        interval = sampler.stats['intervalMs'] if sampler.stats else None
+        print(f"\nFlush interval {interval} ms: at most {sampler.most_increments} increments buffered at once, "
+              f"the oldest {sampler.oldest_ms:.0f} ms old ({sampler.samples} samples)")
+        counts = read_counts(ids)
+    finally:
+        client.delete(f"{BASE_URL}/courses/{ids['course']}")
+
+    print("\nChecks:")
+    errors = report.total().errors
+    failures += bool(errors)
+    print(f"❌ {errors} requests failed" if errors else f"✅ {report.total().count} requests, none failed")
+
+    problems = check_counts(report, counts)
+    failures += bool(problems)
+    print(f"❌ {'; '.join(problems)}" if problems else
+          "✅ Plays, downloads, watch time and practice minutes match the successful requests exactly")
+
+    ok = sampler.samples > 0 and sampler.oldest_ms <= max_pending_ms
+    failures += not ok
+    print(f"{'✅' if ok else '❌'} Oldest buffered increment {sampler.oldest_ms:.0f} ms "
+          f"(limit {max_pending_ms} ms){'' if sampler.samples else ', GET /admin/counters never answered'}")
+
+    if save:
+        with open(save, "w") as f:
+            json.dump({"intervalMs": interval, "throughput": throughput}, f, indent=1)
+        print(f"   Saved {throughput:.0f} req/s to {save}")
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        speedup = throughput / baseline['throughput'] if baseline['throughput'] else 0
+        ok = speedup >= min_speedup
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {throughput:.0f} req/s vs {baseline['throughput']:.0f} with flush interval "
+              f"{baseline['intervalMs']} ms ({speedup:.1f}x, need {min_speedup:g}x)")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-behind counter throughput and accuracy")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10, help="seconds of load")
+    parser.add_argument('--learners', type=int, default=30, help="learners sending heartbeats for one lesson")
+    parser.add_argument('--practicers', type=int, default=5, help="users logging practice sessions")
+    parser.add_argument('--max-pending-ms', type=int, default=3000,
+                        help="oldest buffered increment allowed during the run")
+    parser.add_argument('--save', help="write this run's throughput to a JSON file")
+    parser.add_argument('--compare', help="a file from --save to compare throughput with")
+    parser.add_argument('--min-speedup', type=float, default=2.0, help="required throughput ratio for --compare")
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_counter_suite(args.workers, args.duration, args.learners, args.practicers, args.max_pending_ms,
+                                 args.save, args.compare, args.min_speedup)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
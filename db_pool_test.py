@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Database Connection Pool Testing
+Ramps concurrency on database-bound list endpoints while sampling
+GET /admin/db-pool, and reports for every stage how many pool connections
+were busy and how long queries waited for one. When throughput stops
+growing while every connection is busy and the wait grows, Postgres
+connections are the bottleneck (raise DATABASE_POOL_SIZE or cut queries
+per request); when it stops growing with idle connections left, the limit
+is elsewhere (CPU, the event loop, the network).
+
+Checks that the metrics endpoint answers, that busy connections never
+exceed the configured pool size, and that the wait histogram records the
+queries made
+"""
+
+import argparse
+import sys
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.pool_metrics import PoolSampler, fetch_pool_metrics
+
+# Uncached reads, so every request takes a connection
+CALLS = [
+    load.Call("projects", "GET", "/projects", weight=2),
+    load.Call("donations", "GET", "/donations?limit=50", weight=2),
+    load.Call("music", "GET", "/music?limit=50"),
+]
+
+def run_stage(calls, workers, duration, interval):
+    with PoolSampler(BASE_URL, interval) as sampler:
+        report = load.run_load(calls, BASE_URL, workers=workers, duration=duration)
+    return report.total().summary(report.elapsed), sampler.summary()
+
+def diagnose(stages, min_gain):
+    """Name the first stage where adding workers stopped adding throughput"""
+    for (_, before, _), (workers, after, pool) in zip(stages, stages[1:]):
+        if after['throughput'] >= before['throughput'] * min_gain:
+            continue
+        if pool and pool['saturated'] and pool['saturated'] >= 0.5 and pool['mean_wait_ms'] > 1:
+            return (f"throughput flattened at {workers} workers with the pool saturated "
+                    f"{pool['saturated'] * 100:.0f}% of the time and {pool['mean_wait_ms']:.1f}ms mean wait: "
+                    f"connection-bound")
+        return (f"throughput flattened at {workers} workers with idle connections left: "
+                f"not connection-bound")
+    return "throughput kept growing with concurrency"
+
+def run_pool_suite(stages, duration=5.0, interval=0.1, min_gain=1.2, mix=None):
+    """Run the concurrency ramp and return the number of failed checks"""
+    print("DATABASE CONNECTION POOL TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"Stages: {', '.join(map(str, stages))} workers, {duration:g}s each")
+    print("="*80)
+
+    metrics = fetch_pool_metrics(BASE_URL)
+    if metrics is None:
+        print("❌ GET /admin/db-pool is unavailable")
+        return 1
+    limit = metrics['pool'].get('connectionLimit')
+    timeout = metrics['pool'].get('poolTimeoutSeconds')
+    print(f"Pool: {limit or 'default'} connections, pool timeout {f'{timeout}s' if timeout else 'default'}")
+
+    calls = load.parse_mix(mix, list(CALLS))
+    results = []
+    print(f"\n{'workers':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'err%':>7}"
+          f"{'busy':>7}{'max':>6}{'sat%':>7}{'waiting':>9}{'wait ms':>9}")
+    for workers in stages:
+        total, pool = run_stage(calls, workers, duration, interval)
+        results.append((workers, total, pool))
+        pool_cols = (f"{pool['mean_busy']:>7.1f}{pool['peak_busy']:>6}"
+                     f"{(pool['saturated'] or 0) * 100:>6.0f}%{pool['mean_waiting']:>9.1f}"
+                     f"{pool['mean_wait_ms']:>9.2f}") if pool else f"{'no samples':>38}"
+        print(f"{workers:>8}{total['throughput']:>9.1f}{total['p50'] * 1000:>9.1f}"
+              f"{total['p99'] * 1000:>9.1f}{total['error_rate'] * 100:>6.1f}%{pool_cols}")
+
+    failures = 0
+    print("\nChecks:")
+    sampled = [pool for _, _, pool in results if pool]
+    if len(sampled) == len(results):
+        print("✅ Pool metrics sampled during every stage")
+    else:
+        failures += 1
+        print(f"❌ Pool metrics missing for {len(results) - len(sampled)} stages")
+
+    if limit and sampled:
+        peak = max(pool['peak_busy'] for pool in sampled)
+        ok = peak <= limit
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Peak busy connections {peak} within the pool size {limit}")
+
+    if sampled:
+        queries = sum(pool['queries'] for pool in sampled)
+        ok = queries > 0
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Wait histogram recorded {queries} queries under load")
+
+    print(f"\nDiagnosis: {diagnose(results, min_gain)}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection pool saturation under a concurrency ramp")
+    parser.add_argument('--stages', default="1,2,4,8,16,32", help="worker counts")
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per stage")
+    parser.add_argument('--interval', type=float, default=0.1, help="pool sampling interval in seconds")
+    parser.add_argument('--min-gain', type=float, default=1.2,
+                        help="throughput ratio between stages that still counts as scaling")
+    parser.add_argument('--mix', help='override call weights, e.g. "projects=1,music=0"')
+    args = parser.parse_args()
+    require_app()
+
+    stages = [int(s) for s in args.stages.split(',')]
+    failures = run_pool_suite(stages, args.duration, args.interval, args.min_gain, args.mix)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Donation Burst Testing
+Fires thousands of concurrent donations at a single project, the way a
+campaign for one project does, and checks throughput and that the books
+still balance afterwards: the project's currentAmount must have grown by
+exactly the sum of its donations, and every accepted donation must be
+listed once.
+
+By default the burst goes to a fresh probe project, which is deleted
+afterwards (its donations cascade); --project targets an existing one
+"""
+
+import argparse
+import itertools
+import sys
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+
+TAG = "donation-burst-probe"
+
+def create_probe_project():
+    response = client.post(f"{BASE_URL}/projects", json={
+        "title": f"{TAG} project", "description": "Target of the donation burst", "goalAmount": 1000000000
+    })
+    return response.json()['id'] if response.status_code == 200 else None
+
+def project_donations(project_id):
+    response = client.get(f"{BASE_URL}/donations", params={'projectId': project_id})
+    return response.json() if response.status_code == 200 else None
+
+def current_amount(project_id):
+    response = client.get(f"{BASE_URL}/projects/{project_id}")
+    return response.json()['currentAmount'] if response.status_code == 200 else None
+
+def burst_call(project_id):
+    # Amounts cycle through a few values so a lost or doubled increment
+    # cannot hide behind a uniform amount
+    amounts = itertools.cycle([100, 250, 500, 1000, 2500])
+    counter = itertools.count()
+
+    def build():
+        n = next(counter)
+        return {'json': {"projectId": project_id, "amount": next(amounts),
+                         "donorName": f"{TAG} {n}", "paymentMethod": "mock"}}
+    return load.Call("POST /donations", "POST", "/donations", build=build)
+
+def run_burst(count=2000, workers=32, project_id=None, min_throughput=0.0, max_error_rate=0.0):
+    """Run the burst and return the number of failed checks"""
+    print("DONATION BURST TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{count} donations from {workers} concurrent clients")
+    print("="*80)
+
+    probe = project_id is None
+    if probe:
+        project_id = create_probe_project()
+        if not project_id:
+            print("❌ Could not create the probe project")
+            return 1
+    failures = 0
+    try:
+        before_amount = current_amount(project_id)
+        before = project_donations(project_id)
+        if before_amount is None or before is None:
+            print(f"❌ Project {project_id} or its donations are unavailable")
+            return 1
+
+        report = load.run_load([burst_call(project_id)], BASE_URL, workers=workers, total_requests=count)
+        load.print_report(report)
+        total = report.total().summary(report.elapsed)
+        accepted = total['status'].get(200, 0)
+
+        after_amount = current_amount(project_id)
+        after = project_donations(project_id) or []
+        new_ids = {d['id'] for d in after} - {d['id'] for d in before}
+        donated = sum(d['amount'] for d in after if d['id'] in new_ids)
+        increment = after_amount - before_amount
+
+        print("\nChecks:")
+        ok = total['error_rate'] <= max_error_rate
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {accepted}/{total['count']} donations accepted "
+              f"(error rate {total['error_rate'] * 100:.2f}%, max {max_error_rate * 100:g}%)")
+
+        ok = total['throughput'] >= min_throughput
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {total['throughput']:.1f} donations/s, p50 {total['p50'] * 1000:.1f}ms, "
+              f"p99 {total['p99'] * 1000:.1f}ms" + (f" (need {min_throughput:g}/s)" if min_throughput else ""))
+
+        ok = len(new_ids) == accepted and len(after) == len({d['id'] for d in after})
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {len(new_ids)} new donations listed for {accepted} accepted requests")
+
+        ok = abs(increment - donated) < 0.005
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} currentAmount grew by {increment:,.0f}, donations total {donated:,.0f}")
+    finally:
+        if probe:
+            client.delete(f"{BASE_URL}/projects/{project_id}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent donations to one project")
+    parser.add_argument('--count', type=int, default=2000, help="donations to send")
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--project', help="existing project id (default: a temporary probe project)")
+    parser.add_argument('--min-throughput', type=float, default=0.0, help="required donations per second")
+    parser.add_argument('--max-error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_burst(args.count, args.workers, args.project, args.min_throughput, args.max_error_rate)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -4,38 +4,13 @@ Final Comprehensive File Upload API Testing
 Tests all validation scenarios as requested with proper file sizes
 """
 
-import requests
 import json
 import io
-from PIL import Image
 
-BASE_URL = "https://music-admin-5.preview.emergentagent.com/api"
-
-def create_test_image(size_mb=1, format='JPEG'):
-    """Create a test image of specified size in MB"""
-    if size_mb <= 0.1:
-        width, height = 200, 200
-    elif size_mb <= 0.5:
-        width, height = 400, 400
-    elif size_mb <= 1:
-        width, height = 600, 600
-    elif size_mb <= 2:
-        width, height = 1000, 1000
-    else:
-        width, height = 1500, 1500
-    
-    img = Image.new('RGB', (width, height), color='red')
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format=format, quality=95)
-    img_bytes.seek(0)
-    
-    return img_bytes
-
-def create_large_file():
-    """Create a file definitely over 2MB"""
-    size_bytes = 3 * 1024 * 1024  # 3MB
-    data = b'A' * size_bytes
-    return io.BytesIO(data)
+from tests.config import BASE_URL
+from tests.fixtures import MB, create_large_file, create_test_image, upload_file
+from tests.http_client import client
+from tests.multipart import MultipartStream, stream_upload
 
 def test_final_comprehensive_upload():
     """Test all upload scenarios as specified in the requirements"""
@@ -50,7 +25,7 @@ def test_final_comprehensive_upload():
         test_image = create_test_image(1, 'JPEG')
         files = {'file': ('test.jpg', test_image, 'image/jpeg')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -80,7 +55,7 @@ def test_final_comprehensive_upload():
         test_image = create_test_image(0.5, 'PNG')
         files = {'file': ('test.png', test_image, 'image/png')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -101,7 +76,7 @@ def test_final_comprehensive_upload():
         test_image = create_test_image(0.3, 'GIF')
         files = {'file': ('test.gif', test_image, 'image/gif')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -122,7 +97,7 @@ def test_final_comprehensive_upload():
         test_image = create_test_image(0.4, 'WEBP')
         files = {'file': ('test.webp', test_image, 'image/webp')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -143,7 +118,7 @@ def test_final_comprehensive_upload():
         large_file = create_large_file()
         files = {'file': ('large.jpg', large_file, 'image/jpeg')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
@@ -171,7 +146,7 @@ def test_final_comprehensive_upload():
         text_content = b"This is not an image file"
         files = {'file': ('test.txt', io.BytesIO(text_content), 'text/plain')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
@@ -194,7 +169,7 @@ def test_final_comprehensive_upload():
     # Test 7: No file provided - SHOULD FAIL
     print("\n7. Testing no file provided - should reject...")
     try:
-        response = requests.post(f"{BASE_URL}/upload", files={'notfile': ('', '')})
+        response = client.post(f"{BASE_URL}/upload", files={'notfile': ('', '')})
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 400:
@@ -214,6 +189,69 @@ def test_final_comprehensive_upload():
         print(f"❌ ERROR: {str(e)}")
         test_results.append("❌ No file validation - error")
     
+    # Test 8: Exactly at the 2MB limit - SHOULD PASS
+    print("\n8. Testing file exactly at the 2MB limit - should accept...")
+    try:
+        files = {'file': upload_file('JPEG', 2 * MB, 'limit.jpg')}
+        
+        response = client.post(f"{BASE_URL}/upload", files=files)
+        print(f"Status Code: {response.status_code}")
+        
+        if response.status_code == 200:
+            print(f"✅ SUCCESS: Accepted file of exactly {2 * MB} bytes")
+            test_results.append("✅ Size limit boundary (2MB)")
+        else:
+            print(f"❌ FAILED: {response.text}")
+            test_results.append("❌ Size limit boundary (2MB)")
+    except Exception as e:
+        print(f"❌ ERROR: {str(e)}")
+        test_results.append("❌ Size limit boundary (2MB) - error")
+    
+    # Test 9: One byte over the 2MB limit - SHOULD FAIL
+    print("\n9. Testing file one byte over the 2MB limit - should reject...")
+    try:
+        files = {'file': upload_file('JPEG', 2 * MB + 1, 'over.jpg')}
+        
+        response = client.post(f"{BASE_URL}/upload", files=files)
+        print(f"Status Code: {response.status_code}")
+        
+        if response.status_code == 400 and "File too large" in response.json().get('error', ''):
+            print(f"✅ SUCCESS: Rejected file of {2 * MB + 1} bytes")
+            test_results.append("✅ Size limit boundary (2MB + 1)")
+        else:
+            print(f"❌ FAILED: Should have returned 400, got {response.status_code}")
+            print(f"   Response: {response.text}")
+            test_results.append("❌ Size limit boundary (2MB + 1)")
+    except Exception as e:
+        print(f"❌ ERROR: {str(e)}")
+        test_results.append("❌ Size limit boundary (2MB + 1) - error")
+    
+    # Test 10: Streamed 64MB upload - SHOULD FAIL before the body is sent
+    print("\n10. Testing streamed 64MB upload - should reject early...")
+    try:
+        stream = MultipartStream(size=64 * MB, filename='huge.jpg')
+        result = stream_upload(f"{BASE_URL}/upload", stream)
+        print(f"Status Code: {result['status']}")
+        
+        body = result['body'] if isinstance(result['body'], dict) else {}
+        reject_ms = (result['time_to_response'] or 0) * 1000
+        if result['error']:
+            print(f"❌ ERROR: {result['error']}")
+            test_results.append("❌ Streamed oversized upload - error")
+        elif (result['status'] == 400 and "File too large" in body.get('error', '')
+              and result['rejected_early'] and reject_ms < 500):
+            print(f"✅ SUCCESS: Rejected after {result['bytes_sent'] / MB:.1f}MB of {result['total_bytes'] / MB:.0f}MB "
+                  f"in {reject_ms:.0f}ms")
+            test_results.append("✅ Streamed oversized upload rejected early")
+        else:
+            print(f"❌ FAILED: status {result['status']}, rejected early: {result['rejected_early']}, "
+                  f"{reject_ms:.0f}ms")
+            print(f"   Response: {result['body']}")
+            test_results.append("❌ Streamed oversized upload rejected early")
+    except Exception as e:
+        print(f"❌ ERROR: {str(e)}")
+        test_results.append("❌ Streamed oversized upload - error")
+    
     # Summary
     print("\n" + "="*60)
     print("UPLOAD API TEST SUMMARY")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Learner Dashboard Testing
+GET /dashboard/learner selects only the course fields it reports (title,
+emoji, lesson count) instead of loading every lesson with its full
+content, and caches each user's dashboard until that user's progress or
+practice changes. The suite grows the lessons of a probe course in stages,
+each lesson carrying a large content body. At every stage it measures the
+payload size and the cold (first) and warm (repeat) latency of the
+dashboard for a set of enrolled learners, and fails if the payload grows
+with the course.
+
+It also checks that completing a lesson invalidates that learner's cached
+dashboard straight away. The probe course is deleted at the end, which
+removes its lessons, enrollments and progress
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+from tests.load import percentile
+
+TAG = "learner-dashboard-probe"
+
+def dashboard(user_id):
+    start = time.perf_counter()
+    response = client.get(f"{BASE_URL}/dashboard/learner", params={'userId': user_id})
+    return time.perf_counter() - start, response
+
+def measure(users, repeats):
+    """Payload bytes and p50 cold/warm latency over `users`"""
+    cold, warm, sizes = [], [], []
+    for user_id in users:
+        latency, response = dashboard(user_id)
+        cold.append(latency)
+        sizes.append(len(response.content))
+        for _ in range(repeats):
+            warm.append(dashboard(user_id)[0])
+    return max(sizes), percentile(sorted(cold), 50), percentile(sorted(warm), 50)
+
+def check_invalidation(user_id, lesson_id, course_id):
+    before = dashboard(user_id)[1]
+    dashboard(user_id)
+    client.post(f"{BASE_URL}/lesson-progress", json={"userId": user_id, "lessonId": lesson_id, "completed": True})
+    after = dashboard(user_id)[1]
+    course = next((c for c in after.json()['courses'] if c['id'] == course_id), None)
+    previous = next(c for c in before.json()['courses'] if c['id'] == course_id)['completedLessons']
+    if course and course['completedLessons'] == previous + 1:
+        cache_state = after.headers.get('X-Cache')
+        note = f" (X-Cache {cache_state})" if cache_state else ""
+        return f"✅ Completing a lesson shows on the next dashboard request{note}"
+    return f"❌ Dashboard after completing a lesson still shows {course and course['completedLessons']} lessons"
+
+def run_dashboard_suite(stages, learners=10, repeats=5, content_kb=20, max_growth=1.1, slack_bytes=512,
+                        workers=8):
+    """Grow the course stage by stage and return the number of failed checks"""
+    print("LEARNER DASHBOARD TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{learners} learners, {content_kb}KB of content per lesson, {repeats} warm requests per learner")
+    print("="*80)
+
+    response = client.post(f"{BASE_URL}/courses", json={"title": f"{TAG} course", "level": "Beginner"})
+    if response.status_code != 200:
+        print("❌ Could not create the probe course")
+        return 1
+    course_id = response.json()['id']
+    run_id = uuid.uuid4().hex[:8]
+    users = [f"{TAG}-{run_id}-{i}" for i in range(learners)]
+    content = "Lesson notes. " * (content_kb * 1024 // 14)
+
+    failures = 0
+    lessons = []
+    try:
+        for user_id in users:
+            client.post(f"{BASE_URL}/enrollments", json={"userId": user_id, "courseId": course_id})
+
+        def add_lesson(order):
+            response = client.post(f"{BASE_URL}/lessons", json={
+                "courseId": course_id, "title": f"{TAG} lesson {order + 1}", "order": order, "content": content
+            })
+            return response.json()['id'] if response.status_code == 200 else None
+
+        results = []
+        print(f"\n{'lessons':>8}{'payload bytes':>15}{'cold p50 ms':>13}{'warm p50 ms':>13}")
+        for count in stages:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                lessons.extend(i for i in pool.map(add_lesson, range(len(lessons), count)) if i)
+            # Touch progress so the first request of the stage is a cold one
+            for user_id in users:
+                client.post(f"{BASE_URL}/lesson-progress", json={"userId": user_id, "lessonId": lessons[0],
+                                                                 "watchTime": 1})
+            size, cold, warm = measure(users, repeats)
+            results.append((len(lessons), size, cold, warm))
+            print(f"{len(lessons):>8}{size:>15,}{cold * 1000:>13.2f}{warm * 1000:>13.2f}")
+
+        print("\nChecks:")
+        (first_lessons, first_size, _, _), (last_lessons, last_size, _, _) = results[0], results[-1]
+        budget = first_size * max_growth + slack_bytes
+        ok = last_size <= budget
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Payload {first_size:,} bytes at {first_lessons} lessons -> "
+              f"{last_size:,} bytes at {last_lessons} (budget {budget:,.0f})")
+
+        ok = all(warm <= cold for _, _, cold, warm in results)
+        print(f"{'✅' if ok else '⚠️ '} Warm (cached) requests no slower than cold ones at every stage")
+
+        line = check_invalidation(users[0], lessons[-1], course_id)
+        failures += line.startswith("❌")
+        print(line)
+    finally:
+        client.delete(f"{BASE_URL}/courses/{course_id}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Learner dashboard payload and latency as courses grow")
+    parser.add_argument('--stages', default="5,50,200", help="cumulative lessons in the probe course")
+    parser.add_argument('--learners', type=int, default=10)
+    parser.add_argument('--repeats', type=int, default=5, help="warm requests per learner")
+    parser.add_argument('--content-kb', type=int, default=20, help="content size per lesson")
+    parser.add_argument('--max-growth', type=float, default=1.1, help="allowed payload ratio last/first stage")
+    parser.add_argument('--slack-bytes', type=int, default=512)
+    args = parser.parse_args()
+    require_app()
+
+    stages = [int(s) for s in args.stages.split(',')]
+    failures = run_dashboard_suite(stages, args.learners, args.repeats, args.content_kb, args.max_growth,
+                                   args.slack_bytes)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import { Prisma } from '@prisma/client'
+import { v4 as uuidv4 } from 'uuid'
+import { approvalEmail, enqueueEmails, mailQueue, rejectionEmail } from '@/lib/mail'
+import { PasswordPoolBusyError, hashPassword } from '@/lib/passwords'
+import { prisma } from '@/lib/prisma'
+
+// Member application review, for one application or a whole audition
+// intake. Applications are loaded with one query, then approved or rejected
+// in chunks of APPLICATION_BATCH_SIZE. Each chunk is one transaction: the
+// member accounts go in with one insert, the applications are claimed and
+// linked to their members with one UPDATE that only matches rows still
+// PENDING, and the emails are queued with one insert. Temporary passwords
+// for the next chunk are hashed in the password pool while the current
+// chunk is written. A chunk that fails is retried one application at a
+// time, so one bad application does not fail the others.
+//
+// APPLICATION_BATCH_SIZE  applications per transaction (default 50)
+
+export const MAX_REVIEW_BATCH = 1000
+
+const BATCH_SIZE = parseInt(process.env.APPLICATION_BATCH_SIZE ?? '50')
+
+const VOCAL_PARTS = {
+  'soprano': 'SOPRANO',
+  'alto': 'ALTO',
+  'tenor': 'TENOR',
+  'bass': 'BASS'
+}
+
+// Raised inside a chunk's transaction when another review got to one of
+// its applications first
+class AlreadyProcessedError extends Error {}
+
+function generatePassword() {
+  return Math.random().toString(36).slice(-8) + 'G2!'
+}
+
+function chunked(items, size) {
+  const chunks = []
+  for (let i = 0; i < items.length; i += size) chunks.push(items.slice(i, i + size))
+  return chunks
+}
+
+function emailTaken(id) {
+  return { id, status: 'email_taken', error: 'A member with this email already exists' }
+}
+
+// Per-item result for a failed review
+function failure(id, error) {
+  if (error instanceof AlreadyProcessedError) {
+    return { id, status: 'already_processed', error: 'Application has already been processed' }
+  }
+  if (error instanceof PasswordPoolBusyError) return { id, status: 'busy', error: error.message }
+  if (error instanceof Prisma.PrismaClientKnownRequestError && error.code === 'P2002') return emailTaken(id)
+  return { id, status: 'failed', error: error.message }
+}
+
+// Load the applications behind `ids`. Returns a result for every id that
+// cannot be reviewed and the PENDING applications in request order.
+async function loadPending(ids) {
+  const results = new Map()
+  const found = await prisma.memberApplication.findMany({ where: { id: { in: ids } } })
+  const byId = new Map(found.map((application) => [application.id, application]))
+  const pending = []
+  for (const id of ids) {
+    const application = byId.get(id)
+    if (!application) results.set(id, { id, status: 'not_found', error: 'Application not found' })
+    else if (application.status !== 'PENDING') results.set(id, failure(id, new AlreadyProcessedError()))
+    else pending.push(application)
+  }
+  return { results, pending }
+}
+
+// Hash a temporary password for each application. Never rejects: an
+// application whose hash failed carries the error instead.
+async function hashChunk(applications) {
+  const passwords = applications.map(generatePassword)
+  const hashes = await Promise.allSettled(passwords.map((password) => hashPassword(password, 10)))
+  return applications.map((application, i) => ({
+    application,
+    password: passwords[i],
+    hash: hashes[i].value,
+    error: hashes[i].reason
+  }))
+}
+
+async function writeApprovals(items) {
+  const reviewedAt = new Date()
+  const members = items.map(({ application, hash }) => ({
+    id: uuidv4(),
+    email: application.email,
+    password: hash,
+    name: application.fullName,
+    phone: application.phone,
+    vocalPart: VOCAL_PARTS[application.vocalPart?.toLowerCase()] || 'NONE',
+    mustChangePassword: true
+  }))
+  await prisma.$transaction(async (tx) => {
+    await tx.member.createMany({ data: members })
+    const links = items.map(({ application }, i) => Prisma.sql`(${application.id}, ${members[i].id})`)
+    const claimed = await tx.$executeRaw`
+      UPDATE "MemberApplication" AS a
+      SET status = 'APPROVED', "reviewedAt" = ${reviewedAt}, "updatedAt" = ${reviewedAt}, "memberId" = v.member_id
+      FROM (VALUES ${Prisma.join(links)}) AS v(id, member_id)
+      WHERE a.id = v.id AND a.status = 'PENDING'`
+    if (claimed !== items.length) throw new AlreadyProcessedError()
+    await enqueueEmails(tx, items.map(({ application, password }) => approvalEmail(application, password)))
+  })
+  return items.map(({ application, password }, i) => ({
+    id: application.id,
+    status: 'approved',
+    member: { id: members[i].id, email: members[i].email, name: members[i].name, temporaryPassword: password }
+  }))
+}
+
+async function approveChunk(items, results) {
+  const hashed = []
+  for (const item of items) {
+    if (item.error) results.set(item.application.id, failure(item.application.id, item.error))
+    else hashed.push(item)
+  }
+  if (!hashed.length) return
+  try {
+    for (const result of await writeApprovals(hashed)) results.set(result.id, result)
+  } catch (error) {
+    if (hashed.length === 1) {
+      results.set(hashed[0].application.id, failure(hashed[0].application.id, error))
+      return
+    }
+    for (const item of hashed) await approveChunk([item], results)
+  }
+}
+
+// Approve applications, creating their member accounts and queueing the
+// welcome emails. Returns one result per distinct id, in request order.
+export async function approveApplications(ids, { batchSize = BATCH_SIZE } = {}) {
+  ids = [...new Set(ids)]
+  const { results, pending } = await loadPending(ids)
+
+  // Two applications with the same email (or an email that already has a
+  // member) would fail their whole chunk on the unique index, so settle
+  // that up front: the first application for an email wins
+  const taken = new Set((await prisma.member.findMany({
+    where: { email: { in: pending.map((application) => application.email) } },
+    select: { email: true }
+  })).map((member) => member.email))
+  const approvable = []
+  for (const application of pending) {
+    if (taken.has(application.email)) {
+      results.set(application.id, emailTaken(application.id))
+    } else {
+      taken.add(application.email)
+      approvable.push(application)
+    }
+  }
+
+  const chunks = chunked(approvable, batchSize)
+  let hashing = chunks.length ? hashChunk(chunks[0]) : null
+  for (let i = 0; i < chunks.length; i++) {
+    const items = await hashing
+    // Hash the next chunk while this one is written
+    hashing = i + 1 < chunks.length ? hashChunk(chunks[i + 1]) : null
+    await approveChunk(items, results)
+  }
+  if (approvable.length) mailQueue.wake()
+  return ids.map((id) => results.get(id))
+}
+
+async function writeRejections(applications, reason) {
+  await prisma.$transaction(async (tx) => {
+    const claimed = await tx.memberApplication.updateMany({
+      where: { id: { in: applications.map((application) => application.id) }, status: 'PENDING' },
+      data: { status: 'REJECTED', reviewedAt: new Date(), rejectionReason: reason || 'No reason provided' }
+    })
+    if (claimed.count !== applications.length) throw new AlreadyProcessedError()
+    await enqueueEmails(tx, applications.map((application) => rejectionEmail(application, reason)))
+  })
+}
+
+async function rejectChunk(applications, reason, results) {
+  try {
+    await writeRejections(applications, reason)
+    for (const { id } of applications) results.set(id, { id, status: 'rejected' })
+  } catch (error) {
+    if (applications.length === 1) {
+      results.set(applications[0].id, failure(applications[0].id, error))
+      return
+    }
+    for (const application of applications) await rejectChunk([application], reason, results)
+  }
+}
+
+// Reject applications with one reason and queue the emails. Returns one
+// result per distinct id, in request order.
+export async function rejectApplications(ids, reason, { batchSize = BATCH_SIZE } = {}) {
+  ids = [...new Set(ids)]
+  const { results, pending } = await loadPending(ids)
+  for (const chunk of chunked(pending, batchSize)) await rejectChunk(chunk, reason, results)
+  if (pending.length) mailQueue.wake()
+  return ids.map((id) => results.get(id))
+}
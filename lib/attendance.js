@@ -0,0 +1,79 @@
+import { v4 as uuidv4 } from 'uuid'
+import { prisma } from '@/lib/prisma'
+
+// Member attendance, for one member or a whole session's roster.
+// A session is an event type at a date; MemberAttendance is unique on
+// (memberId, eventType, date), so recording a member for a session twice
+// keeps the first record. The roster is written in one transaction: the
+// records go in with one insert that skips members already recorded, and
+// attendanceCount is incremented with one update for exactly the members
+// that insert added as present. Submitting the same roster again, or two
+// admins taking the same roll at once, never counts anyone twice.
+
+export const MAX_ROLL_CALL = 500
+
+// Validate a session's { eventType, eventTitle, date }; returns { error } or
+// the session. Without a date the session is today's (the start of the UTC
+// day, so posting again later the same day finds the same session).
+export function validateSession(body) {
+  if (!body?.eventType || typeof body.eventType !== 'string') return { error: 'eventType is required' }
+  const now = new Date()
+  const date = body.date == null ? new Date(Date.UTC(now.getUTCFullYear(), now.getUTCMonth(), now.getUTCDate())) : new Date(body.date)
+  if (isNaN(date.getTime())) return { error: 'date must be a valid date' }
+  return { eventType: body.eventType, eventTitle: body.eventTitle ?? null, date }
+}
+
+// Record attendance for `roster` ([{ memberId, present, notes }]) at one
+// session. Returns one result per entry, in roster order:
+// recorded (with the new record), already_recorded (with the existing one),
+// not_found, or duplicate for a member listed twice.
+export async function recordRollCall(session, roster) {
+  const seen = new Set()
+  const entries = roster.map((entry) => {
+    const duplicate = seen.has(entry.memberId)
+    seen.add(entry.memberId)
+    return { ...entry, duplicate }
+  })
+  const memberIds = [...seen]
+
+  const created = await prisma.$transaction(async (tx) => {
+    const members = await tx.member.findMany({ where: { id: { in: memberIds } }, select: { id: true } })
+    const known = new Set(members.map((member) => member.id))
+    const records = entries.filter((entry) => !entry.duplicate && known.has(entry.memberId)).map((entry) => ({
+      id: uuidv4(),
+      memberId: entry.memberId,
+      eventType: session.eventType,
+      eventTitle: session.eventTitle,
+      date: session.date,
+      present: entry.present !== false,
+      notes: entry.notes ?? null
+    }))
+    const inserted = records.length
+      ? await tx.memberAttendance.createManyAndReturn({ data: records, skipDuplicates: true })
+      : []
+
+    const present = inserted.filter((record) => record.present).map((record) => record.memberId)
+    if (present.length) {
+      await tx.member.updateMany({ where: { id: { in: present } }, data: { attendanceCount: { increment: 1 } } })
+      // An older session entered late must not move lastAttendance back
+      await tx.member.updateMany({
+        where: { id: { in: present }, OR: [{ lastAttendance: null }, { lastAttendance: { lt: session.date } }] },
+        data: { lastAttendance: session.date }
+      })
+    }
+    return { known, inserted }
+  })
+
+  const insertedBy = new Map(created.inserted.map((record) => [record.memberId, record]))
+  const skipped = memberIds.filter((id) => created.known.has(id) && !insertedBy.has(id))
+  const existingBy = new Map(skipped.length ? (await prisma.memberAttendance.findMany({
+    where: { memberId: { in: skipped }, eventType: session.eventType, date: session.date }
+  })).map((record) => [record.memberId, record]) : [])
+
+  return entries.map(({ memberId, duplicate }) => {
+    if (duplicate) return { memberId, status: 'duplicate', error: 'Member is listed more than once' }
+    if (!created.known.has(memberId)) return { memberId, status: 'not_found', error: 'Member not found' }
+    if (insertedBy.has(memberId)) return { memberId, status: 'recorded', attendance: insertedBy.get(memberId) }
+    return { memberId, status: 'already_recorded', attendance: existingBy.get(memberId) }
+  })
+}
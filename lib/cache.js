@@ -0,0 +1,182 @@
+import { createHash } from 'crypto'
+import { NextResponse } from 'next/server'
+
+// In-process TTL + LRU cache for public GET responses.
+// Entries are keyed by route and sorted query string and grouped under a
+// tag ('founders', 'gallery', ...). Admin mutations wrapped in
+// invalidates() drop their tag, so readers see changes immediately on
+// this instance; the TTL bounds staleness on any other instance.
+//
+// RESPONSE_CACHE_TTL_MS       entry lifetime (default 60000, 0 disables)
+// RESPONSE_CACHE_MAX_ENTRIES  LRU capacity (default 500)
+
+export class ResponseCache {
+  constructor({ ttl = 60000, maxEntries = 500 } = {}) {
+    this.ttl = ttl
+    this.maxEntries = maxEntries
+    this.entries = new Map() // key -> entry, least recently used first
+    this.inflight = new Map() // key -> Promise<entry> for concurrent misses
+    this.filling = new Map() // tag -> number of fills in flight
+    this.generations = new Map() // tag -> bumped by invalidations while filling
+    this.epoch = 0 // bumped by clear()
+    this.hits = 0
+    this.misses = 0
+  }
+
+  get(key) {
+    const entry = this.entries.get(key)
+    if (!entry) return null
+    if (entry.expires <= Date.now()) {
+      this.entries.delete(key)
+      return null
+    }
+    // Re-insert to mark as most recently used
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    return entry
+  }
+
+  set(key, entry) {
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value)
+    }
+  }
+
+  version(tag) {
+    return `${this.epoch}:${this.generations.get(tag) || 0}`
+  }
+
+  invalidate(tag) {
+    // Only fills already in flight can be affected; per-user tags would
+    // otherwise pile up here forever
+    if (this.filling.has(tag)) this.generations.set(tag, (this.generations.get(tag) || 0) + 1)
+    for (const [key, entry] of this.entries) {
+      if (entry.tag === tag) this.entries.delete(key)
+    }
+  }
+
+  clear() {
+    this.epoch++
+    this.entries.clear()
+  }
+
+  // Run `render` once per key however many requests miss at the same time.
+  // The result is stored only if no invalidation happened meanwhile.
+  async fill(key, tag, render) {
+    let pending = this.inflight.get(key)
+    if (!pending) {
+      const version = this.version(tag)
+      this.filling.set(tag, (this.filling.get(tag) || 0) + 1)
+      pending = render().then((entry) => {
+        if (entry.status === 200 && this.version(tag) === version) {
+          this.set(key, { ...entry, tag, expires: Date.now() + this.ttl })
+        }
+        return entry
+      }).finally(() => {
+        this.inflight.delete(key)
+        const fills = this.filling.get(tag) - 1
+        if (fills) {
+          this.filling.set(tag, fills)
+        } else {
+          this.filling.delete(tag)
+          this.generations.delete(tag)
+        }
+      })
+      this.inflight.set(key, pending)
+    }
+    return pending
+  }
+
+  stats() {
+    return { entries: this.entries.size, hits: this.hits, misses: this.misses }
+  }
+}
+
+export const responseCache = new ResponseCache({
+  ttl: parseInt(process.env.RESPONSE_CACHE_TTL_MS ?? '60000'),
+  maxEntries: parseInt(process.env.RESPONSE_CACHE_MAX_ENTRIES ?? '500')
+})
+
+async function renderEntry(response) {
+  const body = await response.text()
+  const headers = [...response.headers].filter(([name]) => name !== 'content-length')
+  const etag = `"${createHash('sha1').update(body).digest('base64url')}"`
+  return { status: response.status, headers, body, etag }
+}
+
+function matchesEtag(ifNoneMatch, etag) {
+  if (!ifNoneMatch) return false
+  return ifNoneMatch.split(',').some((tag) => {
+    const value = tag.trim().replace(/^W\//, '')
+    return value === '*' || value === etag
+  })
+}
+
+function toResponse(entry, request, status) {
+  const headers = new Headers(entry.headers)
+  headers.set('X-Cache', status)
+  if (entry.status !== 200) return new NextResponse(entry.body, { status: entry.status, headers })
+
+  headers.set('ETag', entry.etag)
+  // Clients may store the body but must revalidate, which is cheap: a 304
+  headers.set('Cache-Control', 'no-cache')
+  if (matchesEtag(request.headers.get('if-none-match'), entry.etag)) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+  return new NextResponse(entry.body, { status: 200, headers })
+}
+
+// Wrap a GET handler so its 200 responses are cached under `tag`, or
+// under tag(ctx) for per-user entries such as dashboards
+export function cached(tag, handler) {
+  return async (ctx) => {
+    if (!responseCache.ttl) return handler(ctx)
+
+    const url = new URL(ctx.request.url)
+    url.searchParams.sort()
+    const key = `${url.pathname}?${url.searchParams}`
+
+    const entry = responseCache.get(key)
+    if (entry) {
+      responseCache.hits++
+      return toResponse(entry, ctx.request, 'HIT')
+    }
+    responseCache.misses++
+    const entryTag = typeof tag === 'function' ? tag(ctx) : tag
+    const filled = await responseCache.fill(key, entryTag, async () => renderEntry(await handler(ctx)))
+    return toResponse(filled, ctx.request, 'MISS')
+  }
+}
+
+// Cache the result of `compute` under `key` and `tag`, for data shared by
+// many responses that are themselves per user. Keys must not start with
+// '/', which response keys do.
+export async function memoized(key, tag, compute) {
+  if (!responseCache.ttl) return compute()
+
+  const entry = responseCache.get(key)
+  if (entry) {
+    responseCache.hits++
+    return entry.value
+  }
+  responseCache.misses++
+  const filled = await responseCache.fill(key, tag, async () => ({ status: 200, value: await compute() }))
+  return filled.value
+}
+
+// Wrap an admin mutation so it drops the cached responses for `tags`
+// ('*' clears everything) once it has run, whether or not it succeeded
+export function invalidates(tags, handler) {
+  return async (ctx) => {
+    try {
+      return await handler(ctx)
+    } finally {
+      for (const tag of [].concat(tags)) {
+        if (tag === '*') responseCache.clear()
+        else responseCache.invalidate(tag)
+      }
+    }
+  }
+}
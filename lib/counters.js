@@ -0,0 +1,299 @@
+import { v4 as uuidv4 } from 'uuid'
+import { invalidateDashboard } from '@/lib/dashboard'
+import { Histogram } from '@/lib/metrics'
+import { prisma } from '@/lib/prisma'
+import { processSingleton } from '@/lib/singleton'
+
+// Write-behind counters.
+// Track plays, purchase downloads, lesson watch time and practice minutes
+// used to be a single-row increment on the request path, so a popular track
+// or a class watching the same lesson queued on one row lock. Routes now
+// add() to an in-memory buffer that sums increments per row, and a flush
+// writes each counter's rows with one statement every
+// COUNTER_FLUSH_INTERVAL_MS, taking each row's lock once per flush instead
+// of once per request. Rows are written in key order so instances flushing
+// at the same time cannot deadlock.
+//
+// The buffer is per process, so a crash loses what it held: at most one
+// interval of increments, or COUNTER_FLUSH_MAX_ROWS rows, whichever fills
+// first (a full buffer flushes early). SIGTERM and SIGINT flush before the
+// process exits. On Vercel neither the timer nor the signal handlers can be
+// relied on (a function instance is frozen between requests and recycled
+// without notice), so there the default is to write every increment
+// through; set COUNTER_FLUSH_INTERVAL_MS only on a long-running server.
+// pending() lets reads on this instance include increments not yet written.
+//
+// When a flush statement fails, its rows are written one at a time so one
+// bad row (e.g. a sum past the int column) does not hold back the rest.
+// Rows that still fail go back to the buffer for the next flush; one that
+// fails COUNTER_MAX_ATTEMPTS flushes while other rows are being written is
+// dropped and logged in full. A failure of every row (the database is
+// down) costs no attempts, so an outage loses nothing that stays buffered.
+// GET /admin/counters reports the oldest pending increment and the drops.
+//
+// COUNTER_FLUSH_INTERVAL_MS  how often the buffer is written (default 1000,
+//                            0 on Vercel; 0 writes every increment through)
+// COUNTER_FLUSH_MAX_ROWS     buffered rows that trigger an early flush (default 1000)
+// COUNTER_MAX_ATTEMPTS       failed flushes before a row is dropped (default 5)
+
+const config = {
+  intervalMs: parseInt(process.env.COUNTER_FLUSH_INTERVAL_MS ?? (process.env.VERCEL ? '0' : '1000')),
+  maxRows: parseInt(process.env.COUNTER_FLUSH_MAX_ROWS ?? '1000'),
+  maxAttempts: parseInt(process.env.COUNTER_MAX_ATTEMPTS ?? '5')
+}
+
+function column(rows, field) {
+  return rows.map((row) => row[field])
+}
+
+// Each counter: the fields that identify its row, the fields that add up,
+// and one statement that applies a flush's rows. Rows whose target is gone
+// (a deleted track or lesson) are skipped by the join.
+const COUNTERS = {
+  plays: {
+    keys: ['musicId'],
+    sums: ['plays'],
+    write: (rows) => prisma.$executeRaw`
+      UPDATE "Music" AS m SET plays = m.plays + v.plays
+      FROM unnest(${column(rows, 'musicId')}::text[], ${column(rows, 'plays')}::int[]) AS v(id, plays)
+      WHERE m.id = v.id`
+  },
+  downloads: {
+    keys: ['purchaseId'],
+    sums: ['downloads'],
+    write: (rows) => prisma.$executeRaw`
+      UPDATE "Purchase" AS p SET "downloadCount" = p."downloadCount" + v.downloads
+      FROM unnest(${column(rows, 'purchaseId')}::text[], ${column(rows, 'downloads')}::int[]) AS v(id, downloads)
+      WHERE p.id = v.id`
+  },
+  // Heartbeats may come before the progress row exists, so this is an upsert
+  watchTime: {
+    keys: ['userId', 'lessonId'],
+    sums: ['watchTime'],
+    users: true,
+    write: (rows) => prisma.$executeRaw`
+      INSERT INTO "LessonProgress" (id, "userId", "lessonId", "watchTime", "updatedAt")
+      SELECT v.id, v."userId", v."lessonId", v."watchTime", now()
+      FROM unnest(${rows.map(() => uuidv4())}::text[], ${column(rows, 'userId')}::text[],
+                  ${column(rows, 'lessonId')}::text[], ${column(rows, 'watchTime')}::int[])
+        AS v(id, "userId", "lessonId", "watchTime")
+      JOIN "Lesson" AS l ON l.id = v."lessonId"
+      ORDER BY v."userId", v."lessonId"
+      ON CONFLICT ("userId", "lessonId") DO UPDATE SET
+        "watchTime" = "LessonProgress"."watchTime" + EXCLUDED."watchTime",
+        "updatedAt" = EXCLUDED."updatedAt"`
+  },
+  // One practice session adds its minutes and one to the streak, as the
+  // upsert in POST /practice-sessions did
+  practice: {
+    keys: ['userId'],
+    sums: ['minutes', 'sessions'],
+    latest: 'practicedAt',
+    users: true,
+    write: (rows) => prisma.$executeRaw`
+      INSERT INTO "UserStats" (id, "userId", "totalPracticeMinutes", "currentStreak", "lastPracticeDate", "updatedAt")
+      SELECT v.id, v."userId", v.minutes, v.sessions, v."practicedAt", now()
+      FROM unnest(${rows.map(() => uuidv4())}::text[], ${column(rows, 'userId')}::text[],
+                  ${column(rows, 'minutes')}::int[], ${column(rows, 'sessions')}::int[],
+                  ${rows.map((row) => row.practicedAt.toISOString())}::timestamp(3)[])
+        AS v(id, "userId", minutes, sessions, "practicedAt")
+      ORDER BY v."userId"
+      ON CONFLICT ("userId") DO UPDATE SET
+        "totalPracticeMinutes" = "UserStats"."totalPracticeMinutes" + EXCLUDED."totalPracticeMinutes",
+        "currentStreak" = "UserStats"."currentStreak" + EXCLUDED."currentStreak",
+        "lastPracticeDate" = GREATEST("UserStats"."lastPracticeDate", EXCLUDED."lastPracticeDate"),
+        "updatedAt" = EXCLUDED."updatedAt"`
+  }
+}
+
+function rowKey(counter, row) {
+  return counter.keys.map((key) => row[key]).join('\u0000')
+}
+
+// Fold `row` (one increment, or a batch put back after a failed flush)
+// into the pending row with the same key
+function merge(counter, pending, row) {
+  const key = rowKey(counter, row)
+  const entry = pending.get(key)
+  if (!entry) {
+    pending.set(key, { ...row, increments: row.increments ?? 1, since: row.since ?? Date.now() })
+    return
+  }
+  for (const field of counter.sums) entry[field] += row[field]
+  if (counter.latest && row[counter.latest] > entry[counter.latest]) entry[counter.latest] = row[counter.latest]
+  entry.increments += row.increments ?? 1
+  entry.since = Math.min(entry.since, row.since ?? Date.now())
+  if (row.attempts) entry.attempts = Math.max(entry.attempts ?? 0, row.attempts)
+}
+
+// Write `rows` with one statement, or one row at a time when that fails.
+// Returns the rows written and { row, error } for the rest.
+async function writeRows(counter, rows) {
+  try {
+    await counter.write(rows)
+    return { written: rows, failed: [] }
+  } catch (error) {
+    if (rows.length === 1) return { written: [], failed: [{ row: rows[0], error }] }
+  }
+  const written = []
+  const failed = []
+  for (const row of rows) {
+    try {
+      await counter.write([row])
+      written.push(row)
+    } catch (error) {
+      failed.push({ row, error })
+    }
+  }
+  return { written, failed }
+}
+
+export class CounterBuffer {
+  constructor(options = {}) {
+    this.options = { ...config, ...options }
+    this.buffer = new Map(Object.keys(COUNTERS).map((name) => [name, new Map()]))
+    this.rows = 0
+    this.writing = null // the rows a running flush has yet to write
+    this.flushing = null
+    this.next = null
+    this.timer = null
+    this.flushes = 0
+    this.written = 0 // increments written
+    this.failures = 0
+    this.dropped = 0 // increments given up on
+    this.flushMs = new Histogram()
+  }
+
+  get buffered() {
+    return this.options.intervalMs > 0
+  }
+
+  // Flush on a timer that does not keep the process alive
+  start() {
+    if (this.timer || !this.buffered) return
+    this.timer = setInterval(() => this.flush(), this.options.intervalMs)
+    this.timer.unref?.()
+  }
+
+  // Count one increment, e.g. add('plays', { musicId, plays: 1 }). Resolves
+  // once buffered, or once written when write-behind is off.
+  async add(name, row) {
+    const counter = COUNTERS[name]
+    if (!this.buffered) {
+      await counter.write([row])
+      this.written++
+      if (counter.users) invalidateDashboard('learner', row.userId)
+      return
+    }
+    const pending = this.buffer.get(name)
+    const size = pending.size
+    merge(counter, pending, row)
+    this.rows += pending.size - size
+    if (this.rows >= this.options.maxRows) this.flush()
+  }
+
+  // The buffered amount of `field` for one row, for reads on this instance
+  pending(name, keys, field) {
+    const key = rowKey(COUNTERS[name], keys)
+    const buffered = this.buffer.get(name).get(key)?.[field] ?? 0
+    return buffered + (this.writing?.get(name)?.get(key)?.[field] ?? 0)
+  }
+
+  // Write everything buffered now. During a flush, the next one starts
+  // right after it, so the promise covers every increment added before this call.
+  flush() {
+    if (this.flushing) {
+      this.next ||= this.flushing.then(() => {
+        this.next = null
+        return this.flush()
+      })
+      return this.next
+    }
+    this.flushing = this.write()
+      .catch((error) => console.error('Counter flush failed:', error))
+      .finally(() => {
+        this.writing = null
+        this.flushing = null
+      })
+    return this.flushing
+  }
+
+  async write() {
+    const started = performance.now()
+    const batch = (this.writing = this.buffer)
+    this.buffer = new Map(Object.keys(COUNTERS).map((name) => [name, new Map()]))
+    this.rows = 0
+    for (const [name, pending] of batch) {
+      if (!pending.size) continue
+      const counter = COUNTERS[name]
+      const rows = [...pending.entries()].sort(([a], [b]) => (a < b ? -1 : 1)).map(([, row]) => row)
+      const { written, failed } = await writeRows(counter, rows)
+      batch.delete(name)
+      for (const row of written) this.written += row.increments
+      if (counter.users && written.length) invalidateDashboard('learner', ...column(written, 'userId'))
+      if (failed.length) this.requeue(name, failed, written.length > 0)
+    }
+    this.flushes++
+    this.flushMs.observe(performance.now() - started)
+  }
+
+  // Put rows that failed back for the next flush. `rejected` (other rows
+  // went through) counts the failure against each row, and a row past
+  // maxAttempts is dropped instead of blocking its counter for good.
+  requeue(name, failed, rejected) {
+    const counter = COUNTERS[name]
+    const pending = this.buffer.get(name)
+    this.failures++
+    console.error(`Writing ${failed.length} ${name} counters failed:`, failed[0].error)
+    for (const { row, error } of failed) {
+      const attempts = (row.attempts ?? 0) + (rejected ? 1 : 0)
+      if (attempts >= this.options.maxAttempts) {
+        this.dropped += row.increments
+        console.error(`Dropping ${name} counter ${JSON.stringify(row)} after ${attempts} failed writes:`, error)
+        continue
+      }
+      const size = pending.size
+      merge(counter, pending, { ...row, attempts })
+      this.rows += pending.size - size
+    }
+  }
+
+  stats() {
+    const counters = {}
+    let oldest = null
+    for (const [name, pending] of this.buffer) {
+      let increments = 0
+      for (const row of pending.values()) {
+        increments += row.increments
+        if (oldest === null || row.since < oldest) oldest = row.since
+      }
+      counters[name] = { rows: pending.size, increments }
+    }
+    return {
+      intervalMs: this.options.intervalMs,
+      maxRows: this.options.maxRows,
+      pending: counters,
+      oldestPendingAt: oldest === null ? null : new Date(oldest),
+      flushing: Boolean(this.flushing),
+      flushes: this.flushes,
+      written: this.written,
+      failures: this.failures,
+      dropped: this.dropped,
+      flushMs: this.flushMs
+    }
+  }
+}
+
+// Started with the buffer, so only once per process (not while
+// `next build` loads the routes)
+export const counters = processSingleton('counters', () => {
+  const buffer = new CounterBuffer()
+  if (process.env.NEXT_PHASE === 'phase-production-build') return buffer
+  buffer.start()
+  for (const signal of ['SIGTERM', 'SIGINT']) {
+    process.once(signal, () => {
+      buffer.flush().finally(() => process.kill(process.pid, signal))
+    })
+  }
+  return buffer
+})
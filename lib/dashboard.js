@@ -0,0 +1,231 @@
+import { prisma } from '@/lib/prisma'
+import { memoized, responseCache } from '@/lib/cache'
+import { NEWEST_FIRST } from '@/lib/pagination'
+import { getLeaderboard, getStatsSnapshot } from '@/lib/stats'
+
+// Dashboard queries.
+// Each dashboard reads exactly the columns its response uses through the
+// selects below, never whole related tables (a course's lessons carry
+// their full text content). Responses are cached per user in the response
+// cache under dashboardTag(); writes that change a user's dashboard call
+// invalidateDashboard() for that user, and the cache TTL bounds how long
+// shared data (schedule, practice tracks) can be stale. Donation sums come
+// from the totals maintained in lib/stats.js, not from the donation table.
+// The member dashboard caches the sections shared by a vocal part under
+// MEMBER_SECTIONS_TAG; practice track, schedule and announcement writes
+// drop them.
+
+export function dashboardTag(kind, userId) {
+  return `dashboard:${kind}:${userId}`
+}
+
+// Drop the cached `kind` dashboards of `userIds`
+export function invalidateDashboard(kind, ...userIds) {
+  for (const userId of new Set(userIds)) {
+    if (userId) responseCache.invalidate(dashboardTag(kind, userId))
+  }
+}
+
+const LEARNER_ENROLLMENT_SELECT = {
+  progress: true,
+  completedLessons: true,
+  course: { select: { id: true, title: true, emoji: true, totalLessons: true } }
+}
+
+export async function getLearnerDashboard(userId) {
+  const [
+    enrollments,
+    userStats,
+    userAchievements,
+    notifications,
+    schedule,
+    practiceTracks
+  ] = await Promise.all([
+    prisma.enrollment.findMany({
+      where: { userId },
+      select: LEARNER_ENROLLMENT_SELECT,
+      orderBy: { lastAccessedAt: 'desc' }
+    }),
+    prisma.userStats.findUnique({ where: { userId } }),
+    prisma.userAchievement.findMany({
+      where: { userId },
+      select: { earnedAt: true, achievement: true }
+    }),
+    prisma.notification.findMany({
+      where: { userId },
+      orderBy: { createdAt: 'desc' },
+      take: 5
+    }),
+    prisma.scheduleItem.findMany({
+      where: {
+        OR: [{ isPublic: true }, { userId }],
+        date: { gte: new Date() }
+      },
+      orderBy: { date: 'asc' },
+      take: 5
+    }),
+    prisma.practiceTrack.findMany({
+      where: { isPublished: true },
+      orderBy: { order: 'asc' },
+      take: 10
+    })
+  ])
+
+  // Calculate overall progress
+  const totalLessons = enrollments.reduce((sum, e) => sum + (e.course?.totalLessons || 0), 0)
+  const completedLessons = enrollments.reduce((sum, e) => sum + (e.completedLessons || 0), 0)
+  const overallProgress = totalLessons > 0 ? Math.round((completedLessons / totalLessons) * 100) : 0
+
+  return {
+    progress: {
+      overallProgress,
+      totalLessons,
+      completedLessons,
+      practiceHours: userStats ? Math.round(userStats.totalPracticeMinutes / 60 * 10) / 10 : 0,
+      currentStreak: userStats?.currentStreak || 0,
+      nextMilestone: completedLessons < 10 ? 'Complete 10 lessons' :
+                     completedLessons < 25 ? 'Complete 25 lessons' : 'Complete 50 lessons'
+    },
+    courses: enrollments.map(e => ({
+      id: e.course.id,
+      title: e.course.title,
+      emoji: e.course.emoji,
+      progress: e.progress,
+      totalLessons: e.course.totalLessons,
+      completedLessons: e.completedLessons
+    })),
+    practiceTracks,
+    achievements: userAchievements.map(ua => ({
+      ...ua.achievement,
+      earnedAt: ua.earnedAt
+    })),
+    notifications,
+    schedule,
+    stats: userStats || { currentStreak: 0, totalPracticeMinutes: 0, vocalPart: 'NONE' }
+  }
+}
+
+// Recent donations listed on the supporter dashboard; the full history is
+// paged through GET /donations?userId=
+const SUPPORTER_RECENT_DONATIONS = 20
+
+export async function getSupporterDashboard(userId) {
+  // Builds the donation totals on first use
+  await getStatsSnapshot()
+  const [donations, totals, topDonors] = await Promise.all([
+    prisma.donation.findMany({
+      where: { userId, status: 'COMPLETED' },
+      include: { project: { select: { title: true } } },
+      orderBy: NEWEST_FIRST,
+      take: SUPPORTER_RECENT_DONATIONS
+    }),
+    prisma.supporterTotal.findUnique({ where: { userId } }),
+    getLeaderboard(10)
+  ])
+
+  const totalDonations = totals?.amount || 0
+
+  return {
+    stats: {
+      totalDonations,
+      donationCount: totals?.donationCount || 0,
+      studentsSupported: Math.floor(totalDonations / 50000), // Estimate
+      badgesEarned: totalDonations >= 100000 ? 3 : totalDonations >= 50000 ? 2 : totalDonations > 0 ? 1 : 0
+    },
+    donations,
+    leaderboard: topDonors.map((d, i) => ({
+      rank: i + 1,
+      name: d.donorName || 'Anonymous',
+      amount: d.amount,
+      badge: d.amount >= 500000 ? 'Gold Patron' :
+             d.amount >= 250000 ? 'Silver Patron' : 'Bronze Patron'
+    })),
+    impact: {
+      learnersSupported: Math.floor(totalDonations / 50000),
+      lessonsEnabled: Math.floor(totalDonations / 5000),
+      songsRecorded: Math.floor(totalDonations / 100000)
+    }
+  }
+}
+
+export const MEMBER_SECTIONS_TAG = 'member-sections'
+
+// Practice tracks, schedule and announcements; the same for every member
+// of `vocalPart`
+function getMemberSections(vocalPart) {
+  return memoized(`${MEMBER_SECTIONS_TAG}:${vocalPart}`, MEMBER_SECTIONS_TAG, async () => {
+    const now = new Date()
+    const [practiceTracks, scheduleItems, announcements] = await Promise.all([
+      prisma.practiceTrack.findMany({
+        where: {
+          OR: [
+            { vocalPart },
+            { vocalPart: 'NONE' }
+          ],
+          isPublished: true
+        },
+        orderBy: { order: 'asc' }
+      }),
+      prisma.scheduleItem.findMany({
+        where: {
+          isPublic: true,
+          date: { gte: now }
+        },
+        orderBy: { date: 'asc' },
+        take: 10
+      }),
+      prisma.memberAnnouncement.findMany({
+        where: {
+          isPublished: true,
+          OR: [
+            { expiresAt: null },
+            { expiresAt: { gte: now } }
+          ]
+        },
+        orderBy: { publishedAt: 'desc' },
+        take: 10
+      })
+    ])
+    return { practiceTracks, scheduleItems, announcements }
+  })
+}
+
+// Returns null when the member does not exist
+export async function getMemberDashboard(memberId) {
+  const [member, attendanceRecords] = await Promise.all([
+    prisma.member.findUnique({
+      where: { id: memberId },
+      select: { id: true, name: true, email: true, vocalPart: true, image: true, attendanceCount: true }
+    }),
+    prisma.memberAttendance.findMany({
+      where: { memberId },
+      orderBy: { date: 'desc' },
+      take: 20
+    })
+  ])
+  if (!member) return null
+
+  const sections = await getMemberSections(member.vocalPart)
+  // Cached sections may hold items that have since passed or expired
+  const now = new Date()
+  const scheduleItems = sections.scheduleItems.filter((item) => item.date >= now)
+  const announcements = sections.announcements.filter((a) => !a.expiresAt || a.expiresAt >= now)
+
+  // Calculate attendance stats
+  const totalAttendance = attendanceRecords.length
+  const presentCount = attendanceRecords.filter(r => r.present).length
+  const attendanceRate = totalAttendance > 0 ? Math.round((presentCount / totalAttendance) * 100) : 100
+
+  return {
+    member,
+    practiceTracks: sections.practiceTracks,
+    scheduleItems,
+    announcements,
+    attendanceRecords,
+    stats: {
+      attendanceRate,
+      totalAttendance,
+      presentCount
+    }
+  }
+}
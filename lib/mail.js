@@ -0,0 +1,351 @@
+import nodemailer from 'nodemailer'
+import { prisma } from '@/lib/prisma'
+import { processSingleton } from '@/lib/singleton'
+
+// Outbound mail queue.
+// Routes call enqueueEmail() (inside their transaction when they have one)
+// and return without waiting on SMTP. MailQueue claims due OutboundEmail
+// rows in batches, sends each batch over one pooled nodemailer transport
+// that keeps its SMTP connections open between batches, and reschedules
+// failures with exponential backoff. Rows live in Postgres, so mail
+// queued before a restart or crash is sent afterwards. A row left in
+// SENDING by a crash is claimed again after MAIL_STALE_MS. Sent and FAILED
+// rows drop their html, which may hold a temporary password, and a row
+// queued with an expiresAt (a reset link) is failed unsent once it passes.
+// Without SMTP_HOST nothing is sent and mail stays queued; the worker warns
+// once at startup and GET /admin/mail-queue reports configured: false.
+// A long-running server polls for due retries; on Vercel there is no timer
+// (an idle function is frozen), so GET /api/cron/mail drains the queue on
+// the schedule in vercel.json.
+//
+// SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD  the relay (no auth
+//                             without SMTP_USER; port 465 implies TLS)
+// MAIL_FROM                   sender (default "G2 Melody Choir" <SMTP_USER>)
+// MAIL_BATCH_SIZE             rows claimed per batch (default 20)
+// MAIL_MAX_CONNECTIONS        pooled SMTP connections (default 3)
+// MAIL_MAX_ATTEMPTS           attempts before a row is FAILED (default 6)
+// MAIL_RETRY_BASE_MS          first retry delay, doubled per attempt (default 30000)
+// MAIL_POLL_INTERVAL_MS       how often due retries are picked up (default
+//                             5000, 0 on Vercel)
+// MAIL_STALE_MS               age of a SENDING claim that is retaken (default 300000)
+
+const config = {
+  batchSize: parseInt(process.env.MAIL_BATCH_SIZE ?? '20'),
+  maxConnections: parseInt(process.env.MAIL_MAX_CONNECTIONS ?? '3'),
+  maxAttempts: parseInt(process.env.MAIL_MAX_ATTEMPTS ?? '6'),
+  retryBaseMs: parseInt(process.env.MAIL_RETRY_BASE_MS ?? '30000'),
+  pollMs: parseInt(process.env.MAIL_POLL_INTERVAL_MS ?? (process.env.VERCEL ? '0' : '5000')),
+  staleMs: parseInt(process.env.MAIL_STALE_MS ?? '300000')
+}
+
+function createTransport() {
+  const port = parseInt(process.env.SMTP_PORT || '587')
+  return nodemailer.createTransport({
+    pool: true,
+    maxConnections: config.maxConnections,
+    host: process.env.SMTP_HOST,
+    port,
+    secure: port === 465,
+    auth: process.env.SMTP_USER
+      ? { user: process.env.SMTP_USER, pass: process.env.SMTP_PASSWORD }
+      : undefined
+  })
+}
+
+function sender() {
+  return process.env.MAIL_FROM || `"G2 Melody Choir" <${process.env.SMTP_USER}>`
+}
+
+// Queue one email; `db` may be a transaction client so the mail is only
+// queued if the change that causes it commits. Call mailQueue.wake() once
+// that has happened. Mail with an `expiresAt` is not sent after it.
+export function enqueueEmail(db, { to, subject, html, expiresAt }) {
+  return db.outboundEmail.create({ data: { to, subject, html, expiresAt }, select: { id: true } })
+}
+
+// Queue several emails with one insert, under the same rules as enqueueEmail()
+export function enqueueEmails(db, emails) {
+  return db.outboundEmail.createMany({
+    data: emails.map(({ to, subject, html, expiresAt }) => ({ to, subject, html, expiresAt }))
+  })
+}
+
+// Delay before attempt `attempts + 1`, with jitter so a relay outage does
+// not bring every retry back at the same moment
+export function retryDelay(attempts, baseMs = config.retryBaseMs) {
+  const delay = baseMs * 2 ** (attempts - 1)
+  return Math.round(delay * (0.75 + Math.random() * 0.5))
+}
+
+export class MailQueue {
+  constructor(options = {}) {
+    this.options = { ...config, ...options }
+    this.transport = null
+    this.draining = null
+    this.again = false
+    this.timer = null
+    this.warned = false
+    this.sent = 0
+    this.retried = 0
+    this.failed = 0
+    this.expired = 0
+    this.batches = 0
+  }
+
+  get configured() {
+    return Boolean(process.env.SMTP_HOST)
+  }
+
+  // Poll for due retries; the timer does not keep the process alive
+  start() {
+    if (!this.configured && !this.warned) {
+      this.warned = true
+      console.warn('SMTP_HOST is not set: member emails, including temporary passwords, stay queued in OutboundEmail until it is')
+    }
+    if (this.timer || !this.options.pollMs) return
+    this.timer = setInterval(() => this.wake(), this.options.pollMs)
+    this.timer.unref?.()
+  }
+
+  // Drain the queue now, or again right after the running drain
+  wake() {
+    if (!this.configured) return
+    if (this.draining) {
+      this.again = true
+      return
+    }
+    this.draining = this.drain()
+      .catch((error) => console.error('Mail queue drain failed:', error))
+      .finally(() => {
+        this.draining = null
+        if (this.again) {
+          this.again = false
+          this.wake()
+        }
+      })
+  }
+
+  // Drain the queue and wait for it to empty, for the cron route
+  async run() {
+    const before = { sent: this.sent, retried: this.retried, failed: this.failed, expired: this.expired }
+    this.wake()
+    while (this.draining) await this.draining
+    return {
+      configured: this.configured,
+      sent: this.sent - before.sent,
+      retried: this.retried - before.retried,
+      failed: this.failed - before.failed,
+      expired: this.expired - before.expired
+    }
+  }
+
+  async drain() {
+    await this.expire()
+    let batch
+    while ((batch = await this.claim()).length) {
+      this.batches++
+      await this.send(batch)
+    }
+  }
+
+  // A reset link is no use once its token has expired: fail the rows still
+  // waiting for it and drop their html
+  async expire() {
+    const staleBefore = new Date(Date.now() - this.options.staleMs)
+    const { count } = await prisma.outboundEmail.updateMany({
+      where: {
+        expiresAt: { lte: new Date() },
+        OR: [{ status: 'PENDING' }, { status: 'SENDING', lockedAt: { lt: staleBefore } }]
+      },
+      data: { status: 'FAILED', html: null, lockedAt: null, lastError: 'Expired before it was sent' }
+    })
+    this.expired += count
+  }
+
+  // Mark up to batchSize due rows SENDING; SKIP LOCKED keeps instances
+  // from claiming the same rows
+  claim() {
+    const staleBefore = new Date(Date.now() - this.options.staleMs)
+    return prisma.$queryRaw`
+      UPDATE "OutboundEmail"
+      SET status = 'SENDING', "lockedAt" = now(), attempts = attempts + 1
+      WHERE id IN (
+        SELECT id FROM "OutboundEmail"
+        WHERE ((status = 'PENDING' AND "nextAttemptAt" <= now())
+           OR (status = 'SENDING' AND "lockedAt" < ${staleBefore}))
+          AND ("expiresAt" IS NULL OR "expiresAt" > now())
+        ORDER BY "nextAttemptAt"
+        LIMIT ${this.options.batchSize}
+        FOR UPDATE SKIP LOCKED
+      )
+      RETURNING id, "to", subject, html, attempts`
+  }
+
+  async send(batch) {
+    this.transport ||= createTransport()
+    const from = sender()
+    const results = await Promise.allSettled(batch.map((email) => this.transport.sendMail({
+      from,
+      to: email.to,
+      subject: email.subject,
+      html: email.html
+    })))
+
+    const sent = batch.filter((_, i) => results[i].status === 'fulfilled').map((email) => email.id)
+    if (sent.length) {
+      await prisma.outboundEmail.updateMany({
+        where: { id: { in: sent } },
+        data: { status: 'SENT', sentAt: new Date(), html: null, lockedAt: null, lastError: null }
+      })
+      this.sent += sent.length
+    }
+    for (const [i, email] of batch.entries()) {
+      if (results[i].status === 'fulfilled') continue
+      const error = results[i].reason
+      const exhausted = email.attempts >= this.options.maxAttempts
+      await prisma.outboundEmail.update({
+        where: { id: email.id },
+        data: {
+          status: exhausted ? 'FAILED' : 'PENDING',
+          // A row that will not be sent again keeps no credentials
+          ...(exhausted && { html: null }),
+          nextAttemptAt: new Date(Date.now() + retryDelay(email.attempts, this.options.retryBaseMs)),
+          lockedAt: null,
+          lastError: String(error?.message || error).slice(0, 1000)
+        }
+      })
+      if (exhausted) {
+        this.failed++
+        console.error(`Giving up on email ${email.id} after ${email.attempts} attempts:`, error)
+      } else {
+        this.retried++
+      }
+    }
+  }
+
+  async metrics() {
+    const rows = await prisma.outboundEmail.groupBy({ by: ['status'], _count: true })
+    const oldest = await prisma.outboundEmail.findFirst({
+      where: { status: 'PENDING' },
+      orderBy: { createdAt: 'asc' },
+      select: { createdAt: true }
+    })
+    const counts = { PENDING: 0, SENDING: 0, SENT: 0, FAILED: 0 }
+    for (const row of rows) counts[row.status] = row._count
+    return {
+      configured: this.configured,
+      emails: counts,
+      oldestPendingAt: oldest?.createdAt ?? null,
+      worker: {
+        draining: Boolean(this.draining),
+        batches: this.batches,
+        sent: this.sent,
+        retried: this.retried,
+        failed: this.failed,
+        expired: this.expired
+      },
+      transport: { maxConnections: this.options.maxConnections, batchSize: this.options.batchSize }
+    }
+  }
+}
+
+export const mailQueue = processSingleton('mailQueue', () => new MailQueue())
+
+// Pick up mail left queued by a previous process and later retries (not
+// while `next build` loads the routes)
+if (process.env.NEXT_PHASE !== 'phase-production-build') {
+  mailQueue.start()
+  mailQueue.wake()
+}
+
+// ==================== TEMPLATES ====================
+
+export function approvalEmail(application, generatedPassword) {
+  return {
+    to: application.email,
+    subject: '🎉 Welcome to G2 Melody Choir! Your Application Has Been Approved',
+    html: `
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+              <div style="text-align: center; margin-bottom: 30px;">
+                <h1 style="color: #f59e0b; margin: 0;">🎵 G2 Melody Choir</h1>
+              </div>
+              
+              <h2 style="color: #333;">Congratulations, ${application.fullName}!</h2>
+              
+              <p style="font-size: 16px; line-height: 1.6; color: #555;">
+                We are delighted to inform you that your application to join G2 Melody Choir has been <strong style="color: #10b981;">APPROVED</strong>!
+              </p>
+              
+              <div style="background: #f8fafc; border-radius: 10px; padding: 20px; margin: 20px 0; border-left: 4px solid #f59e0b;">
+                <h3 style="margin-top: 0; color: #333;">Your Member Login Credentials</h3>
+                <p style="margin: 5px 0;"><strong>Email:</strong> ${application.email}</p>
+                <p style="margin: 5px 0;"><strong>Temporary Password:</strong> <code style="background: #e5e7eb; padding: 2px 8px; border-radius: 4px;">${generatedPassword}</code></p>
+                <p style="margin: 5px 0;"><strong>Member Portal:</strong> <a href="${process.env.NEXT_PUBLIC_BASE_URL}/members/login" style="color: #f59e0b;">${process.env.NEXT_PUBLIC_BASE_URL}/members/login</a></p>
+              </div>
+              
+              <p style="font-size: 14px; color: #666; background: #fff3cd; padding: 10px; border-radius: 5px;">
+                ⚠️ <strong>Important:</strong> You will be required to change your password upon first login.
+              </p>
+              
+              <p style="font-size: 16px; line-height: 1.6; color: #555;">
+                We look forward to making beautiful music together!
+              </p>
+              
+              <p style="font-size: 14px; color: #888; margin-top: 30px;">
+                With musical blessings,<br>
+                <strong>The G2 Melody Team</strong>
+              </p>
+            </div>
+          `
+  }
+}
+
+export function rejectionEmail(application, reason) {
+  return {
+    to: application.email,
+    subject: 'G2 Melody Choir - Application Update',
+    html: `
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+              <div style="text-align: center; margin-bottom: 30px;">
+                <h1 style="color: #f59e0b; margin: 0;">🎵 G2 Melody Choir</h1>
+              </div>
+              
+              <h2 style="color: #333;">Dear ${application.fullName},</h2>
+              
+              <p style="font-size: 16px; line-height: 1.6; color: #555;">
+                Thank you for your interest in joining G2 Melody Choir. After careful review of your application, we regret to inform you that we are unable to offer you membership at this time.
+              </p>
+              
+              ${reason ? `
+          <div style="background: #f8fafc; border-radius: 10px; padding: 20px; margin: 20px 0; border-left: 4px solid #6b7280;">
+            <h3 style="margin-top: 0; color: #333;">Feedback</h3>
+            <p style="color: #555;">${reason}</p>
+          </div>
+          ` : ''}
+              
+              <p style="font-size: 16px; line-height: 1.6; color: #555;">
+                We encourage you to continue pursuing your musical journey, and you are welcome to apply again in the future.
+              </p>
+              
+              <p style="font-size: 14px; color: #888; margin-top: 30px;">
+                With best regards,<br>
+                <strong>The G2 Melody Team</strong>
+              </p>
+            </div>
+          `
+  }
+}
+
+export function passwordResetEmail(email, resetUrl) {
+  return {
+    to: email,
+    subject: 'Reset Your G2 Melody Password',
+    html: `
+        <h1>Password Reset</h1>
+        <p>You requested to reset your password.</p>
+        <p>Click the link below to reset your password (valid for 1 hour):</p>
+        <a href="${resetUrl}">Reset Password</a>
+        <p>If you didn't request this, please ignore this email.</p>
+      `
+  }
+}
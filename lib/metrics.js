@@ -0,0 +1,159 @@
+import { AsyncLocalStorage } from 'async_hooks'
+import { NextResponse } from 'next/server'
+import { processSingleton } from '@/lib/singleton'
+
+// Per-request instrumentation for the catch-all API route.
+// handleRoute() runs every request inside measureRequest(), which keeps a
+// small measurement in AsyncLocalStorage. The Prisma client (lib/prisma.js)
+// adds each query's duration to the measurement of the request that ran
+// it, so handlers need no changes to report their database time.
+// finishRequest() sends the numbers back in a Server-Timing header:
+//   dispatch  router lookup
+//   db        summed query time, with the query count in desc
+//   app       total minus db: handler code, serialization, password pool
+//   total     wall time until the response was returned
+// It also folds them into per-route histograms of wall time, database time,
+// query count and response size, served by GET /admin/metrics. Routes are
+// keyed by method and pattern ('GET /projects/:id'), so ids do not grow the
+// table.
+// A query is one Prisma operation: an include counts once even when Prisma
+// runs a statement per relation, while a findMany in a loop counts every
+// time, which is what makes an N+1 show up.
+// Query time includes the wait for a pooled connection. Queries a handler
+// runs concurrently can add up to more than the wall time. Work a request
+// sets off but does not wait for is dropped once the request has finished,
+// and a group commit (lib/donations.js) is charged to the request whose
+// donation opened the batch.
+
+// Upper bounds of the histogram buckets
+export const MS_BUCKETS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+const QUERY_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100]
+const BYTE_BUCKETS = [1024, 10240, 102400, 1048576, 10485760]
+
+export class Histogram {
+  constructor(bounds = MS_BUCKETS) {
+    this.bounds = bounds
+    this.count = 0
+    this.sum = 0
+    this.counts = bounds.map(() => 0)
+  }
+
+  observe(value) {
+    this.count++
+    this.sum += value
+    const index = this.bounds.findIndex((bound) => value <= bound)
+    if (index >= 0) this.counts[index]++
+  }
+
+  // Cumulative [upperBound, count] pairs like Prisma's metrics
+  toJSON() {
+    let total = 0
+    return {
+      count: this.count,
+      sum: this.sum,
+      buckets: this.bounds.map((bound, i) => [bound, (total += this.counts[i])])
+    }
+  }
+}
+
+class RouteStats {
+  constructor() {
+    this.errors = 0 // 5xx responses
+    this.wallMs = new Histogram()
+    this.dbMs = new Histogram()
+    this.queries = new Histogram(QUERY_BUCKETS)
+    this.bytes = new Histogram(BYTE_BUCKETS)
+  }
+
+  toJSON() {
+    return {
+      count: this.wallMs.count,
+      errors: this.errors,
+      wallMs: this.wallMs,
+      dbMs: this.dbMs,
+      queries: this.queries,
+      bytes: this.bytes
+    }
+  }
+}
+
+export class RequestMetrics {
+  constructor() {
+    this.since = new Date()
+    this.routes = new Map()
+  }
+
+  route(key) {
+    let stats = this.routes.get(key)
+    if (!stats) this.routes.set(key, (stats = new RouteStats()))
+    return stats
+  }
+
+  // Counts and histograms are cumulative; sample twice and diff for a window
+  toJSON() {
+    const keys = [...this.routes.keys()].sort()
+    return { since: this.since, routes: Object.fromEntries(keys.map((key) => [key, this.routes.get(key)])) }
+  }
+}
+
+// The Prisma client outlives dev-mode module reloads, so the store it
+// reports to has to as well
+const requestContext = processSingleton('requestContext', () => new AsyncLocalStorage())
+export const requestMetrics = processSingleton('requestMetrics', () => new RequestMetrics())
+
+// Run fn(measurement) with queries charged to this request
+export function measureRequest(fn) {
+  const measurement = { startedAt: performance.now(), dispatchMs: 0, dbMs: 0, queries: 0, finished: false }
+  return requestContext.run(measurement, () => fn(measurement))
+}
+
+// Called by the Prisma client after every query
+export function recordQuery(ms) {
+  const measurement = requestContext.getStore()
+  if (!measurement || measurement.finished) return
+  measurement.queries++
+  measurement.dbMs += ms
+}
+
+function duration(ms) {
+  return ms.toFixed(3)
+}
+
+// Count the body's bytes as it streams out; done(bytes) once it has
+function countBytes(response, done) {
+  if (!response.body) {
+    done(0)
+    return response
+  }
+  let bytes = 0
+  const counter = new TransformStream({
+    transform(chunk, controller) {
+      bytes += chunk.byteLength
+      controller.enqueue(chunk)
+    },
+    flush() {
+      done(bytes)
+    }
+  })
+  return new NextResponse(response.body.pipeThrough(counter), response)
+}
+
+// Add the Server-Timing header and record the request under `route`
+export function finishRequest(measurement, route, response) {
+  measurement.finished = true
+  const totalMs = performance.now() - measurement.startedAt
+  const { dispatchMs, dbMs, queries } = measurement
+  response.headers.append('Server-Timing', [
+    `dispatch;dur=${duration(dispatchMs)}`,
+    `db;dur=${duration(dbMs)};desc="${queries} ${queries === 1 ? 'query' : 'queries'}"`,
+    `app;dur=${duration(Math.max(0, totalMs - dbMs))}`,
+    `total;dur=${duration(totalMs)}`
+  ].join(', '))
+
+  const stats = requestMetrics.route(route)
+  if (response.status >= 500) stats.errors++
+  stats.wallMs.observe(totalMs)
+  stats.dbMs.observe(dbMs)
+  stats.queries.observe(queries)
+  return countBytes(response, (bytes) => stats.bytes.observe(bytes))
+}
@@ -0,0 +1,109 @@
+// Streaming multipart/form-data reader for route handlers.
+// Unlike request.formData() it never buffers a whole part: file bytes are
+// handed out chunk by chunk as they arrive, so callers can enforce size
+// limits and pipe straight to storage.
+
+const MAX_HEADER_SIZE = 16 * 1024
+
+export function getBoundary(contentType) {
+  const match = /boundary=(?:"([^"]+)"|([^;]+))/i.exec(contentType || '')
+  if (!contentType?.toLowerCase().startsWith('multipart/form-data') || !match) {
+    throw new Error('Content-Type was not one of "multipart/form-data" or "application/x-www-form-urlencoded".')
+  }
+  return match[1] || match[2].trim()
+}
+
+function parseHeaders(block) {
+  const headers = {}
+  for (const line of block.split('\r\n')) {
+    const index = line.indexOf(':')
+    if (index > 0) headers[line.slice(0, index).trim().toLowerCase()] = line.slice(index + 1).trim()
+  }
+  const disposition = headers['content-disposition'] || ''
+  const name = /\bname="([^"]*)"/i.exec(disposition)?.[1]
+  const filename = /\bfilename="([^"]*)"/i.exec(disposition)?.[1]
+  return { name, filename, contentType: headers['content-type'], headers }
+}
+
+export class MultipartReader {
+  constructor(body, boundary) {
+    if (!body) throw new Error('Request has no body')
+    this.reader = body.getReader()
+    this.delimiter = Buffer.from(`\r\n--${boundary}`)
+    // The first delimiter has no leading CRLF; prepend one so every
+    // delimiter looks the same
+    this.buffer = Buffer.from('\r\n')
+    this.done = false
+    this.bytesRead = 0
+  }
+
+  async fill() {
+    if (this.done) return false
+    const { value, done } = await this.reader.read()
+    if (done) {
+      this.done = true
+      return false
+    }
+    const chunk = Buffer.from(value.buffer, value.byteOffset, value.byteLength)
+    this.bytesRead += chunk.length
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk
+    return true
+  }
+
+  // Advance to the next part and return its headers, or null at the end
+  async nextPart() {
+    let index
+    while ((index = this.buffer.indexOf(this.delimiter)) === -1) {
+      // Drop preamble bytes that cannot be part of a delimiter
+      this.buffer = this.buffer.subarray(Math.max(0, this.buffer.length - this.delimiter.length + 1))
+      if (!(await this.fill())) return null
+    }
+    this.buffer = this.buffer.subarray(index + this.delimiter.length)
+
+    while (this.buffer.length < 2) {
+      if (!(await this.fill())) return null
+    }
+    if (this.buffer[0] === 0x2d && this.buffer[1] === 0x2d) return null // closing "--"
+
+    let end
+    while ((end = this.buffer.indexOf('\r\n\r\n')) === -1) {
+      if (this.buffer.length > MAX_HEADER_SIZE) throw new Error('Multipart headers too large')
+      if (!(await this.fill())) throw new Error('Unexpected end of multipart body')
+    }
+    const part = parseHeaders(this.buffer.subarray(2, end).toString('utf8'))
+    this.buffer = this.buffer.subarray(end + 4)
+    return part
+  }
+
+  // Yield the current part's body until the next delimiter
+  async *partData() {
+    while (true) {
+      const index = this.buffer.indexOf(this.delimiter)
+      if (index !== -1) {
+        if (index > 0) yield this.buffer.subarray(0, index)
+        this.buffer = this.buffer.subarray(index)
+        return
+      }
+      // Hold back enough bytes to catch a delimiter split across chunks
+      const safe = this.buffer.length - this.delimiter.length + 1
+      if (safe > 0) {
+        const chunk = this.buffer.subarray(0, safe)
+        this.buffer = this.buffer.subarray(safe)
+        yield chunk
+      }
+      if (!(await this.fill())) throw new Error('Unexpected end of multipart body')
+    }
+  }
+
+  async skipPart() {
+    // eslint-disable-next-line no-unused-vars
+    for await (const _ of this.partData()) { /* discard */ }
+  }
+
+  // Stop reading the request body
+  async cancel() {
+    if (this.done) return
+    this.done = true
+    await this.reader.cancel().catch(() => {})
+  }
+}
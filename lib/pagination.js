@@ -0,0 +1,89 @@
+// Keyset (cursor) pagination for list endpoints.
+// A client asks for a page with ?limit=N and continues with
+// ?cursor=<nextCursor>. The cursor carries the sort-key values of the last
+// row returned, so every page is a range scan from that row instead of an
+// OFFSET over everything before it. Without limit/cursor, endpoints keep
+// returning the full array for existing callers.
+
+export const DEFAULT_PAGE_SIZE = 50
+export const MAX_PAGE_SIZE = 200
+
+// Stable newest-first order; id breaks ties between equal timestamps
+export const NEWEST_FIRST = [{ createdAt: 'desc' }, { id: 'desc' }]
+
+function sortFields(orderBy) {
+  return orderBy.map((entry) => Object.entries(entry)[0])
+}
+
+export function encodeCursor(orderBy, row) {
+  const values = sortFields(orderBy).map(([field]) => {
+    const value = row[field]
+    return value instanceof Date ? { $date: value.toISOString() } : value
+  })
+  return Buffer.from(JSON.stringify(values)).toString('base64url')
+}
+
+export function decodeCursor(orderBy, cursor) {
+  let values
+  try {
+    values = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'))
+  } catch {
+    return null
+  }
+  if (!Array.isArray(values) || values.length !== orderBy.length) return null
+  return values.map((value) => (value && value.$date ? new Date(value.$date) : value))
+}
+
+// Returns null when no page was requested, { error } for bad parameters,
+// otherwise { limit, cursor } for findPage
+export function getPageParams(url, orderBy = NEWEST_FIRST) {
+  const limitParam = url.searchParams.get('limit')
+  const cursorParam = url.searchParams.get('cursor')
+  if (limitParam === null && cursorParam === null) return null
+
+  const limit = limitParam === null ? DEFAULT_PAGE_SIZE : parseInt(limitParam)
+  if (Number.isNaN(limit) || limit < 1) {
+    return { error: 'limit must be a positive integer' }
+  }
+
+  const cursor = cursorParam ? decodeCursor(orderBy, cursorParam) : null
+  if (cursorParam && !cursor) return { error: 'Invalid cursor' }
+
+  return { limit: Math.min(limit, MAX_PAGE_SIZE), cursor }
+}
+
+// Rows strictly after `values` in orderBy order. The leading bound on the
+// first field lets the database start an index range scan at the cursor;
+// the OR only sorts out rows that tie on that field.
+function keysetWhere(orderBy, values) {
+  const fields = sortFields(orderBy)
+  const [first, firstDirection] = fields[0]
+  return {
+    AND: [
+      { [first]: { [firstDirection === 'desc' ? 'lte' : 'gte']: values[0] } },
+      {
+        OR: fields.map(([field, direction], i) => {
+          const clause = {}
+          for (let j = 0; j < i; j++) clause[fields[j][0]] = values[j]
+          clause[field] = { [direction === 'desc' ? 'lt' : 'gt']: values[i] }
+          return clause
+        })
+      }
+    ]
+  }
+}
+
+// findMany for one page; args.orderBy must end in a unique field
+export async function findPage(delegate, args, page) {
+  const { where, orderBy } = args
+  let pageWhere = where
+  if (page.cursor) {
+    const after = keysetWhere(orderBy, page.cursor)
+    pageWhere = where && Object.keys(where).length ? { AND: [where, after] } : after
+  }
+
+  const rows = await delegate.findMany({ ...args, where: pageWhere, take: page.limit + 1 })
+  const items = rows.slice(0, page.limit)
+  const nextCursor = rows.length > page.limit ? encodeCursor(orderBy, items[items.length - 1]) : null
+  return { items, nextCursor }
+}
@@ -0,0 +1,15 @@
+import { parentPort } from 'worker_threads'
+import bcrypt from 'bcryptjs'
+
+// A PasswordPool worker (lib/passwords.js): one bcrypt hash or compare per
+// message. The bundler follows `new Worker(new URL(...))` to this file and
+// emits it with bcryptjs included, so nothing resolves from node_modules
+// at runtime.
+parentPort.on('message', ({ op, password, arg }) => {
+  try {
+    const result = op === 'hash' ? bcrypt.hashSync(password, arg) : bcrypt.compareSync(password, arg)
+    parentPort.postMessage({ result })
+  } catch (error) {
+    parentPort.postMessage({ error: error.message })
+  }
+})
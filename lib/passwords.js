@@ -0,0 +1,141 @@
+import os from 'os'
+import { Worker } from 'worker_threads'
+import bcrypt from 'bcryptjs'
+import { Histogram } from '@/lib/metrics'
+import { processSingleton } from '@/lib/singleton'
+
+// Password hashing and verification off the event loop.
+// bcryptjs is pure JS: one cost-12 hash holds the thread for a few hundred
+// milliseconds, so a burst of logins used to stall every other request.
+// hashPassword() and verifyPassword() hand the work to a pool of worker
+// threads instead. At most PASSWORD_WORKERS jobs run at once, and the rest
+// wait in a queue of at most PASSWORD_QUEUE_LIMIT. Past that the call fails
+// fast with PasswordPoolBusyError (503) instead of piling up.
+//
+// PASSWORD_WORKERS      worker threads (default CPUs - 1, at least 1;
+//                       0 hashes inline on the event loop)
+// PASSWORD_QUEUE_LIMIT  jobs allowed to wait for a worker (default 200)
+//
+// Workers run lib/password-worker.js, which the build emits as its own
+// chunk.
+
+export class PasswordPoolBusyError extends Error {
+  constructor(queued) {
+    super('Too many password checks in progress, try again shortly')
+    this.name = 'PasswordPoolBusyError'
+    this.status = 503
+    this.queued = queued
+  }
+}
+
+export class PasswordPool {
+  constructor({ size = 1, maxQueue = 200 } = {}) {
+    this.size = size
+    this.maxQueue = maxQueue
+    this.workers = [] // { worker, job }, started on first use
+    this.queue = []
+    this.completed = 0
+    this.failed = 0
+    this.rejected = 0
+    this.waitMs = new Histogram()
+    this.runMs = new Histogram()
+  }
+
+  run(op, password, arg) {
+    if (!this.size) {
+      return op === 'hash' ? bcrypt.hash(password, arg) : bcrypt.compare(password, arg)
+    }
+    if (this.queue.length >= this.maxQueue) {
+      this.rejected++
+      return Promise.reject(new PasswordPoolBusyError(this.queue.length))
+    }
+    return new Promise((resolve, reject) => {
+      this.queue.push({ op, password, arg, resolve, reject, queuedAt: performance.now() })
+      this.pump()
+    })
+  }
+
+  idleWorker() {
+    const idle = this.workers.find((slot) => !slot.job)
+    if (idle) return idle
+    if (this.workers.length < this.size) return this.spawn()
+    return null
+  }
+
+  spawn() {
+    const slot = { worker: new Worker(new URL('./password-worker.js', import.meta.url)), job: null }
+    slot.worker.on('message', ({ result, error }) => {
+      const { job } = slot
+      slot.job = null
+      this.finish(job, error ? new Error(error) : null, result)
+      this.pump()
+    })
+    slot.worker.on('error', (error) => this.replace(slot, error))
+    slot.worker.on('exit', (code) => this.replace(slot, new Error(`Password worker exited with code ${code}`)))
+    // Idle workers must not keep the process alive
+    slot.worker.unref()
+    this.workers.push(slot)
+    return slot
+  }
+
+  // Fail the job a dead worker held and start a new worker for the queue
+  replace(slot, error) {
+    const index = this.workers.indexOf(slot)
+    if (index < 0) return
+    this.workers.splice(index, 1)
+    if (slot.job) this.finish(slot.job, error)
+    slot.job = null
+    this.pump()
+  }
+
+  pump() {
+    let slot
+    while (this.queue.length && (slot = this.idleWorker())) {
+      const job = this.queue.shift()
+      job.startedAt = performance.now()
+      this.waitMs.observe(job.startedAt - job.queuedAt)
+      slot.job = job
+      slot.worker.postMessage({ op: job.op, password: job.password, arg: job.arg })
+    }
+  }
+
+  finish(job, error, result) {
+    this.runMs.observe(performance.now() - job.startedAt)
+    if (error) {
+      this.failed++
+      job.reject(error)
+    } else {
+      this.completed++
+      job.resolve(result)
+    }
+  }
+
+  metrics() {
+    const busy = this.workers.filter((slot) => slot.job).length
+    return {
+      workers: { size: this.size, started: this.workers.length, busy, idle: this.workers.length - busy },
+      queue: { waiting: this.queue.length, limit: this.maxQueue },
+      jobs: { completed: this.completed, failed: this.failed, rejected: this.rejected },
+      waitMs: this.waitMs.toJSON(),
+      runMs: this.runMs.toJSON()
+    }
+  }
+}
+
+function defaultSize() {
+  const cpus = os.availableParallelism?.() ?? os.cpus().length
+  return Math.max(1, cpus - 1)
+}
+
+export const passwordPool = processSingleton('passwordPool', () => new PasswordPool({
+  size: parseInt(process.env.PASSWORD_WORKERS ?? String(defaultSize())),
+  maxQueue: parseInt(process.env.PASSWORD_QUEUE_LIMIT ?? '200')
+}))
+
+export function hashPassword(password, rounds) {
+  return passwordPool.run('hash', password, rounds)
+}
+
+export function verifyPassword(password, hash) {
+  return passwordPool.run('compare', password, hash)
+}
@@ -1,9 +1,88 @@
 import { PrismaClient } from '@prisma/client'
+import { recordQuery } from '@/lib/metrics'
+import { processSingleton } from '@/lib/singleton'
 
-const globalForPrisma = globalThis
+// Connection pool settings, applied as Prisma connection string parameters
+// unless DATABASE_URL already sets them:
+// DATABASE_POOL_SIZE        connections per instance (connection_limit;
+//                           Prisma's default is num_cpus * 2 + 1)
+// DATABASE_POOL_TIMEOUT     seconds a query may wait for a free connection
+//                           before failing (pool_timeout, default 10)
+// DATABASE_CONNECT_TIMEOUT  seconds to open a connection (connect_timeout, default 5)
+const POOL_PARAMS = {
+  connection_limit: process.env.DATABASE_POOL_SIZE,
+  pool_timeout: process.env.DATABASE_POOL_TIMEOUT,
+  connect_timeout: process.env.DATABASE_CONNECT_TIMEOUT
+}
 
-export const prisma = globalForPrisma.prisma ?? new PrismaClient()
+function pooledUrl(databaseUrl) {
+  const url = new URL(databaseUrl)
+  for (const [name, value] of Object.entries(POOL_PARAMS)) {
+    if (value && !url.searchParams.has(name)) url.searchParams.set(name, value)
+  }
+  return url.toString()
+}
 
-if (process.env.NODE_ENV !== 'production') globalForPrisma.prisma = prisma
+// Every query, raw ones included, is timed and charged to the API request
+// that ran it (lib/metrics.js)
+function instrumented(client) {
+  return client.$extends({
+    query: {
+      async $allOperations({ args, query }) {
+        const started = performance.now()
+        try {
+          return await query(args)
+        } finally {
+          recordQuery(performance.now() - started)
+        }
+      }
+    }
+  })
+}
+
+function createClient() {
+  if (!process.env.DATABASE_URL) return instrumented(new PrismaClient())
+  return instrumented(new PrismaClient({ datasources: { db: { url: pooledUrl(process.env.DATABASE_URL) } } }))
+}
+
+export const prisma = processSingleton('prisma', createClient)
+
+export function getPoolConfig() {
+  if (!process.env.DATABASE_URL) return {}
+  const params = new URL(pooledUrl(process.env.DATABASE_URL)).searchParams
+  const seconds = (name) => (params.has(name) ? parseInt(params.get(name)) : null)
+  return {
+    connectionLimit: seconds('connection_limit'),
+    poolTimeoutSeconds: seconds('pool_timeout'),
+    connectTimeoutSeconds: seconds('connect_timeout')
+  }
+}
+
+// Pool saturation from Prisma's metrics preview feature. Counters and the
+// wait histogram are cumulative; sample twice and diff for a rate.
+export async function getPoolMetrics() {
+  const { counters, gauges, histograms } = await prisma.$metrics.json()
+  const value = (list, key) => list.find((metric) => metric.key === key)?.value ?? 0
+  const wait = histograms.find((metric) => metric.key === 'prisma_client_queries_wait_histogram_ms')?.value
+
+  return {
+    pool: getPoolConfig(),
+    connections: {
+      open: value(gauges, 'prisma_pool_connections_open'),
+      busy: value(gauges, 'prisma_pool_connections_busy'),
+      idle: value(gauges, 'prisma_pool_connections_idle')
+    },
+    queries: {
+      active: value(gauges, 'prisma_client_queries_active'),
+      waiting: value(gauges, 'prisma_client_queries_wait'),
+      total: value(counters, 'prisma_client_queries_total')
+    },
+    waitMs: {
+      count: wait?.count ?? 0,
+      sum: wait?.sum ?? 0,
+      buckets: wait?.buckets ?? []
+    }
+  }
+}
 
 export default prisma
@@ -0,0 +1,146 @@
+import { v4 as uuidv4 } from 'uuid'
+import { counters } from '@/lib/counters'
+import { prisma } from '@/lib/prisma'
+
+// Lesson progress writes for POST /lesson-progress and its batch variant.
+// Enrollment.completedLessons and progress move by one only when a lesson
+// actually flips between incomplete and complete. The flip is a
+// conditional update on the progress row, so repeated or concurrent
+// "completed" posts count once, and nothing re-counts the course's lessons.
+// Events without `completed` (watch-time heartbeats) leave completion as
+// it is, and their watch time goes to the write-behind counters
+// (lib/counters.js) instead of a transaction. They still answer with the
+// progress row, its watch time including what is buffered on this
+// instance; the first heartbeat for a lesson creates the row so it has one.
+
+export const MAX_PROGRESS_BATCH = 500
+// LessonProgress.watchTime is an int4
+const MAX_WATCH_TIME = 2 ** 31 - 1
+
+// Returns an error message for a malformed event, otherwise null
+export function validateProgressEvent(event) {
+  if (!event || typeof event !== 'object') return 'Each event must be an object'
+  if (!event.userId || !event.lessonId) return 'userId and lessonId required'
+  if (event.watchTime !== undefined && !(Number.isInteger(event.watchTime) && Math.abs(event.watchTime) <= MAX_WATCH_TIME)) {
+    return 'watchTime must be a 32-bit integer'
+  }
+  if (event.completed !== undefined && typeof event.completed !== 'boolean') return 'completed must be a boolean'
+  return null
+}
+
+// Merge events for the same user and lesson: watch time adds up and the
+// last explicit `completed` wins
+function coalesce(events) {
+  const merged = new Map()
+  for (const { userId, lessonId, watchTime, completed } of events) {
+    const key = `${userId}\u0000${lessonId}`
+    const entry = merged.get(key) || { userId, lessonId, watchTime: 0, completed: undefined }
+    entry.watchTime += watchTime || 0
+    if (completed !== undefined) entry.completed = completed
+    merged.set(key, entry)
+  }
+  return merged
+}
+
+// Upsert one user's progress on one lesson. Returns the row and whether
+// this call flipped completion (+1, -1 or 0).
+async function applyEvent(tx, { userId, lessonId, watchTime, completed }) {
+  const { lesson, ...row } = await tx.lessonProgress.upsert({
+    where: { userId_lessonId: { userId, lessonId } },
+    update: { watchTime: watchTime ? { increment: watchTime } : undefined },
+    create: { id: uuidv4(), userId, lessonId, watchTime: watchTime || 0 },
+    include: { lesson: { select: { courseId: true, course: { select: { totalLessons: true } } } } }
+  })
+  const course = { courseId: lesson.courseId, totalLessons: lesson.course.totalLessons }
+  if (completed === undefined || completed === row.completed) return { row, course, delta: 0 }
+
+  const completedAt = completed ? new Date() : null
+  const { count } = await tx.lessonProgress.updateMany({
+    where: { id: row.id, completed: !completed },
+    data: { completed, completedAt }
+  })
+  if (!count) {
+    // A concurrent request flipped it first and counted it
+    return { row: await tx.lessonProgress.findUnique({ where: { id: row.id } }), course, delta: 0 }
+  }
+  return { row: { ...row, completed, completedAt }, course, delta: completed ? 1 : -1 }
+}
+
+// Move an enrollment's completed lesson count by `delta` and derive the
+// percentage from the new count in the same statement
+async function bumpEnrollment(tx, userId, { courseId, totalLessons }, delta) {
+  const now = new Date()
+  await tx.$executeRaw`
+    UPDATE "Enrollment" SET
+      "completedLessons" = "completedLessons" + ${delta}::int,
+      progress = CASE WHEN ${totalLessons}::int > 0
+        THEN ROUND(("completedLessons" + ${delta}::int) * 100.0 / ${totalLessons}::int)::int ELSE 0 END,
+      "completedAt" = CASE WHEN ${totalLessons}::int > 0
+        AND ROUND(("completedLessons" + ${delta}::int) * 100.0 / ${totalLessons}::int) >= 100
+        THEN COALESCE("completedAt", ${now}) ELSE NULL END,
+      "lastAccessedAt" = ${now}
+    WHERE "userId" = ${userId} AND "courseId" = ${courseId}`
+}
+
+function findProgress(keys) {
+  return prisma.lessonProgress.findMany({
+    where: { OR: keys.map(({ userId, lessonId }) => ({ userId, lessonId })) }
+  })
+}
+
+// Queue heartbeat-only events on the counters and return their progress
+// rows by key, with watch time not yet written added in
+async function recordHeartbeats(heartbeats) {
+  for (const { userId, lessonId, watchTime } of heartbeats) {
+    await counters.add('watchTime', { userId, lessonId, watchTime })
+  }
+  const rows = new Map()
+  const keep = (row) => rows.set(`${row.userId}\u0000${row.lessonId}`, {
+    ...row,
+    watchTime: row.watchTime + counters.pending('watchTime', row, 'watchTime')
+  })
+  for (const row of await findProgress(heartbeats)) keep(row)
+  const missing = heartbeats.filter(({ userId, lessonId }) => !rows.has(`${userId}\u0000${lessonId}`))
+  if (missing.length) {
+    // The flush adds the watch time; fails like the upsert did for a lesson that does not exist
+    await prisma.lessonProgress.createMany({
+      data: missing.map(({ userId, lessonId }) => ({ id: uuidv4(), userId, lessonId, watchTime: 0 })),
+      skipDuplicates: true
+    })
+    for (const row of await findProgress(missing)) keep(row)
+  }
+  return rows
+}
+
+// Apply progress events, the ones that set completion in one transaction.
+// Returns the resulting rows in the order their user and lesson first
+// appear.
+export async function recordProgress(events) {
+  const merged = coalesce(events)
+  const order = [...merged.keys()]
+  const heartbeats = [...merged].filter(([, event]) => event.completed === undefined)
+  for (const [key] of heartbeats) merged.delete(key)
+  const queued = heartbeats.length ? await recordHeartbeats(heartbeats.map(([, event]) => event)) : new Map()
+  if (!merged.size) return order.map((key) => queued.get(key))
+
+  const rows = await prisma.$transaction(async (tx) => {
+    const rows = new Map()
+    const enrollments = new Map()
+    // Rows are locked in key order so concurrent batches cannot deadlock
+    for (const [key, event] of [...merged].sort(([a], [b]) => (a < b ? -1 : 1))) {
+      const { row, course, delta } = await applyEvent(tx, event)
+      rows.set(key, row)
+      if (!delta) continue
+      const enrollmentKey = `${event.userId}\u0000${course.courseId}`
+      const entry = enrollments.get(enrollmentKey) || { userId: event.userId, course, delta: 0 }
+      entry.delta += delta
+      enrollments.set(enrollmentKey, entry)
+    }
+    for (const key of [...enrollments.keys()].sort()) {
+      const { userId, course, delta } = enrollments.get(key)
+      if (delta) await bumpEnrollment(tx, userId, course, delta)
+    }
+    return rows
+  }, { timeout: 15000 })
+  return order.map((key) => queued.get(key) ?? rows.get(key))
+}
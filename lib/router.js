@@ -0,0 +1,73 @@
+// Method + path trie for the catch-all API route.
+// Routes are registered once at module load; a lookup walks one node per
+// path segment, so dispatch cost no longer depends on where a route was
+// declared. Static segments win over :params at the same depth.
+
+function createNode() {
+  return { children: new Map(), param: null, handlers: new Map() }
+}
+
+function splitPath(path) {
+  return path.split('/').filter(Boolean)
+}
+
+function find(node, segments, index, method, values) {
+  if (index === segments.length) return node.handlers.get(method) || null
+
+  const child = node.children.get(segments[index])
+  if (child) {
+    const found = find(child, segments, index + 1, method, values)
+    if (found) return found
+  }
+  if (node.param) {
+    values.push(segments[index])
+    const found = find(node.param, segments, index + 1, method, values)
+    if (found) return found
+    values.pop()
+  }
+  return null
+}
+
+export class Router {
+  constructor() {
+    this.root = createNode()
+  }
+
+  // pattern is a path like '/projects/:id', or an array of aliases
+  add(method, pattern, handler) {
+    for (const path of [].concat(pattern)) {
+      let node = this.root
+      const names = []
+      for (const segment of splitPath(path)) {
+        if (segment.startsWith(':')) {
+          names.push(segment.slice(1))
+          node = node.param ||= createNode()
+        } else {
+          if (!node.children.has(segment)) node.children.set(segment, createNode())
+          node = node.children.get(segment)
+        }
+      }
+      if (node.handlers.has(method)) {
+        throw new Error(`Route already registered: ${method} ${path}`)
+      }
+      node.handlers.set(method, { handler, names, pattern: path })
+    }
+    return this
+  }
+
+  get(pattern, handler) { return this.add('GET', pattern, handler) }
+  post(pattern, handler) { return this.add('POST', pattern, handler) }
+  put(pattern, handler) { return this.add('PUT', pattern, handler) }
+  delete(pattern, handler) { return this.add('DELETE', pattern, handler) }
+
+  // Returns { handler, params, pattern } or null
+  match(method, path) {
+    const values = []
+    const route = find(this.root, splitPath(path), 0, method, values)
+    if (!route) return null
+
+    const params = {}
+    route.names.forEach((name, i) => { params[name] = values[i] })
+    return { handler: route.handler, params, pattern: route.pattern }
+  }
+}
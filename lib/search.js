@@ -0,0 +1,76 @@
+import { Prisma } from '@prisma/client'
+import { prisma } from '@/lib/prisma'
+import { encodeCursor, getPageParams } from '@/lib/pagination'
+
+// Catalog search for GET /music?search=.
+// Music.title, artist and album carry pg_trgm GIN indexes (schema.prisma),
+// so a substring match is a bitmap index scan instead of an ILIKE over
+// every row. Every word of the query has to appear in one of the three
+// fields. The last word is matched as typed so far, so the same query
+// serves typeahead. Results are ranked by trigram word similarity, with
+// title weighted above artist above album and a bonus for titles that
+// start with the query. Pages continue from a (rank, id) cursor; without
+// limit/cursor the route still returns a plain array, now capped at one
+// page.
+// Words shorter than three characters have no trigrams to look up, so a
+// query made only of those scans the table; it stays correct, just slower.
+
+export const MIN_SEARCH_LENGTH = 2
+export const MAX_SEARCH_LENGTH = 100
+const MAX_TERMS = 8
+
+export const BEST_MATCH = [{ rank: 'desc' }, { id: 'asc' }]
+
+// Lowercased, single-spaced query, or null when there is nothing to search for
+export function normalizeSearch(search) {
+  const query = (search || '').trim().replace(/\s+/g, ' ').toLowerCase().slice(0, MAX_SEARCH_LENGTH)
+  return query.length >= MIN_SEARCH_LENGTH ? query : null
+}
+
+// getPageParams() for ranked results: null when no page was requested,
+// { error } for bad parameters, otherwise { limit, cursor }
+export function getSearchPageParams(url) {
+  const page = getPageParams(url, BEST_MATCH)
+  if (page?.cursor && (typeof page.cursor[0] !== 'number' || typeof page.cursor[1] !== 'string')) {
+    return { error: 'Invalid cursor' }
+  }
+  return page
+}
+
+function escapeLike(text) {
+  return text.replace(/[\\%_]/g, (c) => `\\${c}`)
+}
+
+function contains(column, text) {
+  return Prisma.sql`${Prisma.raw(column)} ILIKE ${`%${escapeLike(text)}%`}`
+}
+
+// One page of ranked matches; `page` is { limit, cursor }
+export async function searchMusic(query, { genre, artist } = {}, page) {
+  const terms = [...new Set(query.split(' '))].slice(0, MAX_TERMS)
+  const filters = terms.map((term) => Prisma.sql`(${contains('title', term)} OR ${contains('artist', term)} OR ${contains('album', term)})`)
+  if (genre) filters.push(Prisma.sql`genre = ${genre}`)
+  if (artist) filters.push(contains('artist', artist))
+
+  const rank = Prisma.sql`(
+    4 * word_similarity(${query}, title)
+    + 2 * word_similarity(${query}, artist)
+    + word_similarity(${query}, coalesce(album, ''))
+    + CASE WHEN title ILIKE ${`${escapeLike(query)}%`} THEN 2 ELSE 0 END
+  )::float8`
+  const after = page.cursor
+    ? Prisma.sql`WHERE rank < ${page.cursor[0]} OR (rank = ${page.cursor[0]} AND id > ${page.cursor[1]})`
+    : Prisma.empty
+
+  const rows = await prisma.$queryRaw`
+    SELECT * FROM (
+      SELECT *, ${rank} AS rank FROM "Music" WHERE ${Prisma.join(filters, ' AND ')}
+    ) AS matches
+    ${after}
+    ORDER BY rank DESC, id
+    LIMIT ${page.limit + 1}`
+
+  const items = rows.slice(0, page.limit)
+  const nextCursor = rows.length > page.limit ? encodeCursor(BEST_MATCH, items[items.length - 1]) : null
+  return { items: items.map(({ rank, ...music }) => music), nextCursor }
+}
@@ -0,0 +1,11 @@
+// Process-wide instances (the Prisma client, the metrics store, the
+// password pool, the mail queue, the counter buffer, the donation batcher).
+// `next dev` evaluates a module again on every change, which would open
+// another Prisma pool or start another worker each time. In development
+// the instance is kept on globalThis under `name` and reused by the next
+// evaluation; in production modules load once, so create() runs once.
+export function processSingleton(name, create) {
+  const instance = globalThis[name] ?? create()
+  if (process.env.NODE_ENV !== 'production') globalThis[name] = instance
+  return instance
+}
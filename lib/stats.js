@@ -0,0 +1,371 @@
+import { prisma } from '@/lib/prisma'
+
+// Materialized admin stats and donation totals.
+// StatsSnapshot keeps the running totals behind GET /admin/stats, DailyStats
+// one row per UTC day for the charts, and DonorTotal / SupporterTotal the
+// donation sums behind the supporter leaderboard and dashboard, so none of
+// those reads scan the donation, purchase or user tables. Writers record
+// their deltas with recordStats() and recordDonationTotals() inside the
+// transaction that makes the change.
+// recordStats() only inserts a StatsDelta row, so concurrent writers never
+// wait on the snapshot row or today's DailyStats row. Reads add the deltas
+// not yet folded in, in the same statement, and foldStats() moves them into
+// the snapshot and the daily rows every STATS_FOLD_ROWS deltas written on
+// an instance, or when a read finds that many waiting.
+// reconcileStats() rebuilds both from the source tables: on first use,
+// after deletes that cascade (a project and its donations), on
+// POST /admin/stats/reconcile, and in the background once the snapshot is
+// older than STATS_RECONCILE_INTERVAL_MS (default one hour), which bounds
+// drift from writes made outside the API.
+// Writers and folds hold a shared advisory lock until they commit and the
+// rebuild an exclusive one, so a rebuild waits for deltas in flight and
+// writers wait for the rebuild, instead of either failing or a delta being
+// lost or counted twice. The
+// snapshot and the donation totals are rebuilt in separate transactions
+// under separate locks, so a donation only waits on the totals while those
+// two tables are rewritten, not for the whole snapshot rebuild.
+
+const SNAPSHOT_ID = 'global'
+const SNAPSHOT_FIELDS = ['donationTotal', 'donationCount', 'purchaseTotal', 'purchaseCount', 'users', 'members']
+const DAILY_FIELDS = ['donationTotal', 'donationCount', 'purchaseTotal', 'purchaseCount', 'newUsers']
+const DELTA_FIELDS = [...SNAPSHOT_FIELDS, 'newUsers']
+
+// pg_advisory_xact_lock keys
+const STATS_LOCK = 720101
+const TOTALS_LOCK = 720102
+const FOLD_LOCK = 720103
+
+const RECONCILE_INTERVAL = parseInt(process.env.STATS_RECONCILE_INTERVAL_MS ?? '3600000')
+const FOLD_ROWS = parseInt(process.env.STATS_FOLD_ROWS ?? '1000')
+
+export const MAX_SERIES_DAYS = 731
+export const MAX_SERIES_MONTHS = 120
+
+function startOfDay(date) {
+  return new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), date.getUTCDate()))
+}
+
+function startOfMonth(date) {
+  return new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), 1))
+}
+
+// Snapshot delta for a user created with, or moved into (sign 1) or out of
+// (sign -1), `role`
+export function roleDelta(role, sign = 1) {
+  if (role === 'USER') return { users: sign }
+  if (role === 'MEMBER' || role === 'ADMIN') return { members: sign }
+  return {}
+}
+
+function pick(delta, fields) {
+  const values = {}
+  for (const field of fields) {
+    if (delta[field]) values[field] = delta[field]
+  }
+  return values
+}
+
+const increments = (values) => Object.fromEntries(Object.entries(values).map(([field, n]) => [field, { increment: n }]))
+
+let recorded = 0
+
+// Record a delta ({ donationTotal: 500, donationCount: 1, ... }) for the
+// snapshot and for the bucket of the day `at` falls in. `db` is the
+// transaction client of the write being counted.
+export async function recordStats(db, delta, at = new Date()) {
+  const values = pick(delta, DELTA_FIELDS)
+  if (!Object.keys(values).length) return
+  await db.$executeRaw`SELECT pg_advisory_xact_lock_shared(${STATS_LOCK})`
+  await db.statsDelta.create({ data: { date: startOfDay(at), ...values }, select: { id: true } })
+  // The fold cannot see this delta until the caller commits; it will be
+  // in the next one
+  if (FOLD_ROWS && ++recorded % FOLD_ROWS === 0) scheduleFold()
+}
+
+// Move the deltas into the snapshot and the daily rows. Skipped while
+// another fold runs, which takes whatever this one would have.
+export async function foldStats() {
+  return prisma.$transaction(async (tx) => {
+    const [{ locked }] = await tx.$queryRaw`SELECT pg_try_advisory_xact_lock(${FOLD_LOCK}) AS locked`
+    if (!locked) return 0
+    await tx.$executeRaw`SELECT pg_advisory_xact_lock_shared(${STATS_LOCK})`
+    const days = await tx.$queryRaw`
+      WITH folded AS (DELETE FROM "StatsDelta" RETURNING *)
+      SELECT date, SUM("donationTotal")::float AS "donationTotal", SUM("donationCount")::int AS "donationCount",
+             SUM("purchaseTotal")::float AS "purchaseTotal", SUM("purchaseCount")::int AS "purchaseCount",
+             SUM(users)::int AS users, SUM(members)::int AS members, SUM("newUsers")::int AS "newUsers",
+             COUNT(*)::int AS deltas
+      FROM folded
+      GROUP BY date
+      ORDER BY date`
+    if (!days.length) return 0
+
+    const snapshot = {}
+    for (const day of days) {
+      for (const field of SNAPSHOT_FIELDS) snapshot[field] = (snapshot[field] || 0) + day[field]
+    }
+    // A no-op before the first reconcile builds the row; the rebuild then
+    // counts these writes, which committed before it started
+    await tx.statsSnapshot.updateMany({ where: { id: SNAPSHOT_ID }, data: increments(pick(snapshot, SNAPSHOT_FIELDS)) })
+    for (const day of days) {
+      const daily = pick(day, DAILY_FIELDS)
+      if (!Object.keys(daily).length) continue
+      await tx.dailyStats.upsert({
+        where: { date: day.date },
+        create: { date: day.date, ...daily },
+        update: increments(daily)
+      })
+    }
+    return days.reduce((sum, day) => sum + day.deltas, 0)
+  }, { timeout: 30000 })
+}
+
+// Fold in the background without failing the request that asked for it
+export function scheduleFold() {
+  foldStats().catch((error) => console.error('Stats fold failed:', error))
+}
+
+function addTo(totals, key, amount) {
+  const total = totals.get(key) || { amount: 0, donationCount: 0 }
+  total.amount += amount
+  total.donationCount += 1
+  totals.set(key, total)
+}
+
+// Add completed donations to the leaderboard and per-supporter totals
+export async function recordDonationTotals(db, donations) {
+  await db.$executeRaw`SELECT pg_advisory_xact_lock_shared(${TOTALS_LOCK})`
+  const donors = new Map()
+  const supporters = new Map()
+  for (const donation of donations) {
+    if (donation.status !== 'COMPLETED') continue
+    if (!donation.anonymous) addTo(donors, donation.donorName || '', donation.amount)
+    if (donation.userId) addTo(supporters, donation.userId, donation.amount)
+  }
+  // Key order, so concurrent batches lock rows in the same order
+  for (const donorName of [...donors.keys()].sort()) {
+    const { amount, donationCount } = donors.get(donorName)
+    await db.donorTotal.upsert({
+      where: { donorName },
+      create: { donorName, amount, donationCount },
+      update: { amount: { increment: amount }, donationCount: { increment: donationCount } }
+    })
+  }
+  for (const userId of [...supporters.keys()].sort()) {
+    const { amount, donationCount } = supporters.get(userId)
+    await db.supporterTotal.upsert({
+      where: { userId },
+      create: { userId, amount, donationCount },
+      update: { amount: { increment: amount }, donationCount: { increment: donationCount } }
+    })
+  }
+}
+
+// Top donors by total donated
+export async function getLeaderboard(take = 10) {
+  return prisma.donorTotal.findMany({ orderBy: [{ amount: 'desc' }, { donorName: 'asc' }], take })
+}
+
+// Recompute the snapshot and the daily buckets from the source tables.
+// Under the exclusive lock no writer can commit a delta, so each statement
+// (read committed) sees every committed write, and writes still in flight
+// record their deltas after this commits. Every delta already recorded is
+// counted by the rebuild and dropped.
+async function rebuildStats() {
+  return prisma.$transaction(async (tx) => {
+    await tx.$executeRaw`SELECT pg_advisory_xact_lock(${STATS_LOCK})`
+    const donations = await tx.donation.aggregate({ where: { status: 'COMPLETED' }, _sum: { amount: true }, _count: true })
+    const purchases = await tx.purchase.aggregate({ where: { status: 'COMPLETED' }, _sum: { amount: true }, _count: true })
+    const users = await tx.user.count({ where: { role: 'USER' } })
+    const members = await tx.user.count({ where: { role: { in: ['MEMBER', 'ADMIN'] } } })
+    const days = await tx.$queryRaw`
+      SELECT date, SUM("donationTotal")::float AS "donationTotal", SUM("donationCount")::int AS "donationCount",
+             SUM("purchaseTotal")::float AS "purchaseTotal", SUM("purchaseCount")::int AS "purchaseCount",
+             SUM("newUsers")::int AS "newUsers"
+      FROM (
+        SELECT "createdAt"::date AS date, amount AS "donationTotal", 1 AS "donationCount",
+               0 AS "purchaseTotal", 0 AS "purchaseCount", 0 AS "newUsers"
+        FROM "Donation" WHERE status = 'COMPLETED'
+        UNION ALL
+        SELECT "createdAt"::date, 0, 0, amount, 1, 0 FROM "Purchase" WHERE status = 'COMPLETED'
+        UNION ALL
+        SELECT "createdAt"::date, 0, 0, 0, 0, 1 FROM "User"
+      ) AS events
+      GROUP BY date`
+
+    const values = {
+      donationTotal: donations._sum.amount || 0,
+      donationCount: donations._count,
+      purchaseTotal: purchases._sum.amount || 0,
+      purchaseCount: purchases._count,
+      users,
+      members,
+      reconciledAt: new Date()
+    }
+    await tx.statsDelta.deleteMany()
+    await tx.dailyStats.deleteMany()
+    if (days.length) await tx.dailyStats.createMany({ data: days })
+    return tx.statsSnapshot.upsert({
+      where: { id: SNAPSHOT_ID },
+      create: { id: SNAPSHOT_ID, ...values },
+      update: values
+    })
+  }, { timeout: 30000 })
+}
+
+// Recompute the leaderboard and per-supporter totals in their own
+// transaction and lock, so donations wait only for these two tables and
+// only while they are rewritten. The sums are computed first and swapped in
+// with one delete and one insert per table.
+async function rebuildDonationTotals() {
+  await prisma.$transaction(async (tx) => {
+    await tx.$executeRaw`SELECT pg_advisory_xact_lock(${TOTALS_LOCK})`
+    const donors = new Map()
+    const byDonor = await tx.donation.groupBy({
+      by: ['donorName'],
+      where: { status: 'COMPLETED', anonymous: false },
+      _sum: { amount: true },
+      _count: true
+    })
+    for (const row of byDonor) {
+      // Unnamed donations (null or "") share one row
+      const donorName = row.donorName || ''
+      const total = donors.get(donorName) || { donorName, amount: 0, donationCount: 0 }
+      total.amount += row._sum.amount || 0
+      total.donationCount += row._count
+      donors.set(donorName, total)
+    }
+    const bySupporter = await tx.donation.groupBy({
+      by: ['userId'],
+      where: { status: 'COMPLETED', userId: { not: null } },
+      _sum: { amount: true },
+      _count: true
+    })
+    await tx.donorTotal.deleteMany()
+    if (donors.size) await tx.donorTotal.createMany({ data: [...donors.values()] })
+    await tx.supporterTotal.deleteMany()
+    if (bySupporter.length) {
+      await tx.supporterTotal.createMany({
+        data: bySupporter.map((row) => ({ userId: row.userId, amount: row._sum.amount || 0, donationCount: row._count }))
+      })
+    }
+  }, { timeout: 30000 })
+}
+
+let reconciling = null
+
+// Rebuild the stats, joining a rebuild already running on this instance
+export function reconcileStats() {
+  if (!reconciling) {
+    reconciling = (async () => {
+      const snapshot = await rebuildStats()
+      await rebuildDonationTotals()
+      return snapshot
+    })().finally(() => { reconciling = null })
+  }
+  return reconciling
+}
+
+// Current snapshot with the deltas not yet folded in, read in one statement
+// so a concurrent fold is seen entirely or not at all. Built on first use
+// (together with the donation totals), refreshed in the background when
+// stale.
+export async function getStatsSnapshot() {
+  const [row] = await prisma.$queryRaw`
+    SELECT s.id, s."reconciledAt", s."updatedAt",
+           s."donationTotal" + d."donationTotal" AS "donationTotal", s."donationCount" + d."donationCount" AS "donationCount",
+           s."purchaseTotal" + d."purchaseTotal" AS "purchaseTotal", s."purchaseCount" + d."purchaseCount" AS "purchaseCount",
+           s.users + d.users AS users, s.members + d.members AS members, d.pending
+    FROM "StatsSnapshot" s
+    CROSS JOIN (
+      SELECT COALESCE(SUM("donationTotal"), 0)::float AS "donationTotal", COALESCE(SUM("donationCount"), 0)::int AS "donationCount",
+             COALESCE(SUM("purchaseTotal"), 0)::float AS "purchaseTotal", COALESCE(SUM("purchaseCount"), 0)::int AS "purchaseCount",
+             COALESCE(SUM(users), 0)::int AS users, COALESCE(SUM(members), 0)::int AS members, COUNT(*)::int AS pending
+      FROM "StatsDelta"
+    ) d
+    WHERE s.id = ${SNAPSHOT_ID}`
+  if (!row) return reconcileStats()
+  const { pending, ...snapshot } = row
+  if (RECONCILE_INTERVAL && Date.now() - snapshot.reconciledAt.getTime() > RECONCILE_INTERVAL) {
+    scheduleReconcile()
+  } else if (FOLD_ROWS && pending >= FOLD_ROWS) {
+    scheduleFold()
+  }
+  return snapshot
+}
+
+// Rebuild in the background, e.g. after a change the deltas cannot follow,
+// without failing the request that made it
+export function scheduleReconcile() {
+  reconcileStats().catch((error) => console.error('Stats reconcile failed:', error))
+}
+
+// Parse ?interval=day|month&from=YYYY-MM-DD&to=YYYY-MM-DD. Returns
+// { error } for bad parameters, otherwise { interval, from, to } as UTC
+// period starts. Defaults to the last 30 days or the last 12 months.
+export function getSeriesParams(url) {
+  const interval = url.searchParams.get('interval') || 'day'
+  if (interval !== 'day' && interval !== 'month') {
+    return { error: 'interval must be day or month' }
+  }
+  const floor = interval === 'day' ? startOfDay : startOfMonth
+
+  const parse = (name) => {
+    const value = url.searchParams.get(name)
+    if (!value) return null
+    const date = new Date(value)
+    return Number.isNaN(date.getTime()) ? undefined : floor(date)
+  }
+  let to = parse('to')
+  let from = parse('from')
+  if (to === undefined || from === undefined) return { error: 'from and to must be dates (YYYY-MM-DD)' }
+  if (!to) to = floor(new Date())
+  if (!from) {
+    from = interval === 'day'
+      ? new Date(to.getTime() - 29 * 86400000)
+      : new Date(Date.UTC(to.getUTCFullYear(), to.getUTCMonth() - 11, 1))
+  }
+  if (from > to) return { error: 'from must not be after to' }
+
+  const span = interval === 'day'
+    ? (to - from) / 86400000 + 1
+    : (to.getUTCFullYear() - from.getUTCFullYear()) * 12 + to.getUTCMonth() - from.getUTCMonth() + 1
+  const max = interval === 'day' ? MAX_SERIES_DAYS : MAX_SERIES_MONTHS
+  if (span > max) return { error: `At most ${max} ${interval}s per series` }
+
+  return { interval, from, to }
+}
+
+// Totals per day or month from `from` to `to` inclusive, with empty
+// periods filled in
+export async function getStatsSeries({ interval, from, to }) {
+  const next = interval === 'day'
+    ? (date) => new Date(date.getTime() + 86400000)
+    : (date) => new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth() + 1, 1))
+  const key = (date) => date.toISOString().slice(0, interval === 'day' ? 10 : 7)
+
+  const buckets = new Map()
+  for (let date = from; date <= to; date = next(date)) {
+    buckets.set(key(date), { period: key(date), ...Object.fromEntries(DAILY_FIELDS.map((field) => [field, 0])) })
+  }
+
+  // The daily rows and the deltas not yet folded into them, in one statement
+  const end = next(to)
+  const rows = await prisma.$queryRaw`
+    SELECT date, SUM("donationTotal")::float AS "donationTotal", SUM("donationCount")::int AS "donationCount",
+           SUM("purchaseTotal")::float AS "purchaseTotal", SUM("purchaseCount")::int AS "purchaseCount",
+           SUM("newUsers")::int AS "newUsers"
+    FROM (
+      SELECT date, "donationTotal", "donationCount", "purchaseTotal", "purchaseCount", "newUsers"
+      FROM "DailyStats" WHERE date >= ${from} AND date < ${end}
+      UNION ALL
+      SELECT date, "donationTotal", "donationCount", "purchaseTotal", "purchaseCount", "newUsers"
+      FROM "StatsDelta" WHERE date >= ${from} AND date < ${end}
+    ) AS days
+    GROUP BY date`
+  for (const row of rows) {
+    const bucket = buckets.get(key(row.date))
+    for (const field of DAILY_FIELDS) bucket[field] += row[field]
+  }
+  return [...buckets.values()]
+}
@@ -0,0 +1,127 @@
+import { createWriteStream } from 'fs'
+import { mkdir, rename, unlink } from 'fs/promises'
+import { once } from 'events'
+import path from 'path'
+import { v4 as uuidv4 } from 'uuid'
+import { v2 as cloudinary } from 'cloudinary'
+
+// Configure Cloudinary
+cloudinary.config({
+  cloud_name: process.env.NEXT_PUBLIC_CLOUDINARY_CLOUD_NAME,
+  api_key: process.env.NEXT_PUBLIC_CLOUDINARY_API_KEY,
+  api_secret: process.env.CLOUDINARY_API_SECRET,
+})
+
+const UPLOAD_DIR = path.join(process.cwd(), 'public', 'uploads')
+
+const EXTENSIONS = {
+  'image/jpeg': 'jpg',
+  'image/png': 'png',
+  'image/gif': 'gif',
+  'image/webp': 'webp'
+}
+
+// UPLOAD_STORAGE=local|cloudinary; defaults to Cloudinary when configured.
+// A production deploy without Cloudinary is an error, not a quiet switch to
+// public/uploads, which a serverless instance neither keeps nor serves.
+export function getStorageBackend() {
+  if (process.env.UPLOAD_STORAGE) return process.env.UPLOAD_STORAGE
+  if (process.env.CLOUDINARY_API_SECRET) return 'cloudinary'
+  if (process.env.NODE_ENV === 'production') {
+    throw new Error('Upload storage is not configured: set CLOUDINARY_API_SECRET, or UPLOAD_STORAGE=local')
+  }
+  return 'local'
+}
+
+// Wait for 'drain' when the stream is full; once() rejects on 'error'
+async function writeChunk(stream, chunk) {
+  if (!stream.write(chunk)) await once(stream, 'drain')
+}
+
+// Writes to public/uploads under a temporary name and renames on finish,
+// so an aborted upload never leaves a half-written file behind
+function createLocalUpload({ contentType }) {
+  const name = `${uuidv4()}.${EXTENSIONS[contentType] || 'bin'}`
+  const tempPath = path.join(UPLOAD_DIR, `.${name}.part`)
+  let stream = null
+
+  const open = async () => {
+    if (!stream) {
+      await mkdir(UPLOAD_DIR, { recursive: true })
+      stream = createWriteStream(tempPath)
+    }
+    return stream
+  }
+
+  return {
+    async write(chunk) {
+      await writeChunk(await open(), chunk)
+    },
+    async finish() {
+      const file = await open()
+      file.end()
+      await once(file, 'finish')
+      await rename(tempPath, path.join(UPLOAD_DIR, name))
+      return { url: `/uploads/${name}`, publicId: name, width: null, height: null }
+    },
+    async abort() {
+      if (!stream) return
+      // Wait for the descriptor to close; the file may not exist until then
+      const closed = once(stream, 'close')
+      stream.destroy()
+      await closed
+      await unlink(tempPath).catch(() => {})
+    }
+  }
+}
+
+// Streams the raw bytes to Cloudinary instead of a base64 data URI
+function createCloudinaryUpload() {
+  let settle
+  const result = new Promise((resolve, reject) => { settle = { resolve, reject } })
+  result.catch(() => {}) // an aborted upload rejects with nobody waiting
+
+  const stream = cloudinary.uploader.upload_stream(
+    {
+      folder: 'g2melody',
+      resource_type: 'image',
+      transformation: [
+        { quality: 'auto', fetch_format: 'auto' }
+      ]
+    },
+    (error, uploaded) => {
+      if (error) settle.reject(error)
+      else settle.resolve(uploaded)
+    }
+  )
+  stream.on('error', (error) => settle.reject(error))
+
+  // A failed upload is reported to the callback and may leave the stream
+  // without an 'error' or a 'drain' to wake a blocked write: race the result
+  const ended = result.then(() => { throw new Error('Cloudinary closed the upload early') })
+  ended.catch(() => {})
+
+  return {
+    write: (chunk) => Promise.race([writeChunk(stream, chunk), ended]),
+    async finish() {
+      stream.end()
+      const uploaded = await result
+      return {
+        url: uploaded.secure_url,
+        publicId: uploaded.public_id,
+        width: uploaded.width,
+        height: uploaded.height
+      }
+    },
+    async abort() {
+      stream.destroy()
+    }
+  }
+}
+
+export function createUpload(options) {
+  const backend = getStorageBackend()
+  if (backend === 'local') return createLocalUpload(options)
+  if (backend === 'cloudinary') return createCloudinaryUpload(options)
+  throw new Error(`Unknown upload storage backend: ${backend}`)
+}
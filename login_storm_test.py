@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Login Storm Testing
+Password hashing and checks run in a pool of worker threads
+(lib/passwords.js), so a burst of logins should not slow down requests that
+have nothing to do with passwords. The suite first measures a steady mix of
+unrelated GET routes on its own. It then repeats the mix while a storm of
+POST /members/login requests runs alongside, sampling
+GET /admin/password-pool throughout.
+
+It fails when the p99 of the unrelated GETs grows beyond the allowed ratio,
+when a login fails for any reason other than a 503 from the bounded queue,
+or when more workers are busy than the pool has.
+
+Probe members are created through POST /membership-application and its
+approve route. There is no route that deletes members, so they are named
+with the probe tag and left in place
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+
+TAG = "login-storm-probe"
+
+# Routes that never touch passwords
+CALLS = [
+    load.Call("settings", "GET", "/settings"),
+    load.Call("projects", "GET", "/projects"),
+    load.Call("donations", "GET", "/donations?limit=20"),
+]
+
+def create_member(run_id, index):
+    """Apply and approve one probe member; returns its credentials or None"""
+    email = f"{TAG}-{run_id}-{index}@example.com"
+    response = client.post(f"{BASE_URL}/membership-application", json={
+        "fullName": f"{TAG} {run_id} {index}", "email": email, "vocalPart": "tenor"
+    })
+    if response.status_code != 200:
+        return None
+    response = client.post(f"{BASE_URL}/admin/member-applications/{response.json()['applicationId']}/approve",
+                           json={})
+    if response.status_code != 200:
+        return None
+    return {"email": email, "password": response.json()['member']['temporaryPassword']}
+
+def fetch_password_pool():
+    response = client.get(f"{BASE_URL}/admin/password-pool")
+    return response.json() if response.status_code == 200 else None
+
+def sample_pool(stop, samples, interval):
+    while not stop.wait(interval):
+        metrics = fetch_password_pool()
+        if metrics is not None:
+            samples.append(metrics)
+
+def run_storm(members, login_workers, get_workers, duration, interval):
+    """Unrelated GETs and a login storm at the same time"""
+    rng = random.Random(0)
+    login = load.Call("POST /members/login", "POST", "/members/login", ok_status=(200, 503),
+                      build=lambda: {'json': rng.choice(members)})
+    stop, samples = threading.Event(), []
+    sampler = threading.Thread(target=sample_pool, args=(stop, samples, interval), daemon=True)
+    sampler.start()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        storm = pool.submit(load.run_load, [login], BASE_URL, workers=login_workers, duration=duration, seed=1)
+        gets = pool.submit(load.run_load, CALLS, BASE_URL, workers=get_workers, duration=duration)
+        storm, gets = storm.result(), gets.result()
+    stop.set()
+    sampler.join()
+    return storm, gets, samples
+
+def run_storm_suite(members=20, login_workers=32, get_workers=4, duration=5.0, max_growth=2.0, slack_ms=10.0,
+                    interval=0.1):
+    """Measure unrelated GETs before and during a login storm; return the number of failed checks"""
+    print("LOGIN STORM TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{members} probe members, {login_workers} login workers, {get_workers} GET workers, {duration:g}s per phase")
+    print("="*80)
+
+    before = fetch_password_pool()
+    if before is None:
+        print("❌ GET /admin/password-pool is unavailable")
+        return 1
+
+    run_id = uuid.uuid4().hex[:8]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        created = [m for m in pool.map(lambda i: create_member(run_id, i), range(members)) if m]
+    if len(created) < members:
+        print(f"❌ Only {len(created)} of {members} probe members could be created")
+        return 1
+    print(f"Created {members} probe members ({TAG}-{run_id}-*@example.com)")
+
+    quiet = load.run_load(CALLS, BASE_URL, workers=get_workers, duration=duration)
+    storm, gets, samples = run_storm(created, login_workers, get_workers, duration, interval)
+    quiet_gets, storm_gets = quiet.total().summary(quiet.elapsed), gets.total().summary(gets.elapsed)
+    logins = storm.total().summary(storm.elapsed)
+
+    print(f"\n{'phase':<14}{'GET req/s':>11}{'GET p50 ms':>12}{'GET p99 ms':>12}{'logins/s':>10}{'login p99 ms':>14}")
+    print(f"{'quiet':<14}{quiet_gets['throughput']:>11.1f}{quiet_gets['p50'] * 1000:>12.1f}"
+          f"{quiet_gets['p99'] * 1000:>12.1f}{'-':>10}{'-':>14}")
+    print(f"{'login storm':<14}{storm_gets['throughput']:>11.1f}{storm_gets['p50'] * 1000:>12.1f}"
+          f"{storm_gets['p99'] * 1000:>12.1f}{logins['throughput']:>10.1f}{logins['p99'] * 1000:>14.1f}")
+    if samples:
+        busiest = max(s['workers']['busy'] for s in samples)
+        deepest = max(s['queue']['waiting'] for s in samples)
+        print(f"Password pool: {samples[0]['workers']['size']} workers, up to {busiest} busy "
+              f"and {deepest} queued (limit {samples[0]['queue']['limit']})")
+
+    print("\nChecks:")
+    failures = 0
+    budget = quiet_gets['p99'] * max_growth + slack_ms / 1000
+    ok = storm_gets['p99'] <= budget and not storm_gets['errors']
+    failures += not ok
+    print(f"{'✅' if ok else '❌'} Unrelated GET p99 {quiet_gets['p99'] * 1000:.1f}ms quiet -> "
+          f"{storm_gets['p99'] * 1000:.1f}ms during the storm (budget {budget * 1000:.1f}ms), "
+          f"{storm_gets['errors']} errors")
+
+    rejected = logins['status'].get(503, 0)
+    ok = not logins['errors'] and logins['status'].get(200, 0) > 0
+    failures += not ok
+    print(f"{'✅' if ok else '❌'} {logins['count']} logins: {logins['status'].get(200, 0)} succeeded, "
+          f"{rejected} shed with 503, {logins['errors']} failed")
+
+    size = before['workers']['size']
+    if size and samples:
+        ok = all(s['workers']['busy'] <= size for s in samples)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Busy password workers never exceeded the pool size of {size}")
+    elif not size:
+        print("⚠️  PASSWORD_WORKERS=0: hashing runs on the event loop")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Unrelated GET latency during a login storm")
+    parser.add_argument('--members', type=int, default=20, help="probe members to create")
+    parser.add_argument('--login-workers', type=int, default=32)
+    parser.add_argument('--get-workers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per phase")
+    parser.add_argument('--max-growth', type=float, default=2.0, help="allowed GET p99 ratio storm/quiet")
+    parser.add_argument('--slack-ms', type=float, default=10.0)
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_storm_suite(args.members, args.login_workers, args.get_workers, args.duration,
+                               args.max_growth, args.slack_ms)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
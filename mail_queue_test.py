@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Mail Queue Testing
+Approving or rejecting a member application and POST /auth/forgot-password
+queue their email (lib/mail.js) and return without waiting on SMTP. The
+queue delivers in batches over pooled, reused connections and retries
+temporary failures with backoff.
+
+The suite starts a local SMTP sink (tests/smtp_sink.py) whose greeting is
+slow, like a remote relay's handshake. The first deliveries get a
+temporary 451. It then approves and rejects a batch of probe applications
+concurrently and requests password resets for probe users.
+
+It fails if the admin responses wait on SMTP, if any recipient does not
+get exactly one email with the right subject, or if the queue opened
+about as many connections as it sent messages.
+
+The API must send mail to the sink. Start it with SMTP_HOST=127.0.0.1 and
+SMTP_PORT=<--smtp-port>.
+Probe applications, members and users are named with the probe tag and
+left in place, since no route deletes them.
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+from tests.load import percentile
+from tests.smtp_sink import SmtpSink
+
+TAG = "mail-queue-probe"
+APPROVAL_SUBJECT = "🎉 Welcome to G2 Melody Choir! Your Application Has Been Approved"
+REJECTION_SUBJECT = "G2 Melody Choir - Application Update"
+RESET_SUBJECT = "Reset Your G2 Melody Password"
+
+def timed_post(path, payload):
+    start = time.perf_counter()
+    response = client.post(f"{BASE_URL}{path}", json=payload)
+    return time.perf_counter() - start, response.status_code
+
+def apply(email, index):
+    response = client.post(f"{BASE_URL}/membership-application", json={
+        "fullName": f"{TAG} {index}", "email": email, "vocalPart": "alto"
+    })
+    return response.json()['applicationId'] if response.status_code == 200 else None
+
+def review(application_id, approve):
+    if approve:
+        return timed_post(f"/admin/member-applications/{application_id}/approve", {})
+    return timed_post(f"/admin/member-applications/{application_id}/reject", {"reason": "The choir is full this term"})
+
+def request_reset(email):
+    client.post(f"{BASE_URL}/register", json={"email": email, "password": uuid.uuid4().hex, "name": TAG})
+    return timed_post("/auth/forgot-password", {"email": email})
+
+def check_delivery(sink, expected):
+    """Problems with what the sink received, as a list of strings"""
+    problems = []
+    received = sink.received_by()
+    for email, subject in expected.items():
+        messages = received.get(email, [])
+        if len(messages) != 1:
+            problems.append(f"{email} got {len(messages)} emails")
+        elif messages[0]['subject'] != subject:
+            problems.append(f"{email} got '{messages[0]['subject']}'")
+    return problems
+
+def run_mail_suite(approvals=30, rejections=10, resets=5, smtp_host="127.0.0.1", smtp_port=2525,
+                   handshake_ms=300, fail_first=3, workers=8, timeout=60.0, max_response_ms=None):
+    """Review probe applications with a slow SMTP relay; return the number of failed checks"""
+    print("MAIL QUEUE TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"SMTP sink on {smtp_host}:{smtp_port}, {handshake_ms}ms handshake, first {fail_first} deliveries fail")
+    print(f"{approvals} approvals, {rejections} rejections, {resets} password resets, {workers} workers")
+    print("="*80)
+    max_response_ms = handshake_ms if max_response_ms is None else max_response_ms
+
+    run_id = uuid.uuid4().hex[:8]
+    applicants = [f"{TAG}-{run_id}-{i}@example.com" for i in range(approvals + rejections)]
+    users = [f"{TAG}-{run_id}-user-{i}@example.com" for i in range(resets)]
+
+    failures = 0
+    with SmtpSink(smtp_host, smtp_port, handshake_delay=handshake_ms / 1000, fail_first=fail_first) as sink:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            ids = list(pool.map(apply, applicants, range(len(applicants))))
+            if not all(ids):
+                print(f"❌ Only {sum(map(bool, ids))} of {len(ids)} probe applications were accepted")
+                return 1
+            started = time.perf_counter()
+            reviewed = list(pool.map(review, ids, [i < approvals for i in range(len(ids))]))
+            reset = list(pool.map(request_reset, users))
+        responded = time.perf_counter() - started
+
+        expected = {email: APPROVAL_SUBJECT if i < approvals else REJECTION_SUBJECT
+                    for i, email in enumerate(applicants)}
+        expected.update({email: RESET_SUBJECT for email in users})
+        missing = sink.wait_for(expected, timeout)
+        delivered = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in reviewed + reset)
+        errors = sum(1 for _, status in reviewed + reset if status != 200)
+        print(f"\n{'requests':>9}{'p50 ms':>9}{'p99 ms':>9}{'all answered s':>16}{'all delivered s':>17}"
+              f"{'messages':>10}{'connections':>13}")
+        print(f"{len(latencies):>9}{percentile(latencies, 50) * 1000:>9.1f}{percentile(latencies, 99) * 1000:>9.1f}"
+              f"{responded:>16.2f}{delivered:>17.2f}{len(sink.messages):>10}{sink.connections:>13}")
+        response = client.get(f"{BASE_URL}/admin/mail-queue")
+        queue = response.json() if response.status_code == 200 else None
+        if queue:
+            print(f"Queue: {queue.get('emails')}, worker {queue.get('worker')}")
+
+        print("\nChecks:")
+        p99 = percentile(latencies, 99) * 1000
+        ok = p99 <= max_response_ms and not errors
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Responses p99 {p99:.1f}ms with a {handshake_ms}ms SMTP handshake "
+              f"(budget {max_response_ms:g}ms), {errors} failed")
+
+        problems = check_delivery(sink, expected)
+        if missing:
+            problems.insert(0, f"{len(missing)} recipients got nothing within {timeout:g}s")
+        failures += bool(problems)
+        if problems:
+            print(f"❌ {len(problems)} delivery problems, e.g. {problems[0]}")
+        else:
+            print(f"✅ All {len(expected)} recipients got exactly one email with the right subject, "
+                  f"after {sink.failed} temporary failures")
+
+        ok = sink.connections * 2 <= len(sink.messages)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {len(sink.messages)} messages over {sink.connections} SMTP connections")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Queued member emails delivered to a local SMTP sink")
+    parser.add_argument('--approvals', type=int, default=30)
+    parser.add_argument('--rejections', type=int, default=10)
+    parser.add_argument('--resets', type=int, default=5, help="password reset requests")
+    parser.add_argument('--smtp-host', default="127.0.0.1")
+    parser.add_argument('--smtp-port', type=int, default=2525)
+    parser.add_argument('--handshake-ms', type=int, default=300, help="delay before the sink greets a connection")
+    parser.add_argument('--fail-first', type=int, default=3, help="deliveries answered with a temporary 451")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--timeout', type=float, default=60.0, help="seconds to wait for delivery")
+    parser.add_argument('--max-response-ms', type=float, help="response p99 budget (default: the handshake)")
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_mail_suite(args.approvals, args.rejections, args.resets, args.smtp_host, args.smtp_port,
+                              args.handshake_ms, args.fail_first, args.workers, args.timeout, args.max_response_ms)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
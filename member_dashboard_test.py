@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Member Dashboard Testing
+GET /members/dashboard fetches the member and their attendance
+concurrently. The practice tracks, schedule and announcements it also
+returns are the same for every member of a vocal part, so they come from a
+cache shared by that part, which practice track, schedule and announcement
+writes invalidate.
+
+The suite simulates a rehearsal-night login spike. Probe members spread
+over the four vocal parts all log in and open their dashboard at once, and
+the suite reports the latency of both routes. It then checks that every
+member sees only the practice tracks of their own part (or of all parts),
+that members of one part see the same sections, and that a new
+announcement shows on the next dashboard request and disappears once
+deleted.
+
+Probe members are created through POST /membership-application and its
+approve route. There is no route that deletes members, so they are named
+with the probe tag and left in place; pass --members 0 with --member-ids
+to reuse existing members instead
+"""
+
+import argparse
+import random
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+
+TAG = "member-dashboard-probe"
+PARTS = ("soprano", "alto", "tenor", "bass")
+
+def create_member(run_id, index):
+    """Apply and approve one probe member; returns its credentials or None"""
+    email = f"{TAG}-{run_id}-{index}@example.com"
+    response = client.post(f"{BASE_URL}/membership-application", json={
+        "fullName": f"{TAG} {run_id} {index}", "email": email, "vocalPart": PARTS[index % len(PARTS)]
+    })
+    if response.status_code != 200:
+        return None
+    response = client.post(f"{BASE_URL}/admin/member-applications/{response.json()['applicationId']}/approve",
+                           json={})
+    if response.status_code != 200:
+        return None
+    member = response.json()['member']
+    return {"id": member['id'], "email": email, "password": member['temporaryPassword']}
+
+def dashboard(member_id):
+    response = client.get(f"{BASE_URL}/members/dashboard", params={'memberId': member_id})
+    return response.json() if response.status_code == 200 else None
+
+def run_spike(members, requests_per_member, workers):
+    """Every member logs in and opens the dashboard, all at once"""
+    rng = random.Random(0)
+    calls = [load.Call("GET /members/dashboard", "GET", "/members/dashboard", weight=requests_per_member,
+                       build=lambda: {'params': {'memberId': rng.choice(members)['id']}})]
+    with_password = [m for m in members if m.get('password')]
+    if with_password:
+        calls.append(load.Call("POST /members/login", "POST", "/members/login", weight=1, build=lambda: {
+            'json': {key: value for key, value in rng.choice(with_password).items() if key != 'id'}
+        }))
+    total = len(members) * (requests_per_member + (1 if with_password else 0))
+    return load.run_load(calls, BASE_URL, workers=workers, total_requests=total)
+
+def check_sections(members):
+    """Problems with the shared sections, as a list of strings"""
+    problems = []
+    by_part = {}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        boards = list(pool.map(lambda m: dashboard(m['id']), members))
+    for member, board in zip(members, boards):
+        if board is None:
+            problems.append(f"member {member['id']} has no dashboard")
+            continue
+        part = board['member']['vocalPart']
+        foreign = [t['title'] for t in board['practiceTracks'] if t['vocalPart'] not in (part, 'NONE')]
+        if foreign:
+            problems.append(f"{part} member sees {', '.join(foreign)}")
+        sections = (board['practiceTracks'], board['scheduleItems'], board['announcements'])
+        if by_part.setdefault(part, sections) != sections:
+            problems.append(f"{part} members see different sections")
+    return problems
+
+def check_announcement(member_id):
+    response = client.post(f"{BASE_URL}/admin/member-announcements", json={
+        "title": f"{TAG} announcement", "content": "Rehearsal moved to 7 PM"
+    })
+    if response.status_code != 200:
+        return f"❌ POST /admin/member-announcements returned {response.status_code}"
+    announcement_id = response.json()['id']
+    try:
+        shown = any(a['id'] == announcement_id for a in dashboard(member_id)['announcements'])
+    finally:
+        client.delete(f"{BASE_URL}/admin/member-announcements/{announcement_id}")
+    gone = not any(a['id'] == announcement_id for a in dashboard(member_id)['announcements'])
+    if shown and gone:
+        return "✅ A new announcement shows on the next dashboard request and goes once deleted"
+    return f"❌ New announcement {'shown' if shown else 'not shown'}, {'gone' if gone else 'still shown'} after delete"
+
+def run_member_suite(count=40, member_ids=(), requests_per_member=5, workers=40, max_p99_ms=None):
+    """Run the login spike and return the number of failed checks"""
+    print("MEMBER DASHBOARD TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{count} probe members, {len(member_ids)} existing, {requests_per_member} dashboard requests per member, "
+          f"{workers} workers")
+    print("="*80)
+
+    run_id = uuid.uuid4().hex[:8]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        created = list(pool.map(lambda i: create_member(run_id, i), range(count)))
+    members = [m for m in created if m] + [{"id": member_id} for member_id in member_ids]
+    if len(members) < count + len(member_ids) or not members:
+        print(f"❌ Only {len(members)} of {count + len(member_ids)} members available")
+        return 1
+    if count:
+        print(f"Created {count} probe members ({TAG}-{run_id}-*@example.com)")
+
+    failures = 0
+    report = run_spike(members, requests_per_member, workers)
+    load.print_report(report)
+
+    print("\nChecks:")
+    summary = report.routes["GET /members/dashboard"].summary(report.elapsed)
+    ok = summary['errors'] == 0
+    failures += not ok
+    print(f"{'✅' if ok else '❌'} {summary['count']} dashboard requests, {summary['errors']} failed")
+    if max_p99_ms is not None:
+        ok = summary['p99'] * 1000 <= max_p99_ms
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Dashboard p99 {summary['p99'] * 1000:.1f}ms (budget {max_p99_ms:g}ms)")
+
+    problems = check_sections(members)
+    failures += bool(problems)
+    if problems:
+        print(f"❌ {len(problems)} problems with the shared sections, e.g. {problems[0]}")
+    else:
+        print("✅ Every member sees their part's sections, identical within each part")
+
+    line = check_announcement(members[0]['id'])
+    failures += line.startswith("❌")
+    print(line)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Member dashboard latency under a rehearsal-night login spike")
+    parser.add_argument('--members', type=int, default=40, help="probe members to create")
+    parser.add_argument('--member-ids', default="", help="comma-separated existing member ids to include")
+    parser.add_argument('--requests', type=int, default=5, help="dashboard requests per member")
+    parser.add_argument('--workers', type=int, default=40)
+    parser.add_argument('--max-p99-ms', type=float, help="fail when dashboard p99 exceeds this")
+    args = parser.parse_args()
+    require_app()
+
+    member_ids = [m for m in args.member_ids.split(',') if m]
+    failures = run_member_suite(args.members, member_ids, args.requests, args.workers, args.max_p99_ms)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Music Search Testing
+GET /music?search= is ranked search over title, artist and album
+(lib/search.js). It is backed by trigram indexes, so it runs as an index
+scan, not a sequential ILIKE over the catalog. Each word of the query must
+match. The last word may still be being typed, which gives typeahead.
+Results come best match first, in pages that continue from a cursor.
+
+The suite seeds a synthetic catalog (100k tracks by default) from a seeded
+RNG through POST /music. It then benchmarks four kinds of query for a
+fixed time: a whole word, a typeahead prefix, two words, and a word that
+matches nothing. It fails on a p99 over budget.
+
+It also seeds "needle" tracks under a word that exists only in this run
+and checks:
+- an exact title ranks first
+- a title match ranks above an artist match
+- a prefix finds the needles
+- walking the cursor returns every needle once
+- a search without limit returns one page, not the whole catalog
+- every result contains every query word
+
+Needles are deleted afterwards. The catalog stays, so --skip-seed can
+reuse it on the next run.
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+
+TAG = "music-search-probe"
+PAGE_SIZE = 50  # DEFAULT_PAGE_SIZE in lib/pagination.js
+DEFAULT_TRACKS = 100000
+
+TITLE_WORDS = (
+    "amazing", "grace", "glory", "holy", "praise", "light", "river", "mountain", "morning", "evening",
+    "shepherd", "kingdom", "mercy", "faithful", "blessed", "assurance", "jubilee", "harvest", "promise", "anthem",
+    "hallelujah", "hosanna", "zion", "calvary", "redeemer", "wonderful", "eternal", "peace", "joy", "heaven",
+    "rejoice", "sing", "shout", "abide", "rock", "ages", "sweet", "hour", "prayer", "trust",
+)
+FIRST_NAMES = ("Ngozi", "Emmanuel", "Grace", "Samuel", "Esther", "Blaise", "Ruth", "Daniel", "Miriam", "Joel",
+               "Hannah", "Paul", "Deborah", "Caleb", "Lydia", "Tobias", "Naomi", "Isaac", "Priscilla", "Elijah")
+LAST_NAMES = ("Mbah", "Fon", "Tabi", "Ndongo", "Eko", "Nkeng", "Achu", "Fomba", "Ebai", "Ngwa",
+              "Tanyi", "Bate", "Ayuk", "Njoh", "Mokake", "Ewane", "Takang", "Besong", "Ojong", "Enow")
+ENSEMBLES = ("Choir", "Singers", "Voices", "Ensemble", "Chorale", "Quartet")
+GENRES = ("Hymn", "Gospel", "Contemporary", "Choral", "Acapella")
+
+def synthetic_track(rng):
+    title = " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(2, 4))).title()
+    if rng.random() < 0.3:
+        artist = f"{rng.choice(LAST_NAMES)} {rng.choice(ENSEMBLES)}"
+    else:
+        artist = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    album = f"{rng.choice(TITLE_WORDS).title()} Sessions Vol. {rng.randint(1, 30)}" if rng.random() < 0.8 else None
+    return {"title": title, "artist": artist, "album": album, "genre": rng.choice(GENRES),
+            "duration": rng.randint(120, 420), "price": rng.choice((500, 1000, 1500)),
+            "isHymn": rng.random() < 0.4}
+
+def create_track(track):
+    response = client.post(f"{BASE_URL}/music", json=track)
+    return response.json()['id'] if response.status_code == 200 else None
+
+def seed_catalog(count, seed, workers):
+    """POST `count` synthetic tracks; returns (created, seconds)"""
+    rng = random.Random(seed)
+    tracks = [synthetic_track(rng) for _ in range(count)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        created = sum(1 for track_id in pool.map(create_track, tracks, chunksize=64) if track_id)
+    return created, time.perf_counter() - started
+
+def search(text, **params):
+    response = client.get(f"{BASE_URL}/music", params={"search": text, **params})
+    return response.json() if response.status_code == 200 else None
+
+def benchmark(duration, workers, seed, warmup=0.0):
+    """The query mix for `duration` seconds, after `warmup` seconds that are not measured"""
+    rng = random.Random(seed)
+    words = [w for w in TITLE_WORDS if len(w) >= 5]
+    calls = [
+        load.Call("word", "GET", "/music", weight=3, build=lambda: {
+            'params': {"search": rng.choice(TITLE_WORDS), "limit": 20}}),
+        load.Call("typeahead", "GET", "/music", weight=3, build=lambda: {
+            'params': {"search": rng.choice(words)[:rng.randint(3, 5)], "limit": 10}}),
+        load.Call("two words", "GET", "/music", weight=2, build=lambda: {
+            'params': {"search": f"{rng.choice(TITLE_WORDS)} {rng.choice(LAST_NAMES).lower()}", "limit": 20}}),
+        load.Call("miss", "GET", "/music", weight=1, build=lambda: {
+            'params': {"search": uuid.UUID(int=rng.getrandbits(128)).hex[:10], "limit": 20}}),
+    ]
+    if warmup:
+        load.run_load(calls, BASE_URL, workers=workers, duration=warmup, seed=seed)
+    return load.run_load(calls, BASE_URL, workers=workers, duration=duration, seed=seed)
+
+def seed_needles(needle, count):
+    """Tracks only this run's needle word matches; returns (exact, artist-only, all ids)"""
+    exact = create_track({"title": f"{needle.title()} Morning Anthem", "artist": TAG, "price": 500})
+    artist_only = create_track({"title": "Quiet Evening", "artist": f"{needle.title()} Singers", "price": 500})
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        rest = list(pool.map(lambda i: create_track({
+            "title": f"Hymn {i} of the {needle}", "artist": TAG, "price": 500
+        }), range(count - 2)))
+    return exact, artist_only, [exact, artist_only] + rest
+
+def walk_pages(text, limit, max_pages=100):
+    ids, cursor = [], None
+    for _ in range(max_pages):
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = search(text, **params)
+        if page is None:
+            return None
+        ids.extend(item['id'] for item in page['items'])
+        cursor = page['nextCursor']
+        if not cursor:
+            return ids
+    return ids
+
+def check_needles(needle, exact, artist_only, needle_ids):
+    """Ranking, typeahead and pagination over the needles; returns problems"""
+    problems = []
+    results = search(f"{needle} morning anthem", limit=5)
+    if not results or not results['items'] or results['items'][0]['id'] != exact:
+        problems.append("the exact title does not rank first")
+    ranked = [item['id'] for item in (search(needle, limit=len(needle_ids)) or {'items': []})['items']]
+    if exact not in ranked or artist_only not in ranked or ranked.index(exact) > ranked.index(artist_only):
+        problems.append("a title match does not rank above an artist-only match")
+    typed = search(needle[:len(needle) - 2], limit=PAGE_SIZE)
+    if not typed or len(typed['items']) < min(PAGE_SIZE, len(needle_ids)):
+        problems.append(f"typeahead '{needle[:len(needle) - 2]}' found {len(typed['items']) if typed else 0} needles")
+    walked = walk_pages(needle, 7)
+    if walked is None or sorted(walked) != sorted(needle_ids):
+        problems.append(f"cursor walk returned {len(walked or [])} ids, {len(set(walked or []))} distinct, "
+                        f"for {len(needle_ids)} needles")
+    return problems
+
+def check_results(rng, samples):
+    """Every result holds every query word, and unpaged results are capped; returns problems"""
+    problems = []
+    for _ in range(samples):
+        text = f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)[:4]}"
+        for item in search(text, limit=20)['items']:
+            haystack = " ".join(filter(None, (item['title'], item['artist'], item.get('album')))).lower()
+            if not all(term in haystack for term in text.split()):
+                problems.append(f"'{item['title']}' does not match '{text}'")
+                break
+    unpaged = search(rng.choice(TITLE_WORDS))
+    if not isinstance(unpaged, list) or len(unpaged) > PAGE_SIZE:
+        problems.append(f"a search without limit returned {len(unpaged) if unpaged else 0} tracks")
+    return problems
+
+def run_search_suite(tracks=DEFAULT_TRACKS, skip_seed=False, seed=0, seed_workers=32, duration=10.0, warmup=3.0,
+                     workers=8, max_p99_ms=250.0, needles=40):
+    """Seed the catalog, benchmark searches and check results; return the number of failed checks"""
+    print("MUSIC SEARCH TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{'existing catalog' if skip_seed else f'{tracks} synthetic tracks (seed {seed})'}, "
+          f"{duration:g}s benchmark after {warmup:g}s warm-up, {workers} workers")
+    print("="*80)
+
+    if not skip_seed:
+        created, seconds = seed_catalog(tracks, seed, seed_workers)
+        print(f"Seeded {created} tracks in {seconds:.1f}s ({created / seconds:.0f}/s)")
+        if created < tracks:
+            print(f"❌ Only {created} of {tracks} tracks were created")
+            return 1
+
+    report = benchmark(duration, workers, seed, warmup)
+    load.print_report(report)
+
+    needle = f"zq{uuid.uuid4().hex[:8]}"
+    exact, artist_only, needle_ids = seed_needles(needle, needles)
+    failures = 0
+    try:
+        print("\nChecks:")
+        for name, stats in report.routes.items():
+            summary = stats.summary(report.elapsed)
+            ok = summary['p99'] * 1000 <= max_p99_ms and not summary['errors']
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {name}: p99 {summary['p99'] * 1000:.1f}ms (budget {max_p99_ms:g}ms), "
+                  f"{summary['errors']} errors in {summary['count']}")
+
+        if not all(needle_ids):
+            problems = [f"only {sum(map(bool, needle_ids))} of {needles} needle tracks were created"]
+        else:
+            problems = check_needles(needle, exact, artist_only, needle_ids)
+        failures += bool(problems)
+        print(f"❌ {len(problems)} ranking problems, e.g. {problems[0]}" if problems else
+              "✅ Exact titles first, titles above artists, prefixes match, pages walk every needle once")
+
+        problems = check_results(random.Random(seed + 1), 10)
+        failures += bool(problems)
+        print(f"❌ {problems[0]}" if problems else
+              f"✅ Every result holds every query word; unpaged searches return at most {PAGE_SIZE} tracks")
+    finally:
+        for track_id in filter(None, needle_ids):
+            client.delete(f"{BASE_URL}/music/{track_id}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranked music search over a synthetic catalog")
+    parser.add_argument('--tracks', type=int, default=DEFAULT_TRACKS,
+                        help="synthetic tracks to seed (default 100000)")
+    parser.add_argument('--skip-seed', action='store_true', help="reuse the catalog seeded by an earlier run")
+    parser.add_argument('--seed', type=int, default=0, help="RNG seed for the catalog and queries")
+    parser.add_argument('--seed-workers', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of search load")
+    parser.add_argument('--warmup', type=float, default=3.0, help="seconds of unmeasured load first")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--max-p99-ms', type=float, default=250.0, help="p99 budget for every query kind")
+    parser.add_argument('--needles', type=int, default=40, help="tracks seeded under this run's needle word")
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_search_suite(args.tracks, args.skip_seed, args.seed, args.seed_workers, args.duration,
+                                args.warmup, args.workers, args.max_p99_ms, args.needles)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Cursor Pagination Testing
+Grows the list tables through the API in stages and times the first page
+and a deep page of each paginated endpoint at every stage. Keyset pages
+should cost the same at a hundred rows as at a hundred thousand, so the
+suite fails when page latency grows with the table. It also walks every
+endpoint page by page to check that no row is repeated or skipped.
+
+Run it against a development database: the rows it creates are tagged
+"pagination-probe", and the music, gallery and project rows are deleted
+afterwards unless --no-cleanup is given
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+from tests.load import percentile
+
+ENDPOINTS = ["/music", "/donations", "/payments", "/gallery", "/admin/users", "/purchases"]
+TAG = "pagination-probe"
+
+class TableGrower:
+    """Creates probe rows through the API and removes them afterwards"""
+
+    def __init__(self, workers=8):
+        self.workers = workers
+        self.project_id = None
+        self.music_ids = []
+        self.gallery_ids = []
+        self.created = 0
+
+    def setup(self):
+        response = client.post(f"{BASE_URL}/projects", json={
+            "title": f"{TAG} project", "description": "Rows for pagination timing", "goalAmount": 1000000
+        })
+        if response.status_code == 200:
+            self.project_id = response.json()['id']
+
+    def _create(self, i):
+        n = self.created + i
+        created = []
+        if self.project_id:
+            client.post(f"{BASE_URL}/donations", json={
+                "projectId": self.project_id, "amount": 100, "donorName": f"{TAG} {n}"
+            })
+        response = client.post(f"{BASE_URL}/music", json={
+            "title": f"{TAG} track {n}", "artist": TAG, "price": 500
+        })
+        if response.status_code == 200:
+            created.append(('music', response.json()['id']))
+        response = client.post(f"{BASE_URL}/admin/gallery", json={
+            "title": f"{TAG} {n}", "imageUrl": "https://example.com/probe.jpg",
+            "year": 2000 + n % 25, "category": "Events", "order": n % 10
+        })
+        if response.status_code == 200:
+            created.append(('gallery', response.json()['id']))
+        return created
+
+    def grow(self, count):
+        """Add `count` rows to each growable table"""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for created in pool.map(self._create, range(count)):
+                for kind, row_id in created:
+                    (self.music_ids if kind == 'music' else self.gallery_ids).append(row_id)
+        self.created += count
+
+    def cleanup(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(lambda i: client.delete(f"{BASE_URL}/music/{i}"), self.music_ids))
+            list(pool.map(lambda i: client.delete(f"{BASE_URL}/admin/gallery/{i}"), self.gallery_ids))
+        if self.project_id:
+            # Donations cascade with the project
+            client.delete(f"{BASE_URL}/projects/{self.project_id}")
+
+def time_page(path, params, repeats):
+    """p50 latency of one page request, and the last response body"""
+    latencies, body = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = client.get(f"{BASE_URL}{path}", params=params)
+        latencies.append(time.perf_counter() - start)
+        body = response.json() if response.status_code == 200 else None
+    return percentile(sorted(latencies), 50), body
+
+def walk(path, limit, max_pages=None):
+    """Follow nextCursor from the first page: (ids, pages, last cursor)"""
+    ids, pages, cursor = [], 0, None
+    while max_pages is None or pages < max_pages:
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get(f"{BASE_URL}{path}", params=params)
+        if response.status_code != 200:
+            break
+        body = response.json()
+        ids.extend(row['id'] for row in body['items'])
+        pages += 1
+        if not body['nextCursor']:
+            return ids, pages, None
+        cursor = body['nextCursor']
+    return ids, pages, cursor
+
+def check_walk(path, limit):
+    """Paging through everything must match the unpaginated list"""
+    response = client.get(f"{BASE_URL}{path}")
+    if response.status_code != 200 or not isinstance(response.json(), list):
+        return None
+    expected = [row['id'] for row in response.json()]
+    ids, pages, _ = walk(path, limit)
+    if ids == expected:
+        print(f"✅ {path}: {len(ids)} rows over {pages} pages, none repeated or skipped")
+        return True
+    print(f"❌ {path}: pages returned {len(ids)} rows ({len(set(ids))} unique), list has {len(expected)}")
+    return False
+
+def run_pagination_suite(stages, limit=50, depth=10, repeats=20, max_growth=1.5,
+                         slack_ms=5.0, workers=8, cleanup=True):
+    """Grow the tables stage by stage and return the number of failed checks"""
+    print("CURSOR PAGINATION TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"Page size {limit}, deep page = page {depth + 1}, {repeats} timed requests per page")
+    print("="*80)
+
+    grower = TableGrower(workers)
+    grower.setup()
+    timings = {path: [] for path in ENDPOINTS}
+    failures = 0
+    try:
+        for stage, rows in enumerate(stages):
+            if rows > grower.created:
+                print(f"\nGrowing tables by {rows - grower.created} rows...")
+                grower.grow(rows - grower.created)
+            print(f"\nStage {stage + 1}: {grower.created} probe rows")
+            print(f"{'endpoint':<16}{'first page ms':>15}{'deep page ms':>15}")
+            for path in ENDPOINTS:
+                first, body = time_page(path, {'limit': limit}, repeats)
+                if not isinstance(body, dict) or 'items' not in body:
+                    print(f"{path:<16}{'unavailable':>15}")
+                    continue
+                _, _, cursor = walk(path, limit, depth)
+                deep = time_page(path, {'limit': limit, 'cursor': cursor}, repeats)[0] if cursor else None
+                timings[path].append((grower.created, first, deep))
+                deep_col = f"{deep * 1000:>15.2f}" if deep is not None else f"{'-':>15}"
+                print(f"{path:<16}{first * 1000:>15.2f}{deep_col}")
+
+        print("\nLatency growth (last stage vs first):")
+        for path, rows in timings.items():
+            if len(rows) < 2:
+                continue
+            (_, first0, deep0), (_, first1, deep1) = rows[0], rows[-1]
+            for label, before, after in (("first page", first0, first1), ("deep page", deep0, deep1)):
+                if before is None or after is None:
+                    continue
+                budget = before * max_growth + slack_ms / 1000
+                mark = "✅" if after <= budget else "❌"
+                failures += after > budget
+                print(f"{mark} {path} {label}: {before * 1000:.2f}ms -> {after * 1000:.2f}ms "
+                      f"(budget {budget * 1000:.2f}ms)")
+
+        print("\nPage walk consistency:")
+        for path in ENDPOINTS:
+            if check_walk(path, limit) is False:
+                failures += 1
+    finally:
+        if cleanup:
+            grower.cleanup()
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyset pagination latency and consistency")
+    parser.add_argument('--stages', default="100,1000,10000", help="cumulative probe rows per table")
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--depth', type=int, default=10, help="pages to skip before timing the deep page")
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--max-growth', type=float, default=1.5, help="allowed latency ratio last/first stage")
+    parser.add_argument('--slack-ms', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--no-cleanup', action='store_true')
+    args = parser.parse_args()
+    require_app()
+
+    stages = [int(s) for s in args.stages.split(',')]
+    failures = run_pagination_suite(stages, args.limit, args.depth, args.repeats, args.max_growth,
+                                    args.slack_ms, args.workers, not args.no_cleanup)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
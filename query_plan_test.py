@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Query Plan Testing
+The route queries over donations, purchases, payments and projects each
+have an index in schema.prisma that matches their filter and sort order.
+This suite checks that Postgres uses them. The API never shows a query
+plan, so this suite connects to the database itself (tests/database.py).
+
+It loads a synthetic dataset (tests/synthetic.py, the medium scale by
+default: 200k donations skewed towards a few projects and supporters,
+purchases, and a payment for each) unless one is already there. Each hot
+query is run the way Prisma sends it, with EXPLAIN ANALYZE and parameters
+taken from the busiest project and supporters. A query fails when:
+- its plan has a sequential scan of a table with more than --max-seq-rows
+  rows
+- none of its expected indexes appears in the plan
+- it takes longer than --max-ms
+
+With --baseline FILE the plan shapes (node types, tables and indexes) are
+also compared to the ones recorded in FILE, and a changed shape fails.
+--update-baseline rewrites FILE from this run instead.
+
+The dataset stays in place, so later runs and other suites reuse it;
+--reseed loads it again. Use a local or scratch database.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from tests import synthetic
+from tests.database import DatabaseUnavailable, connect, explain, plan_nodes
+
+PAGE = 51  # DEFAULT_PAGE_SIZE plus the row that tells findPage there is a next page
+
+def busiest(conn, table, column, order="DESC"):
+    """The seeded value of `column` with the most rows in `table` (the fewest with order="ASC")"""
+    with conn.cursor() as cur:
+        cur.execute(f'SELECT "{column}" FROM "{table}" WHERE id LIKE %s AND "{column}" IS NOT NULL '
+                    f'GROUP BY 1 ORDER BY count(*) {order} LIMIT 1', (f"{synthetic.PREFIX}%",))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+def nth_newest(conn, table, where, params, n):
+    """(createdAt, id) of row `n` newest first: the cursor findPage would send for the next page"""
+    with conn.cursor() as cur:
+        cur.execute(f'SELECT "createdAt", id FROM "{table}" WHERE {where} '
+                    f'ORDER BY "createdAt" DESC, id DESC OFFSET %s LIMIT 1', (*params, n))
+        return cur.fetchone()
+
+# findPage's keyset condition for NEWEST_FIRST (lib/pagination.js keysetWhere)
+AFTER = '"createdAt" <= %s AND ("createdAt" < %s OR ("createdAt" = %s AND id < %s))'
+
+def newest_first(conn, route, table, where, params, expect):
+    """Page one and, when there is one, page two of a NEWEST_FIRST route listing"""
+    order = f'ORDER BY "createdAt" DESC, id DESC LIMIT {PAGE}'
+    pages = [(route, "page 1", f'SELECT * FROM "{table}" WHERE {where} {order}', params, expect)]
+    cursor = nth_newest(conn, table, where, params, PAGE - 2)
+    if cursor:
+        created_at, row_id = cursor
+        pages.append((route, "page 2", f'SELECT * FROM "{table}" WHERE ({where}) AND {AFTER} {order}',
+                      (*params, created_at, created_at, created_at, row_id), expect))
+    return pages
+
+def hot_queries(conn):
+    """(route, name, sql, params, expected indexes) for every query under test"""
+    project = busiest(conn, "Donation", "projectId")
+    supporter = busiest(conn, "Donation", "userId")
+    buyer = busiest(conn, "Purchase", "userId")
+    payer = busiest(conn, "Payment", "userId")
+    # Deleting a track checks the foreign key; only a track few people bought can be deleted
+    track = busiest(conn, "Purchase", "musicId", "ASC")
+    listings = (
+        ("GET /donations", "Donation", "TRUE", (), ("Donation_createdAt_id_idx",)),
+        ("GET /donations?projectId=", "Donation", '"projectId" = %s', (project,),
+         ("Donation_projectId_createdAt_id_idx",)),
+        ("GET /donations?userId=", "Donation", '"userId" = %s', (supporter,), ("Donation_userId_createdAt_id_idx",)),
+        ("GET /purchases?userId=", "Purchase", '"userId" = %s', (buyer,), ("Purchase_userId_createdAt_id_idx",)),
+        ("GET /payments", "Payment", "TRUE", (), ("Payment_createdAt_id_idx",)),
+        ("GET /payments?userId=", "Payment", '"userId" = %s', (payer,), ("Payment_userId_createdAt_id_idx",)),
+    )
+    queries = [page for listing in listings for page in newest_first(conn, *listing)]
+    queries += [
+        ("GET /dashboard/supporter", "recent donations",
+         f'SELECT * FROM "Donation" WHERE "userId" = %s AND status = \'COMPLETED\' '
+         f'ORDER BY "createdAt" DESC, id DESC LIMIT 20', (supporter,), ("Donation_userId_createdAt_id_idx",)),
+        ("GET /projects/:id", "recent donations",
+         'SELECT id, amount, "donorName", anonymous, "createdAt", message FROM "Donation" '
+         'WHERE "projectId" = %s AND status = \'COMPLETED\' ORDER BY "createdAt" DESC LIMIT 20', (project,),
+         ("Donation_projectId_createdAt_id_idx",)),
+        ("GET /admin/stats", "recent completed donations",
+         'SELECT * FROM "Donation" WHERE status = \'COMPLETED\' ORDER BY "createdAt" DESC LIMIT 5', (),
+         ("Donation_status_createdAt_idx", "Donation_createdAt_id_idx")),
+        ("DELETE /music/:id", "foreign key check",
+         'SELECT id FROM "Purchase" WHERE "musicId" = %s', (track,), ("Purchase_musicId_idx",)),
+        ("GET /projects", "by status",
+         'SELECT * FROM "Project" WHERE status = \'CURRENT\' ORDER BY "createdAt" DESC', (), ()),
+    ]
+    return queries
+
+def table_rows(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(%s)", (list(synthetic.TABLES),))
+        return dict(cur.fetchall())
+
+def plan_shape(plan):
+    """The parts of a plan that should not change between runs"""
+    return [[node["Node Type"], node.get("Relation Name"), node.get("Index Name")]
+            for node in plan_nodes(plan["Plan"])]
+
+def check_plan(plan, expect, rows, max_seq_rows, max_ms):
+    """Problems with one plan, as a list of strings"""
+    problems = []
+    nodes = list(plan_nodes(plan["Plan"]))
+    for node in nodes:
+        table = node.get("Relation Name")
+        if node["Node Type"] == "Seq Scan" and rows.get(table, 0) > max_seq_rows:
+            problems.append(f'sequential scan of "{table}" ({rows[table]} rows)')
+    used = {node.get("Index Name") for node in nodes}
+    if expect and not used & set(expect):
+        problems.append(f"none of {', '.join(expect)} used")
+    if plan["Execution Time"] > max_ms:
+        problems.append(f"{plan['Execution Time']:.1f}ms (budget {max_ms:g}ms)")
+    return problems
+
+def run_plan_suite(database_url=None, scale="medium", reseed=False, seed=0, max_seq_rows=10000, max_ms=50.0,
+                   baseline=None, update_baseline=False):
+    """Load the dataset if needed, then explain every hot query; return the number of failed checks"""
+    print("QUERY PLAN TESTING")
+    print(f"{scale} synthetic dataset (seed {seed}), {max_ms:g}ms budget per query")
+    print("="*80)
+
+    try:
+        conn = connect(database_url, autocommit=True)
+    except DatabaseUnavailable as e:
+        print(f"❌ {e}")
+        return 1
+
+    with conn:
+        started = time.perf_counter()
+        donations = synthetic.ensure(conn, scale, seed, reseed)
+        print(f"{donations} synthetic donations ready in {time.perf_counter() - started:.1f}s")
+
+        rows = table_rows(conn)
+        shapes, failures = {}, 0
+        print("\nChecks:")
+        for route, name, sql, params, expect in hot_queries(conn):
+            key = f"{route} {name}"
+            plan = explain(conn, sql, params)
+            shapes[key] = plan_shape(plan)
+            problems = check_plan(plan, expect, rows, max_seq_rows, max_ms)
+            failures += bool(problems)
+            indexes = sorted({node.get("Index Name") for node in plan_nodes(plan["Plan"])} - {None})
+            print(f"{'❌' if problems else '✅'} {key}: {plan['Execution Time']:.1f}ms via "
+                  f"{', '.join(indexes) or 'no index'}{'; ' + '; '.join(problems) if problems else ''}")
+
+    if baseline and update_baseline:
+        with open(baseline, "w") as f:
+            json.dump(shapes, f, indent=2, sort_keys=True)
+        print(f"\nRecorded {len(shapes)} plan shapes in {baseline}")
+    elif baseline:
+        with open(baseline) as f:
+            recorded = json.load(f)
+        changed = [key for key in shapes if key in recorded and recorded[key] != shapes[key]]
+        failures += bool(changed)
+        print(f"❌ {len(changed)} plan shapes changed since {baseline}, e.g. {changed[0]}" if changed else
+              f"✅ Every plan matches its shape in {baseline}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Index usage of the hot route queries over a synthetic history")
+    parser.add_argument('--database-url', help="defaults to DATABASE_URL")
+    parser.add_argument('--scale', choices=synthetic.SCALES, default="medium", help="dataset to load if none is there")
+    parser.add_argument('--reseed', action='store_true', help="replace the synthetic dataset already loaded")
+    parser.add_argument('--seed', type=int, default=0, help="RNG seed for the dataset")
+    parser.add_argument('--max-seq-rows', type=int, default=10000,
+                        help="tables larger than this must not be scanned sequentially")
+    parser.add_argument('--max-ms', type=float, default=50.0, help="execution time budget per query")
+    parser.add_argument('--baseline', help="JSON file of recorded plan shapes to compare against")
+    parser.add_argument('--update-baseline', action='store_true', help="record this run's plan shapes instead")
+    args = parser.parse_args()
+
+    failures = run_plan_suite(args.database_url, args.scale, args.reseed, args.seed, args.max_seq_rows, args.max_ms,
+                              args.baseline, args.update_baseline)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
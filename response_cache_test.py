@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Response Cache Testing
+Compares throughput of the cached public read endpoints cold (every
+request misses: a unique throwaway query parameter gives it its own cache
+key), warm (repeat requests hit the cache) and revalidating (If-None-Match
+answered with 304). Also checks that an admin mutation invalidates the
+cached /settings response straight away
+"""
+
+import argparse
+import itertools
+import sys
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+
+PUBLIC_ROUTES = ["/settings", "/founders", "/history", "/choir-members",
+                 "/gallery", "/gallery/filters", "/awards", "/news"]
+
+def available_routes():
+    """Public routes the server answers, with their current ETag"""
+    routes = {}
+    for route in PUBLIC_ROUTES:
+        response = client.get(f"{BASE_URL}{route}")
+        if response.status_code == 200:
+            routes[route] = response.headers.get('ETag')
+    return routes
+
+def build_calls(routes, mode):
+    counter = itertools.count()
+    calls = []
+    for route, etag in routes.items():
+        if mode == 'cold':
+            # A fresh query string per request never hits the cache
+            path = lambda route=route: f"{route}?nocache={next(counter)}"
+            calls.append(load.Call(route, "GET", path))
+        elif mode == 'warm':
+            calls.append(load.Call(route, "GET", route))
+        elif etag:
+            headers = {'If-None-Match': etag}
+            calls.append(load.Call(route, "GET", route, build=lambda h=headers: {'headers': h},
+                                   ok_status=(304,)))
+    return calls
+
+def check_behaviour():
+    """Cache hits, 304s and invalidation on /settings"""
+    results = []
+
+    client.get(f"{BASE_URL}/settings")
+    response = client.get(f"{BASE_URL}/settings")
+    cache_status = response.headers.get('X-Cache')
+    if cache_status == 'HIT':
+        results.append("✅ Repeat GET /settings served from cache")
+    elif cache_status is None:
+        results.append("⚠️  No X-Cache header; cache hit not verified")
+    else:
+        results.append(f"❌ Repeat GET /settings was a cache {cache_status}")
+
+    etag = response.headers.get('ETag')
+    revalidated = client.get(f"{BASE_URL}/settings", headers={'If-None-Match': etag or ''})
+    if etag and revalidated.status_code == 304 and not revalidated.content:
+        results.append("✅ If-None-Match with the current ETag returns an empty 304")
+    else:
+        results.append(f"❌ Conditional GET returned {revalidated.status_code} (ETag {etag})")
+
+    original = response.json()
+    changed = original.get('memberCount', 0) + 1
+    client.put(f"{BASE_URL}/admin/settings", json={'memberCount': changed})
+    try:
+        after = client.get(f"{BASE_URL}/settings", headers={'If-None-Match': etag or ''})
+        if after.status_code == 200 and after.json().get('memberCount') == changed:
+            results.append("✅ PUT /admin/settings invalidates the cached /settings response")
+        else:
+            results.append(f"❌ /settings after update: {after.status_code}, stale or wrong body")
+    finally:
+        client.put(f"{BASE_URL}/admin/settings", json={'memberCount': original.get('memberCount')})
+    return results
+
+def run_cache_benchmark(workers=8, duration=10.0, min_speedup=2.0):
+    """Run cold, warm and revalidating load; return the number of failures"""
+    print("RESPONSE CACHE TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{workers} workers, {duration:g}s per mode")
+    print("="*80)
+
+    routes = available_routes()
+    if not routes:
+        print("❌ None of the public routes answered")
+        return 1
+    print(f"Routes: {', '.join(routes)}")
+
+    totals = {}
+    for mode in ('cold', 'warm', 'revalidate'):
+        calls = build_calls(routes, mode)
+        if not calls:
+            print(f"\n{mode}: skipped (no ETags)")
+            continue
+        print(f"\n{mode.upper()}")
+        report = load.run_load(calls, BASE_URL, workers=workers, duration=duration)
+        load.print_report(report)
+        totals[mode] = report.total().summary(report.elapsed)
+
+    failures = 0
+    print("\nSummary:")
+    cold = totals['cold']['throughput']
+    for mode in ('warm', 'revalidate'):
+        if mode not in totals:
+            continue
+        speedup = totals[mode]['throughput'] / cold if cold else float('inf')
+        ok = speedup >= min_speedup and totals[mode]['error_rate'] == 0
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {mode}: {totals[mode]['throughput']:.0f} req/s vs cold {cold:.0f} req/s "
+              f"({speedup:.1f}x, need {min_speedup:g}x), p50 {totals[mode]['p50'] * 1000:.1f}ms "
+              f"vs {totals['cold']['p50'] * 1000:.1f}ms")
+
+    print()
+    for line in check_behaviour():
+        print(line)
+        failures += line.startswith("❌")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm throughput of cached public endpoints")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per mode")
+    parser.add_argument('--min-speedup', type=float, default=2.0, help="required warm/cold throughput ratio")
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_cache_benchmark(args.workers, args.duration, args.min_speedup)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
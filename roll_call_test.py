@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Roll Call Testing
+POST /admin/member-attendance/bulk records a whole session's roster
+(lib/attendance.js): the records go in with one insert and attendanceCount
+moves with one update, in one transaction. MemberAttendance is unique per
+member, event type and date, so a roster can be submitted again without
+counting anyone twice.
+
+The suite approves a choir of probe members, then takes roll for one
+rehearsal a member at a time through POST /admin/member-attendance, the way
+the admin page used to, and for the next rehearsal with one bulk request.
+It compares members recorded per second, then checks:
+- every roster entry gets one result, in roster order
+- submitting the roster again reports already_recorded and moves no counts
+- the single route is idempotent too
+- unknown and repeated member ids are reported per entry
+- only members marked present are counted
+
+There is no route that deletes members or attendance, so probes are named
+with the probe tag and left in place.
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+
+TAG = "roll-call-probe"
+PARTS = ("soprano", "alto", "tenor", "bass")
+
+def enrol_choir(run_id, size):
+    """Apply and bulk-approve `size` probe members; returns their member ids"""
+    def apply(index):
+        response = client.post(f"{BASE_URL}/membership-application", json={
+            "fullName": f"{TAG} {run_id} {index}", "email": f"{TAG}-{run_id}-{index}@example.com",
+            "vocalPart": PARTS[index % len(PARTS)]
+        })
+        return response.json()['applicationId'] if response.status_code == 200 else None
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(apply, range(size)))
+    if not all(ids):
+        return []
+    response = client.post(f"{BASE_URL}/admin/member-applications/bulk", json={"action": "approve", "ids": ids})
+    if response.status_code != 200:
+        return []
+    return [r['member']['id'] for r in response.json()['results'] if r.get('member')]
+
+def session(run_id, rehearsal):
+    """A distinct rehearsal per run, so reruns do not find earlier records"""
+    return {"eventType": "REHEARSAL", "eventTitle": f"{TAG} {run_id} rehearsal {rehearsal}",
+            "date": f"2030-01-{rehearsal:02d}T{int(run_id[:4], 16) % 24:02d}:{int(run_id[4:], 16) % 60:02d}:00.000Z"}
+
+def attendance_counts(member_ids):
+    """attendanceCount of each member, from the member dashboard"""
+    def count(member_id):
+        response = client.get(f"{BASE_URL}/members/dashboard", params={"memberId": member_id})
+        return response.json()['member']['attendanceCount'] if response.status_code == 200 else None
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return dict(zip(member_ids, pool.map(count, member_ids)))
+
+def record_one_by_one(event, member_ids):
+    """Record through the single route, one request after another; returns (seconds, failures)"""
+    started = time.perf_counter()
+    failed = 0
+    for member_id in member_ids:
+        response = client.post(f"{BASE_URL}/admin/member-attendance",
+                               json={**event, "memberId": member_id, "present": True})
+        failed += response.status_code != 200
+    return time.perf_counter() - started, failed
+
+def roll_call(event, roster):
+    response = client.post(f"{BASE_URL}/admin/member-attendance/bulk", json={**event, "roster": roster})
+    return response.json() if response.status_code == 200 else None
+
+def check_results(roster, response):
+    """Problems with the first submission's per-entry results"""
+    if not response:
+        return ["bulk roll call failed"]
+    problems = []
+    if [r['memberId'] for r in response['results']] != [entry['memberId'] for entry in roster]:
+        problems.append(f"{len(response['results'])} results for {len(roster)} roster entries, or out of order")
+    if response['summary'] != {'recorded': len(roster)}:
+        problems.append(f"first submission summary {response['summary']}")
+    wrong = [r for r in response['results'] if r.get('attendance', {}).get('present') != (
+        next(e['present'] for e in roster if e['memberId'] == r['memberId']))]
+    if wrong:
+        problems.append(f"{len(wrong)} records with the wrong present flag")
+    return problems
+
+def check_idempotency(event, roster, single_event, single_ids, counts):
+    """Resubmit both rehearsals; returns problems"""
+    problems = []
+    again = roll_call(event, roster)
+    if not again or again['summary'] != {'already_recorded': len(roster)}:
+        problems.append(f"resubmitted roster summary {again and again['summary']}")
+    for member_id in single_ids[:3]:
+        response = client.post(f"{BASE_URL}/admin/member-attendance",
+                               json={**single_event, "memberId": member_id, "present": True})
+        if response.status_code != 200:
+            problems.append(f"repeated single record returned {response.status_code}")
+    moved = {m: (counts[m], c) for m, c in attendance_counts(list(counts)).items() if c != counts[m]}
+    if moved:
+        problems.append(f"{len(moved)} attendance counts moved on resubmission, e.g. {next(iter(moved.items()))}")
+    return problems
+
+def check_roster_rules(event, member_ids):
+    """Unknown and repeated ids in one roster; returns problems"""
+    unknown = str(uuid.uuid4())
+    roster = [{"memberId": m, "present": True} for m in member_ids[:2]] + \
+             [{"memberId": member_ids[0], "present": True}, {"memberId": unknown, "present": True}]
+    response = roll_call(event, roster)
+    if not response:
+        return ["roll call with unknown and repeated ids failed"]
+    expected = {'recorded': 2, 'duplicate': 1, 'not_found': 1}
+    if response['summary'] != expected or response['processed'] != len(roster):
+        return [f"summary {response['summary']} for {len(roster)} entries, expected {expected}"]
+    return []
+
+def run_roll_call_suite(choir=60, absent_every=5, min_speedup=5.0):
+    """Take roll singly and in bulk; return the number of failed checks"""
+    print("ROLL CALL TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"A choir of {choir}, every {absent_every}th member absent from the bulk rehearsal")
+    print("="*80)
+
+    run_id = uuid.uuid4().hex[:8]
+    member_ids = enrol_choir(run_id, choir)
+    if len(member_ids) != choir:
+        print(f"❌ Only {len(member_ids)} of {choir} probe members were approved")
+        return 1
+    print(f"Approved {choir} probe members ({TAG}-{run_id}-*@example.com)")
+    before = attendance_counts(member_ids)
+
+    single_event, bulk_event = session(run_id, 1), session(run_id, 2)
+    single_seconds, single_failed = record_one_by_one(single_event, member_ids)
+    roster = [{"memberId": m, "present": i % absent_every != absent_every - 1} for i, m in enumerate(member_ids)]
+    started = time.perf_counter()
+    response = roll_call(bulk_event, roster)
+    bulk_seconds = time.perf_counter() - started
+
+    single_rate = choir / single_seconds if single_seconds else 0
+    bulk_rate = choir / bulk_seconds if bulk_seconds else 0
+    print(f"\n{'path':<22}{'members':>9}{'requests':>10}{'seconds':>10}{'per second':>12}")
+    print(f"{'one by one':<22}{choir:>9}{choir:>10}{single_seconds:>10.2f}{single_rate:>12.1f}")
+    print(f"{'bulk roll call':<22}{choir:>9}{1:>10}{bulk_seconds:>10.2f}{bulk_rate:>12.1f}")
+
+    print("\nChecks:")
+    failures = 0
+    speedup = bulk_rate / single_rate if single_rate else 0
+    ok = speedup >= min_speedup and not single_failed
+    failures += not ok
+    print(f"{'✅' if ok else '❌'} Bulk roll call {speedup:.1f}x the single route's throughput "
+          f"(need {min_speedup:g}x), {single_failed} single records failed")
+
+    problems = check_results(roster, response)
+    counts = attendance_counts(member_ids)
+    expected = {m: before[m] + 1 + entry['present'] for m, entry in zip(member_ids, roster)}
+    wrong = [m for m in member_ids if counts[m] != expected[m]]
+    if wrong:
+        problems.append(f"{len(wrong)} members with the wrong attendanceCount, e.g. {counts[wrong[0]]} "
+                        f"instead of {expected[wrong[0]]}")
+    failures += bool(problems)
+    print(f"❌ {'; '.join(problems)}" if problems else
+          "✅ One record per roster entry in order; only members marked present were counted")
+
+    problems = check_idempotency(bulk_event, roster, single_event, member_ids, counts)
+    failures += bool(problems)
+    print(f"❌ {'; '.join(problems)}" if problems else
+          "✅ Resubmitted rosters and single records reported already recorded; no count moved")
+
+    problems = check_roster_rules(session(run_id, 3), member_ids)
+    failures += bool(problems)
+    print(f"❌ {'; '.join(problems)}" if problems else "✅ Unknown and repeated member ids reported per entry")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk roll call against per-member attendance")
+    parser.add_argument('--choir', type=int, default=60, help="probe members to take roll for")
+    parser.add_argument('--absent-every', type=int, default=5, help="mark every Nth member absent in bulk")
+    parser.add_argument('--min-speedup', type=float, default=5.0, help="required bulk/single throughput ratio")
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_roll_call_suite(args.choir, args.absent_every, args.min_speedup)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
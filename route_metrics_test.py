@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Route Metrics Testing
+Every API response carries a Server-Timing header (lib/metrics.js) with
+the router lookup, the database time and query count, the rest of the
+handler time, and the total. GET /admin/metrics keeps per-route
+histograms of the same numbers, plus response size.
+
+The suite warms up each probe route, samples /admin/metrics, sends each
+route --requests times and samples again. From the Server-Timing of every
+response it prints where each route's time goes, database or handler.
+It checks:
+- every response has the header
+- no request runs more queries than its route's budget
+- paged routes run as many queries for 5 rows as for 50, so a query per
+  row (an N+1) fails even within budget
+- the /admin/metrics deltas count every request the suite sent
+
+Budgets are Prisma operations per request, as lib/metrics.js counts them.
+Lower a budget when a route gets cheaper; raise one only with a reason.
+Run against a database with data (python -m tests.synthetic) so the
+page-size check has rows to page over.
+"""
+
+import argparse
+import re
+import sys
+import uuid
+
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+from tests.load import percentile
+
+SMALL_PAGE, LARGE_PAGE = 5, 50
+
+# (route, path, params, query budget); {project} and {supporter} are filled in
+PROBES = (
+    ("GET /projects", "/projects", {}, 1),
+    ("GET /projects/:id", "/projects/{project}", {}, 1),
+    ("GET /donations", "/donations", {"limit": LARGE_PAGE}, 1),
+    ("GET /music", "/music", {"limit": LARGE_PAGE}, 1),
+    ("GET /purchases", "/purchases", {"limit": LARGE_PAGE}, 1),
+    ("GET /payments", "/payments", {"limit": LARGE_PAGE}, 1),
+    ("GET /admin/users", "/admin/users", {"limit": LARGE_PAGE}, 1),
+    ("GET /gallery", "/gallery", {"limit": LARGE_PAGE}, 1),
+    ("GET /courses", "/courses", {}, 1),
+    ("GET /admin/stats", "/admin/stats", {}, 3),
+    ("GET /dashboard/supporter", "/dashboard/supporter", {"userId": "{supporter}"}, 4),
+    ("GET /settings", "/settings", {}, 2),  # creates the settings row on first use
+)
+
+TIMING = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) quer)?')
+
+def server_timing(response):
+    """{'total': ms, 'db': ms, 'app': ms, 'dispatch': ms, 'queries': n}, or None without the header"""
+    header = response.headers.get("Server-Timing")
+    if not header:
+        return None
+    timing = {}
+    for name, dur, queries in TIMING.findall(header):
+        timing[name] = float(dur)
+        if queries:
+            timing["queries"] = int(queries)
+    return timing if {"total", "db", "app"} <= timing.keys() else None
+
+def sample_metrics():
+    response = client.get(f"{BASE_URL}/admin/metrics")
+    return response.json()["routes"] if response.status_code == 200 else None
+
+def request(path, params):
+    response = client.get(f"{BASE_URL}{path}", params=params)
+    return response, server_timing(response)
+
+def fill(probe, ids):
+    route, path, params, budget = probe
+    return route, path.format(**ids), {k: str(v).format(**ids) for k, v in params.items()}, budget
+
+def probe_ids():
+    """An existing project and supporter to aim the :id and userId probes at"""
+    projects = client.get(f"{BASE_URL}/projects").json()
+    donations = client.get(f"{BASE_URL}/donations", params={"limit": LARGE_PAGE}).json()['items']
+    supporter = next((d['userId'] for d in donations if d.get('userId')), str(uuid.uuid4()))
+    return {"project": projects[0]['id'] if projects else str(uuid.uuid4()), "supporter": supporter}
+
+def measure(probes, requests):
+    """Send each probe `requests` times; returns {route: [timing or None, ...]}"""
+    timings = {}
+    for route, path, params, _ in probes:
+        timings[route] = [request(path, params)[1] for _ in range(requests)]
+    return timings
+
+def check_page_sizes(probes):
+    """Query counts at two page sizes for each paged probe; returns (problems, skipped)"""
+    problems, skipped = [], []
+    for route, path, params, _ in probes:
+        if "limit" not in params:
+            continue
+        small = request(path, {**params, "limit": SMALL_PAGE})[1]
+        response, large = request(path, {**params, "limit": LARGE_PAGE})
+        if response.status_code != 200 or len(response.json()['items']) <= SMALL_PAGE:
+            skipped.append(route)
+        elif not small or not large or small.get("queries") != large.get("queries"):
+            problems.append(f"{route} ran {small and small.get('queries')} queries for {SMALL_PAGE} rows and "
+                            f"{large and large.get('queries')} for {LARGE_PAGE}")
+    return problems, skipped
+
+def delta(before, after, route):
+    """(requests, mean bytes) recorded for `route` between two samples"""
+    old, new = (before or {}).get(route), (after or {}).get(route)
+    if not new:
+        return 0, 0.0
+    count = new['count'] - (old['count'] if old else 0)
+    sent = new['bytes']['count'] - (old['bytes']['count'] if old else 0)
+    size = new['bytes']['sum'] - (old['bytes']['sum'] if old else 0)
+    return count, size / sent if sent else 0.0
+
+def print_breakdown(timings, before, after):
+    print(f"\n{'route':<28}{'n':>5}{'p50 ms':>9}{'p95 ms':>9}{'db ms':>8}{'app ms':>8}{'db %':>6}"
+          f"{'queries':>9}{'KB':>8}")
+    for route, samples in timings.items():
+        samples = [s for s in samples if s]
+        if not samples:
+            print(f"{route:<28}{0:>5}  no Server-Timing")
+            continue
+        totals = sorted(s['total'] for s in samples)
+        db = sum(s['db'] for s in samples) / len(samples)
+        app = sum(s['app'] for s in samples) / len(samples)
+        share = 100 * db / (db + app) if db + app else 0
+        size = delta(before, after, route)[1]
+        print(f"{route:<28}{len(samples):>5}{percentile(totals, 50):>9.1f}{percentile(totals, 95):>9.1f}"
+              f"{db:>8.1f}{app:>8.1f}{share:>6.0f}{max(s.get('queries', 0) for s in samples):>9}{size / 1024:>8.1f}")
+
+def run_metrics_suite(requests=20):
+    """Probe each route and check timings and query budgets; return the number of failed checks"""
+    print("ROUTE METRICS TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{len(PROBES)} routes, {requests} requests each")
+    print("="*80)
+
+    ids = probe_ids()
+    probes = [fill(probe, ids) for probe in PROBES]
+    measure(probes, 1)  # first use builds the stats snapshot and fills the caches
+    before = sample_metrics()
+    timings = measure(probes, requests)
+    after = sample_metrics()
+    if before is None or after is None:
+        print("❌ GET /admin/metrics is not available")
+        return 1
+    print_breakdown(timings, before, after)
+
+    print("\nChecks:")
+    failures = 0
+    missing = {route: samples.count(None) for route, samples in timings.items() if None in samples}
+    failures += bool(missing)
+    print(f"❌ Responses without Server-Timing: {missing}" if missing else
+          "✅ Every response carried Server-Timing with db, app and total")
+
+    over = []
+    for route, _, _, budget in probes:
+        most = max((s.get('queries', 0) for s in timings[route] if s), default=0)
+        if most > budget:
+            over.append(f"{route} ran {most} queries (budget {budget})")
+    failures += bool(over)
+    print(f"❌ {len(over)} routes over their query budget: {'; '.join(over)}" if over else
+          "✅ Every route stayed within its query budget")
+
+    problems, skipped = check_page_sizes(probes)
+    failures += bool(problems)
+    note = f" ({', '.join(skipped)} skipped: not enough rows)" if skipped else ""
+    print(f"❌ {'; '.join(problems)}{note}" if problems else
+          f"✅ Paged routes ran the same queries for {SMALL_PAGE} and {LARGE_PAGE} rows{note}")
+
+    short = [f"{route} {delta(before, after, route)[0]}/{requests}" for route, *_ in probes
+             if delta(before, after, route)[0] < requests]
+    failures += bool(short)
+    print(f"❌ /admin/metrics missed requests: {', '.join(short)}" if short else
+          "✅ /admin/metrics counted every request under its route pattern")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Server-Timing, /admin/metrics and per-route query budgets")
+    parser.add_argument('--requests', type=int, default=20, help="requests per route")
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_metrics_suite(args.requests)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
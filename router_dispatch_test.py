@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Route Dispatch Micro-Benchmark
+Times routes declared early and late in handleRoute, plus misses, and
+compares their dispatch cost. The API reports the router lookup alone in a
+`Server-Timing: dispatch;dur=<ms>` header; with the route table it should
+be flat no matter where a route was declared
+"""
+
+import argparse
+import sys
+import time
+
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+from tests.load import percentile
+
+# (label, method, path): read-only requests, ordered by declaration position
+PROBES = [
+    ("early  GET /", "GET", "/"),
+    ("mid    GET /gallery/filters", "GET", "/gallery/filters"),
+    ("late   GET /admin/member-applications/:id", "GET", "/admin/member-applications/dispatch-probe"),
+    ("late   GET /admin/members/:id/toggle-status (404)", "GET", "/admin/members/dispatch-probe/toggle-status"),
+    ("miss   GET /dispatch-probe/no/such/route", "GET", "/dispatch-probe/no/such/route"),
+]
+MAX_DISPATCH_US = 50
+MAX_SPREAD_US = 20
+
+def parse_server_timing(header):
+    """Map metric name -> duration in ms from a Server-Timing header"""
+    metrics = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    metrics[name] = float(value)
+                except ValueError:
+                    pass
+    return metrics
+
+def measure_route(method, path, iterations):
+    """Sequential requests to one route: (latencies, dispatch times) in seconds"""
+    latencies, dispatch = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.request(method, f"{BASE_URL}{path}")
+        latencies.append(time.perf_counter() - start)
+        timing = parse_server_timing(response.headers.get("Server-Timing"))
+        if "dispatch" in timing:
+            dispatch.append(timing["dispatch"] / 1000)
+    return sorted(latencies), sorted(dispatch)
+
+def run_dispatch_benchmark(iterations=200, warmup=20, max_dispatch_us=MAX_DISPATCH_US,
+                           max_spread_us=MAX_SPREAD_US):
+    """Measure every probe and return the number of failed checks"""
+    print("ROUTE DISPATCH MICRO-BENCHMARK")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{iterations} requests per route after {warmup} warm-up requests")
+    print("="*100)
+    print(f"{'route':<52}{'p50 ms':>9}{'p99 ms':>9}{'dispatch p50 us':>17}{'p99 us':>10}")
+
+    results = []
+    for label, method, path in PROBES:
+        measure_route(method, path, warmup)
+        latencies, dispatch = measure_route(method, path, iterations)
+        results.append((label, latencies, dispatch))
+        dispatch_cols = (f"{percentile(dispatch, 50) * 1e6:>17.1f}{percentile(dispatch, 99) * 1e6:>10.1f}"
+                         if dispatch else f"{'n/a':>17}{'n/a':>10}")
+        print(f"{label:<52}{percentile(latencies, 50) * 1000:>9.2f}"
+              f"{percentile(latencies, 99) * 1000:>9.2f}{dispatch_cols}")
+
+    failures = 0
+    timed = [(label, dispatch) for label, _, dispatch in results if dispatch]
+    print()
+    if not timed:
+        print("⚠️  No Server-Timing dispatch metric in responses; only end-to-end latency was measured")
+        return failures
+
+    for label, dispatch in timed:
+        p50 = percentile(dispatch, 50) * 1e6
+        if p50 > max_dispatch_us:
+            print(f"❌ {' '.join(label.split())}: dispatch p50 {p50:.1f}us over {max_dispatch_us}us")
+            failures += 1
+    medians = [percentile(dispatch, 50) * 1e6 for _, dispatch in timed]
+    spread = max(medians) - min(medians)
+    if spread > max_spread_us:
+        print(f"❌ Dispatch p50 spread between early and late routes is {spread:.1f}us (budget {max_spread_us}us)")
+        failures += 1
+    else:
+        print(f"✅ Dispatch p50 spread between early and late routes is {spread:.1f}us (budget {max_spread_us}us)")
+    if not failures:
+        print(f"✅ Every route dispatches within {max_dispatch_us}us at p50")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Dispatch cost of early vs late routes")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--max-dispatch-us', type=float, default=MAX_DISPATCH_US)
+    parser.add_argument('--max-spread-us', type=float, default=MAX_SPREAD_US)
+    args = parser.parse_args()
+    require_app()
+
+    failures = run_dispatch_benchmark(args.iterations, args.warmup, args.max_dispatch_us, args.max_spread_us)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,13 @@
 Simple upload test to debug the issue
 """
 
-import requests
-import io
-from PIL import Image
-
-BASE_URL = "https://music-admin-5.preview.emergentagent.com/api"
+from tests.config import BASE_URL
+from tests.fixtures import payload
+from tests.http_client import client
 
 def create_small_image():
     """Create a small test image"""
-    img = Image.new('RGB', (100, 100), color='red')
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format='JPEG', quality=50)
-    img_bytes.seek(0)
-    return img_bytes
+    return payload('JPEG', 1024)
 
 def test_simple_upload():
     """Test simple upload"""
@@ -29,9 +23,9 @@ def test_simple_upload():
         files = {'file': ('test.jpg', test_image, 'image/jpeg')}
         
         print(f"Uploading to: {BASE_URL}/upload")
-        print(f"File size: {test_image.getbuffer().nbytes} bytes")
+        print(f"File size: {test_image.nbytes} bytes")
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Streaming Large-File Upload Testing
+Streams multipart bodies of increasing size to /upload and checks that
+oversized files are rejected from their declared length before the body is
+sent, within a latency budget
+"""
+
+import argparse
+import sys
+
+from tests.config import BASE_URL
+from tests.fixtures import MB, payload
+from tests.multipart import DEFAULT_CHUNK_SIZE, MultipartStream, stream_upload
+
+MAX_UPLOAD_SIZE = 2 * MB
+# The route rejects up front once Content-Length exceeds the limit plus this
+MULTIPART_OVERHEAD = 16 * 1024
+MAX_REJECT_MS = 500
+
+def probe_upload(size, chunk_size=DEFAULT_CHUNK_SIZE, rate=None):
+    """Stream one upload of `size` bytes and return the measurements"""
+    if size <= MAX_UPLOAD_SIZE:
+        # Real image bytes so the storage backend accepts it
+        stream = MultipartStream(payload('JPEG', size), filename='stream.jpg',
+                                 chunk_size=chunk_size, rate=rate)
+    else:
+        # Synthetic filler: hundreds of MB without allocating them
+        stream = MultipartStream(size=size, filename='large.jpg',
+                                 chunk_size=chunk_size, rate=rate)
+    return stream_upload(f"{BASE_URL}/upload", stream)
+
+def stream_length(size):
+    """Content-Length of a probe body carrying `size` file bytes"""
+    return MultipartStream(size=size, filename='large.jpg').content_length
+
+def check_result(size, result, max_reject_ms=MAX_REJECT_MS):
+    """Verdict for one probe: (passed, description)"""
+    body = result['body'] if isinstance(result['body'], dict) else {}
+    if result['error']:
+        return False, f"ERROR: {result['error']}"
+    if size <= MAX_UPLOAD_SIZE:
+        if result['status'] != 200:
+            return False, f"unexpected: {result['body']}"
+        verdict = "accepted"
+    else:
+        if result['status'] != 400 or "File too large" not in body.get('error', ''):
+            return False, f"unexpected: {result['body']}"
+        verdict = "rejected" + (" early" if result['rejected_early'] else " after full body")
+        if stream_length(size) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+            # Declared length alone is enough: no waiting for the body
+            if not result['rejected_early']:
+                return False, f"{verdict}, expected before the body was sent"
+            reject_ms = result['time_to_response'] * 1000
+            if reject_ms > max_reject_ms:
+                return False, f"{verdict} in {reject_ms:.0f}ms (budget {max_reject_ms}ms)"
+    return True, verdict
+
+def run_streaming_uploads(sizes_mb, chunk_size=DEFAULT_CHUNK_SIZE, rate=None, max_reject_ms=MAX_REJECT_MS):
+    """Probe each size, print a summary table and return the failure count"""
+    print("STREAMING LARGE-FILE UPLOAD TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"Chunk size: {chunk_size // 1024} KB, rate: {f'{rate / MB:.1f} MB/s' if rate else 'unlimited'}")
+    print(f"Budget: reject {max_reject_ms}ms")
+    print("="*77)
+    print(f"{'size':>10}{'status':>8}{'sent':>12}{'response ms':>13}{'total ms':>11}  result")
+
+    # Warm up so one-time connection costs don't count against the first probe
+    probe_upload(64 * 1024, chunk_size)
+
+    failures = 0
+    for size_mb in sizes_mb:
+        size = int(size_mb * MB)
+        result = probe_upload(size, chunk_size, rate)
+        passed, verdict = check_result(size, result, max_reject_ms)
+        failures += not passed
+
+        response_ms = result['time_to_response'] * 1000 if result['time_to_response'] else float('nan')
+        print(f"{size_mb:>8g}MB{str(result['status']):>8}{result['bytes_sent'] / MB:>10.1f}MB"
+              f"{response_ms:>13.1f}{result['elapsed'] * 1000:>11.1f}"
+              f"  {'✅' if passed else '❌'} {verdict}")
+
+    print(f"\nOverall: {len(sizes_mb) - failures}/{len(sizes_mb)} probes passed")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming upload probe for /upload")
+    parser.add_argument('--sizes', default="0.5,2,3,16,128,512", help="comma-separated sizes in MB")
+    parser.add_argument('--chunk-kb', type=int, default=DEFAULT_CHUNK_SIZE // 1024)
+    parser.add_argument('--rate', type=float, default=None, help="send rate cap in MB/s (slow-client mode)")
+    parser.add_argument('--max-reject-ms', type=float, default=MAX_REJECT_MS,
+                        help="latency budget for rejecting an oversized upload")
+    args = parser.parse_args()
+
+    sizes = [float(s) for s in args.sizes.split(',')]
+    rate = args.rate * MB if args.rate else None
+    failures = run_streaming_uploads(sizes, args.chunk_kb * 1024, rate, args.max_reject_ms)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Supporter Dashboard Testing
+GET /dashboard/supporter reads the donor leaderboard and the supporter's
+totals from maintained per-donor and per-supporter rows instead of grouping
+and summing the donation table, and lists only the supporter's most recent
+donations. Its latency should therefore not grow with donation volume.
+
+The suite registers a probe supporter (or uses --user-id), then adds
+donations to a probe project in stages: many small ones under distinct
+donor names, a few from the supporter and a large one from a "patron"
+donor. At every stage it times the dashboard and fails when latency grows
+with the table. It also checks that the supporter's totals and the
+patron's leaderboard entry moved by exactly the donations made.
+
+The probe project is deleted afterwards, which removes its donations and
+rebuilds the totals
+"""
+
+import argparse
+import sys
+import time
+import uuid
+
+from tests import load
+from tests.config import BASE_URL, require_app
+from tests.http_client import client
+from tests.load import percentile
+
+TAG = "supporter-dashboard-probe"
+AMOUNT = 100
+PATRON_AMOUNT = 1000000
+RECENT_DONATIONS = 20
+
+def dashboard(user_id):
+    response = client.get(f"{BASE_URL}/dashboard/supporter", params={'userId': user_id})
+    return response.json() if response.status_code == 200 else None
+
+def time_dashboard(user_id, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        client.get(f"{BASE_URL}/dashboard/supporter", params={'userId': user_id})
+        latencies.append(time.perf_counter() - start)
+    return percentile(sorted(latencies), 50)
+
+def register_supporter(run_id):
+    response = client.post(f"{BASE_URL}/register", json={
+        "email": f"{TAG}-{run_id}@example.com", "password": uuid.uuid4().hex, "name": f"{TAG} {run_id}"
+    })
+    return response.json()['id'] if response.status_code == 200 else None
+
+def add_donations(project_id, count, donors, workers):
+    """Post `count` donations spread over `donors` names; returns how many were accepted"""
+    counter = iter(range(count))
+    call = load.Call("POST /donations", "POST", "/donations", build=lambda: {'json': {
+        "projectId": project_id, "amount": AMOUNT, "donorName": f"{TAG} donor {next(counter, 0) % donors}"
+    }})
+    report = load.run_load([call], BASE_URL, workers=workers, total_requests=count)
+    return report.total().summary(report.elapsed)['status'].get(200, 0)
+
+def donate(project_id, amount, donor_name, user_id=None):
+    response = client.post(f"{BASE_URL}/donations", json={
+        "projectId": project_id, "amount": amount, "donorName": donor_name, "userId": user_id
+    })
+    return response.status_code == 200
+
+def run_supporter_suite(stages, user_id=None, donors=500, per_stage=3, repeats=20, max_growth=1.5,
+                        slack_ms=5.0, workers=16):
+    """Grow donations stage by stage and return the number of failed checks"""
+    print("SUPPORTER DASHBOARD TESTING")
+    print(f"Base URL: {BASE_URL}")
+    print(f"{donors} donor names, {per_stage} supporter donations per stage, {repeats} timed requests per stage")
+    print("="*80)
+
+    run_id = uuid.uuid4().hex[:8]
+    user_id = user_id or register_supporter(run_id)
+    if not user_id:
+        print("❌ Could not register the probe supporter")
+        return 1
+    response = client.post(f"{BASE_URL}/projects", json={
+        "title": f"{TAG} project", "description": "Donations for supporter dashboard timing",
+        "goalAmount": 1000000000
+    })
+    if response.status_code != 200:
+        print("❌ Could not create the probe project")
+        return 1
+    project_id = response.json()['id']
+    patron = f"{TAG} patron {run_id}"
+
+    failures = 0
+    try:
+        before = dashboard(user_id)
+        if before is None:
+            print("❌ /dashboard/supporter is unavailable")
+            return 1
+
+        timings, accepted, mine, patron_total = [], 0, 0, 0
+        print(f"\n{'donations added':>16}{'p50 ms':>10}")
+        for rows in stages:
+            if rows > accepted:
+                accepted += add_donations(project_id, rows - accepted, donors, workers)
+            for _ in range(per_stage):
+                mine += donate(project_id, AMOUNT, f"{TAG} supporter {run_id}", user_id)
+            patron_total += PATRON_AMOUNT * donate(project_id, PATRON_AMOUNT, patron)
+            timings.append(time_dashboard(user_id, repeats))
+            print(f"{accepted + mine:>16}{timings[-1] * 1000:>10.2f}")
+
+        print("\nChecks:")
+        budget = timings[0] * max_growth + slack_ms / 1000
+        ok = timings[-1] <= budget
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} /dashboard/supporter p50 {timings[0] * 1000:.2f}ms -> "
+              f"{timings[-1] * 1000:.2f}ms (budget {budget * 1000:.2f}ms)")
+
+        after = dashboard(user_id)
+        grew = after['stats']['totalDonations'] - before['stats']['totalDonations']
+        counted = after['stats']['donationCount'] - before['stats']['donationCount']
+        ok = abs(grew - mine * AMOUNT) < 0.005 and counted == mine
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Supporter totals grew by {counted} donations / {grew:,.0f} "
+              f"for {mine} made ({mine * AMOUNT:,.0f})")
+
+        listed = len(after['donations'])
+        ok = listed == min(RECENT_DONATIONS, after['stats']['donationCount'])
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Dashboard lists the {listed} most recent of "
+              f"{after['stats']['donationCount']} donations")
+
+        entry = next((d for d in after['leaderboard'] if d['name'] == patron), None)
+        ok = entry is not None and abs(entry['amount'] - patron_total) < 0.005
+        failures += not ok
+        if entry:
+            print(f"{'✅' if ok else '❌'} Patron ranked #{entry['rank']} with {entry['amount']:,.0f} "
+                  f"({patron_total:,.0f} donated)")
+        else:
+            print(f"❌ Patron with {patron_total:,.0f} donated is missing from the leaderboard")
+
+        amounts = [d['amount'] for d in after['leaderboard']]
+        ok = amounts == sorted(amounts, reverse=True)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} Leaderboard of {len(amounts)} donors ordered by amount")
+    finally:
+        client.delete(f"{BASE_URL}/projects/{project_id}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Supporter dashboard latency and totals as donations grow")
+    parser.add_argument('--stages', default="0,1000,5000", help="cumulative probe donations per stage")
+    parser.add_argument('--user-id', help="existing supporter to use instead of registering one")
+    parser.add_argument('--donors', type=int, default=500, help="distinct donor names in the probe donations")
+    parser.add_argument('--per-stage', type=int, default=3, help="supporter donations per stage")
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--max-growth', type=float, default=1.5, help="allowed latency ratio last/first stage")
+    parser.add_argument('--slack-ms', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+    require_app()
+
+    stages = [int(s) for s in args.stages.split(',')]
+    failures = run_supporter_suite(stages, args.user_id, args.donors, args.per_stage, args.repeats,
+                                   args.max_growth, args.slack_ms, args.workers)
+    print(f"\nOverall: {'all checks passed' if not failures else f'{failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
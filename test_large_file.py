@@ -3,20 +3,18 @@
 Create a definitely large file over 2MB
 """
 
-import requests
-import io
-
-BASE_URL = "https://music-admin-5.preview.emergentagent.com/api"
+from tests.config import BASE_URL
+from tests.fixtures import create_large_file as cached_large_file
+from tests.http_client import client
 
 def create_large_file():
     """Create a file definitely over 2MB"""
-    # Create 3MB of data
-    size_bytes = 3 * 1024 * 1024  # 3MB
-    data = b'A' * size_bytes
+    # 3MB of cached filler data
+    data = cached_large_file(3)
     
-    print(f"Created file size: {len(data) / (1024 * 1024):.2f} MB ({len(data)} bytes)")
+    print(f"Created file size: {data.nbytes / (1024 * 1024):.2f} MB ({data.nbytes} bytes)")
     
-    return io.BytesIO(data)
+    return data
 
 def test_large_file():
     """Test large file upload"""
@@ -26,7 +24,7 @@ def test_large_file():
         large_file = create_large_file()
         files = {'file': ('large.jpg', large_file, 'image/jpeg')}
         
-        response = requests.post(f"{BASE_URL}/upload", files=files)
+        response = client.post(f"{BASE_URL}/upload", files=files)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
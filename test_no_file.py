@@ -3,9 +3,8 @@
 Test no file provided scenario
 """
 
-import requests
-
-BASE_URL = "https://music-admin-5.preview.emergentagent.com/api"
+from tests.config import BASE_URL
+from tests.http_client import client
 
 def test_no_file():
     """Test no file provided"""
@@ -13,7 +12,7 @@ def test_no_file():
     
     try:
         # Send empty form data
-        response = requests.post(f"{BASE_URL}/upload", data={})
+        response = client.post(f"{BASE_URL}/upload", data={})
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -26,7 +25,7 @@ def test_no_file_multipart():
     
     try:
         # Send empty files dict
-        response = requests.post(f"{BASE_URL}/upload", files={'notfile': ('', '')})
+        response = client.post(f"{BASE_URL}/upload", files={'notfile': ('', '')})
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -0,0 +1,85 @@
+"""
+The real app on a scratch database, for the suites that measure behavior
+G2_API_SCRATCH_DB=postgresql://... (a database the suites may overwrite)
+makes tests/config.py start the Next.js app against it and point BASE_URL
+at it:
+
+1. prisma db push creates or updates the schema (--accept-data-loss: it is
+   a scratch database)
+2. prisma generate and next build run once, when .next has no build yet
+3. next start serves the app on a free port with DATABASE_URL set to the
+   scratch database, until the suite exits
+
+The app reads its own settings from the environment, so a suite's knobs
+are the app's: COUNTER_FLUSH_INTERVAL_MS, PASSWORD_WORKERS, SMTP_HOST and
+SMTP_PORT, DATABASE_POOL_SIZE and so on. DATABASE_URL is set for the
+suites that query Postgres directly (tests/database.py) too.
+
+Needs node_modules (yarn install) and a Postgres that accepts the URL.
+"""
+
+import atexit
+import os
+import signal
+import socket
+import subprocess
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY_TIMEOUT = 120
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _run(args, env):
+    subprocess.run(args, cwd=ROOT, env=env, check=True)
+
+
+def _wait_ready(url, process, timeout=READY_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"next start exited with {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"The app did not answer {url} within {timeout}s")
+
+
+def _stop(process):
+    if process.poll() is None:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+
+
+def start_app(database_url):
+    """Start the app on `database_url` and return its API base URL"""
+    env = dict(os.environ, DATABASE_URL=database_url)
+    os.environ.setdefault("DATABASE_URL", database_url)
+    _run(["npx", "prisma", "db", "push", "--skip-generate", "--accept-data-loss"], env)
+    if not os.path.exists(os.path.join(ROOT, ".next", "BUILD_ID")):
+        _run(["npx", "prisma", "generate"], env)
+        _run(["npx", "next", "build"], env)
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env.setdefault("NEXT_PUBLIC_BASE_URL", base)
+    # Own process group, so stopping it also stops the server next spawns
+    process = subprocess.Popen(["npx", "next", "start", "-H", "127.0.0.1", "-p", str(port)],
+                               cwd=ROOT, env=env, start_new_session=True)
+    atexit.register(_stop, process)
+    _wait_ready(f"{base}/api/root", process)
+    return f"{base}/api"
@@ -0,0 +1,77 @@
+"""
+Direct Postgres access for the suites that look below the API
+Most suites only talk HTTP. The ones that seed data at scale or read query
+plans connect to the database itself, using DATABASE_URL as Prisma does
+(or --database-url). Prisma-only URL parameters are dropped, and
+?schema= becomes the search_path.
+
+These suites need psycopg 3, which the rest of the suites do not:
+  pip install "psycopg[binary]"
+
+Point them at a local or scratch database: they insert rows directly,
+bypassing the materialized stats, which then stay stale until
+POST /admin/stats/reconcile.
+"""
+
+import os
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters Prisma understands and libpq would reject
+PRISMA_PARAMS = ("schema", "connection_limit", "pool_timeout", "pgbouncer", "statement_cache_size",
+                 "socket_timeout")
+
+
+class DatabaseUnavailable(Exception):
+    pass
+
+
+def libpq_url(url):
+    """A Prisma DATABASE_URL as libpq accepts it"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query)
+    params = [(key, value) for key, value in query if key not in PRISMA_PARAMS]
+    schema = dict(query).get("schema")
+    if schema:
+        params.append(("options", f"-csearch_path={schema}"))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def connect(url=None, autocommit=False):
+    """Open a psycopg connection; raises DatabaseUnavailable with the reason"""
+    url = url or os.environ.get("DATABASE_URL")
+    if not url:
+        raise DatabaseUnavailable("Set DATABASE_URL or pass --database-url")
+    try:
+        import psycopg
+    except ImportError:
+        raise DatabaseUnavailable('psycopg is not installed: pip install "psycopg[binary]"') from None
+    try:
+        return psycopg.connect(libpq_url(url), autocommit=autocommit)
+    except psycopg.OperationalError as e:
+        raise DatabaseUnavailable(f"Cannot connect: {e}") from None
+
+
+def copy_rows(conn, table, columns, rows):
+    """COPY an iterable of row tuples into `table`; returns the row count"""
+    names = ", ".join(f'"{column}"' for column in columns)
+    count = 0
+    with conn.cursor() as cur, cur.copy(f'COPY "{table}" ({names}) FROM STDIN') as copy:
+        for row in rows:
+            copy.write_row(row)
+            count += 1
+    return count
+
+
+def explain(conn, sql, params=()):
+    """EXPLAIN (ANALYZE, BUFFERS) of one statement as the parsed JSON plan"""
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        plan = cur.fetchone()[0]
+    return plan[0] if isinstance(plan, list) else plan
+
+
+def plan_nodes(node):
+    """Every node of a plan tree, depth first"""
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
@@ -0,0 +1,187 @@
+"""
+Cached upload payloads for the API test suites
+Each (format, size) payload is generated once, stored in a
+content-addressed on-disk cache and handed out as a read-only memoryview
+over an mmap, so repeated uploads neither re-encode images nor copy bytes.
+
+Payloads hit the requested size exactly: images are encoded from seeded
+noise below the target and then padded with format-legal metadata (JPEG
+COM segments, a PNG tEXt chunk, GIF comment extensions, a RIFF JUNK chunk
+for WebP). That lets the suites probe the 2MB limit of /upload to the byte.
+
+G2_FIXTURE_CACHE  cache directory (default tests/.fixture_cache)
+"""
+
+import hashlib
+import io
+import math
+import mmap
+import os
+import random
+import struct
+import tempfile
+import threading
+import zlib
+
+MB = 1024 * 1024
+GENERATOR_VERSION = 1
+CACHE_DIR = os.environ.get(
+    "G2_FIXTURE_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fixture_cache")
+)
+
+FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "GIF": ("gif", "image/gif"),
+    "WEBP": ("webp", "image/webp"),
+    "RAW": ("bin", "application/octet-stream"),
+}
+
+# Smallest number of bytes each padding scheme can add
+_MIN_PADDING = {"JPEG": 4, "PNG": 20, "GIF": 5, "WEBP": 8}
+_MAX_SIDE = 2000
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def _pad_jpeg(data, deficit):
+    segments = []
+    while deficit > 0:
+        total = min(deficit, 65537)
+        if 0 < deficit - total < 4:
+            total -= 4
+        segments.append(b"\xff\xfe" + struct.pack(">H", total - 2) + b"\x00" * (total - 4))
+        deficit -= total
+    # COM segments are legal anywhere after SOI
+    return data[:2] + b"".join(segments) + data[2:]
+
+
+def _pad_png(data, deficit):
+    text = b"Comment\x00" + b"\x00" * (deficit - 20)
+    chunk = struct.pack(">I", len(text)) + b"tEXt" + text + struct.pack(">I", zlib.crc32(b"tEXt" + text))
+    # Insert before the 12-byte IEND chunk
+    return data[:-12] + chunk + data[-12:]
+
+
+def _pad_gif(data, deficit):
+    blocks = math.ceil((deficit - 3) / 256)
+    payload = deficit - 3 - blocks
+    sizes = [payload // blocks + (1 if i < payload % blocks else 0) for i in range(blocks)]
+    extension = b"\x21\xfe" + b"".join(bytes([n]) + b"\x00" * n for n in sizes) + b"\x00"
+    # Insert before the trailer byte
+    return data[:-1] + extension + data[-1:]
+
+
+def _pad_webp(data, deficit):
+    chunk = b"JUNK" + struct.pack("<I", deficit - 8) + b"\x00" * (deficit - 8)
+    riff_size = len(data) - 8 + len(chunk)
+    return data[:4] + struct.pack("<I", riff_size) + data[8:] + chunk
+
+
+_PADDERS = {"JPEG": _pad_jpeg, "PNG": _pad_png, "GIF": _pad_gif, "WEBP": _pad_webp}
+
+
+def _encode(fmt, side, seed):
+    from PIL import Image
+
+    rng = random.Random(seed)
+    img = Image.frombytes("RGB", (side, side), rng.randbytes(side * side * 3))
+    out = io.BytesIO()
+    if fmt == "JPEG":
+        img.save(out, format=fmt, quality=95)
+    else:
+        img.save(out, format=fmt)
+    return out.getvalue()
+
+
+def generate(fmt, size, seed=0):
+    """Build a `fmt` payload of exactly `size` bytes"""
+    fmt = fmt.upper()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported fixture format: {fmt}")
+    if fmt == "RAW":
+        return b"A" * size
+    if fmt == "WEBP" and size % 2:
+        raise ValueError("WebP files are always an even number of bytes")
+
+    # Aim for roughly half the target from pixels, pad the rest
+    side = max(8, min(_MAX_SIDE, int(math.sqrt(size / 6))))
+    while True:
+        data = _encode(fmt, side, seed)
+        deficit = size - len(data)
+        if deficit == 0:
+            return data
+        if deficit >= _MIN_PADDING[fmt]:
+            padded = _PADDERS[fmt](data, deficit)
+            assert len(padded) == size
+            return padded
+        if side == 8:
+            raise ValueError(f"{size} bytes is too small for a {fmt} fixture")
+        side = max(8, int(side * 0.7))
+
+
+def _ref_path(fmt, size, seed):
+    return os.path.join(CACHE_DIR, "refs", f"{fmt.lower()}-{size}-s{seed}-v{GENERATOR_VERSION}")
+
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def fixture_path(fmt, size, seed=0):
+    """Path of the cached payload, generating it on first use"""
+    fmt = fmt.upper()
+    ref = _ref_path(fmt, size, seed)
+    ext = FORMATS[fmt][0] if fmt in FORMATS else "bin"
+    if os.path.exists(ref):
+        with open(ref) as f:
+            digest = f.read().strip()
+        path = os.path.join(CACHE_DIR, "objects", f"{digest}.{ext}")
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            return path
+
+    data = generate(fmt, size, seed)
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(CACHE_DIR, "objects", f"{digest}.{ext}")
+    if not os.path.exists(path):
+        _atomic_write(path, data)
+    _atomic_write(ref, digest.encode("ascii"))
+    return path
+
+
+def payload(fmt, size, seed=0):
+    """Read-only memoryview of a cached payload, backed by an mmap"""
+    key = (fmt.upper(), size, seed)
+    with _loaded_lock:
+        if key not in _loaded:
+            if size == 0:
+                _loaded[key] = memoryview(b"")
+            else:
+                with open(fixture_path(*key), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                _loaded[key] = memoryview(mapped)
+        return _loaded[key]
+
+
+def create_test_image(size_mb=1, format='JPEG'):
+    """Cached test image of `size_mb` megabytes (exact byte count)"""
+    size = int(size_mb * MB)
+    if format.upper() == "WEBP":
+        size -= size % 2
+    return payload(format, size)
+
+
+def create_large_file(size_mb=3):
+    """Cached non-image filler payload of `size_mb` megabytes"""
+    return payload("RAW", int(size_mb * MB))
+
+
+def upload_file(fmt, size, filename=None):
+    """(filename, data, content type) tuple for a `files=` upload"""
+    ext, content_type = FORMATS[fmt.upper()]
+    return (filename or f"test.{ext}", payload(fmt, size), content_type)
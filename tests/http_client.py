@@ -0,0 +1,115 @@
+"""
+Shared HTTP client for the API test suites
+One keep-alive connection pool per process so repeated calls reuse TCP+TLS
+connections instead of paying a fresh handshake on every request.
+
+G2_API_POOL_SIZE  connections kept per host (default 10)
+G2_API_RETRIES    retries for connection errors and 502/503/504 (default 2)
+G2_API_TIMEOUT    default request timeout in seconds (default 30)
+G2_API_TRACE      set to 1 to print the timing of every request
+"""
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tests.config import BASE_URL
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+
+class ApiClient:
+    """Pooled `requests.Session` with retry-with-backoff and timing hooks.
+
+    Timing hooks are called as hook(method, url, status, elapsed) after
+    every request, where status is the HTTP status code or the exception
+    class name and elapsed is the wall time in seconds including retries.
+    POST is not retried unless listed in `retry_methods` since most of the
+    API's POST routes are not idempotent.
+    """
+
+    def __init__(self, base_url=BASE_URL, pool_size=10, retries=2, backoff=0.2,
+                 timeout=30, retry_statuses=(502, 503, 504), retry_methods=IDEMPOTENT_METHODS):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.timing_hooks = []
+        self._hooks_lock = threading.Lock()
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=retry_statuses,
+            allowed_methods=retry_methods,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              pool_block=True, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def add_timing_hook(self, hook):
+        with self._hooks_lock:
+            self.timing_hooks.append(hook)
+        return hook
+
+    def remove_timing_hook(self, hook):
+        with self._hooks_lock:
+            self.timing_hooks.remove(hook)
+
+    def url(self, path):
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, **kwargs):
+        url = self.url(path)
+        kwargs.setdefault("timeout", self.timeout)
+        status = None
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = response.status_code
+            return response
+        except requests.RequestException as e:
+            status = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            for hook in list(self.timing_hooks):
+                hook(method, url, status, elapsed)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def print_timing(method, url, status, elapsed):
+    print(f"   [{elapsed * 1000:8.1f} ms] {method} {url} -> {status}")
+
+
+client = ApiClient(
+    pool_size=int(os.environ.get("G2_API_POOL_SIZE", "10")),
+    retries=int(os.environ.get("G2_API_RETRIES", "2")),
+    timeout=float(os.environ.get("G2_API_TIMEOUT", "30")),
+)
+
+if os.environ.get("G2_API_TRACE") == "1":
+    client.add_timing_hook(print_timing)
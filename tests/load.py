@@ -0,0 +1,234 @@
+"""
+Concurrent load generation for the G2 Melody API
+Replays a weighted mix of API calls with N workers and reports
+per-route latency percentiles, throughput and error rate
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from tests.http_client import ApiClient
+
+
+class Call:
+    """One entry of a weighted request mix.
+
+    `path` and `build` may be callables so every request gets a fresh
+    body (file handles are consumed by the first post) or a dynamic id.
+    `build` returns the keyword arguments passed to `ApiClient.request`.
+    """
+
+    def __init__(self, name, method, path, weight=1, build=None, ok_status=(200,)):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.weight = weight
+        self.build = build
+        self.ok_status = tuple(ok_status)
+
+    def resolve_path(self):
+        return self.path() if callable(self.path) else self.path
+
+    def request_kwargs(self):
+        return self.build() if self.build else {}
+
+
+class RouteStats:
+    """Latency samples and error counts for one route"""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.status_counts = {}
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    def record(self, latency, status, ok):
+        self.latencies.append(latency)
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def merge(self, other):
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        for status, count in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+
+    def summary(self, elapsed):
+        values = sorted(self.latencies)
+        return {
+            "route": self.name,
+            "count": len(values),
+            "errors": self.errors,
+            "error_rate": self.errors / len(values) if values else 0.0,
+            "throughput": len(values) / elapsed if elapsed > 0 else 0.0,
+            "mean": sum(values) / len(values) if values else 0.0,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1] if values else 0.0,
+            "status": dict(sorted(self.status_counts.items(), key=lambda item: str(item[0]))),
+        }
+
+
+class LoadReport:
+    """Result of one load run"""
+
+    def __init__(self, workers, elapsed, routes):
+        self.workers = workers
+        self.elapsed = elapsed
+        self.routes = routes
+
+    def total(self):
+        combined = RouteStats("TOTAL")
+        for stats in self.routes.values():
+            combined.merge(stats)
+        return combined
+
+    def rows(self):
+        rows = [stats.summary(self.elapsed) for stats in self.routes.values()]
+        rows.append(self.total().summary(self.elapsed))
+        return rows
+
+
+def percentile(sorted_values, pct):
+    """Percentile with linear interpolation between closest ranks"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = rank - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def parse_mix(spec, calls):
+    """Apply a "name=weight,name=weight" override to a list of calls"""
+    if not spec:
+        return calls
+    weights = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - {call.name for call in calls}
+    if unknown:
+        raise ValueError(f"Unknown calls in mix: {', '.join(sorted(unknown))}")
+    for call in calls:
+        if call.name in weights:
+            call.weight = weights[call.name]
+    return [call for call in calls if call.weight > 0]
+
+
+def _issue(call, base_url, send, timeout):
+    start = time.perf_counter()
+    try:
+        response = send(
+            call.method,
+            f"{base_url}{call.resolve_path()}",
+            timeout=timeout,
+            **call.request_kwargs(),
+        )
+        status = response.status_code
+        ok = status in call.ok_status
+    except requests.RequestException as e:
+        status = type(e).__name__
+        ok = False
+    return time.perf_counter() - start, status, ok
+
+
+def run_load(calls, base_url, workers=8, duration=None, total_requests=None,
+             seed=0, timeout=30, think_time=0.0, send=None):
+    """Fire a weighted mix of calls from `workers` threads.
+
+    Stops after `duration` seconds or `total_requests` requests, whichever
+    comes first. Each worker keeps its own stats and RNG so the hot loop
+    does not contend on a lock; results are merged at the end.
+    """
+    if duration is None and total_requests is None:
+        raise ValueError("Either duration or total_requests is required")
+    if send is None:
+        # Retries would hide the failures a load test is looking for
+        send = ApiClient(base_url, pool_size=workers, retries=0).request
+    weights = [call.weight for call in calls]
+    remaining = [total_requests]
+    remaining_lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+
+    def claim():
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if total_requests is None:
+            return True
+        with remaining_lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        local = {call.name: RouteStats(call.name) for call in calls}
+        while claim():
+            call = rng.choices(calls, weights=weights)[0]
+            latency, status, ok = _issue(call, base_url, send, timeout)
+            local[call.name].record(latency, status, ok)
+            if think_time:
+                time.sleep(think_time)
+        return local
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(worker, range(workers)))
+    elapsed = time.perf_counter() - start
+
+    routes = {call.name: RouteStats(call.name) for call in calls}
+    for local in results:
+        for name, stats in local.items():
+            routes[name].merge(stats)
+    return LoadReport(workers, elapsed, routes)
+
+
+def run_ramp(calls, base_url, stages, duration, max_error_rate=0.05,
+             max_p99=None, **kwargs):
+    """Run successive load stages with increasing worker counts.
+
+    Stops at the first stage whose overall error rate exceeds
+    `max_error_rate` or whose p99 exceeds `max_p99` seconds, and returns
+    all reports along with the worker count at which the API fell over
+    (None if every stage passed).
+    """
+    reports = []
+    for workers in stages:
+        report = run_load(calls, base_url, workers=workers, duration=duration, **kwargs)
+        reports.append(report)
+        print_report(report)
+        total = report.total().summary(report.elapsed)
+        if total["error_rate"] > max_error_rate:
+            return reports, workers
+        if max_p99 is not None and total["p99"] > max_p99:
+            return reports, workers
+    return reports, None
+
+
+def print_report(report):
+    """Print a per-route latency table for a load run"""
+    print("\n" + "=" * 96)
+    print(f"LOAD RESULTS: {report.workers} workers, {report.elapsed:.1f}s")
+    print("=" * 96)
+    print(f"{'route':<22}{'count':>8}{'err%':>8}{'req/s':>9}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  status")
+    for row in report.rows():
+        status = " ".join(f"{code}:{count}" for code, count in row["status"].items())
+        print(f"{row['route']:<22}{row['count']:>8}{row['error_rate'] * 100:>7.1f}%"
+              f"{row['throughput']:>9.1f}{row['p50'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}"
+              f"{row['p99'] * 1000:>10.1f}{row['max'] * 1000:>10.1f}  {status}")
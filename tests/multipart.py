@@ -0,0 +1,168 @@
+"""
+Streaming multipart/form-data bodies for upload tests
+The body is produced lazily in fixed-size chunks at an optional rate, so
+uploads of hundreds of MB cost one chunk of client memory. stream_upload()
+sends it over a raw connection and notices when the server answers before
+the body is finished, which is what a streaming size check should do.
+"""
+
+import json
+import os
+import select
+import time
+import uuid
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class MultipartStream:
+    """Lazily generated multipart body with a single file field.
+
+    `source` is a bytes-like object (sliced without copying, e.g. a
+    fixture memoryview), a path to a file, or None for `size` bytes of
+    synthetic filler. `rate` caps the send rate in bytes per second.
+    """
+
+    def __init__(self, source=None, size=None, field="file", filename="upload.jpg",
+                 content_type="image/jpeg", fields=None, chunk_size=DEFAULT_CHUNK_SIZE, rate=None):
+        if source is None and size is None:
+            raise ValueError("Either source or size is required")
+        if isinstance(source, (str, os.PathLike)):
+            self.size = os.path.getsize(source)
+        elif source is not None:
+            source = memoryview(source).cast("B")
+            self.size = source.nbytes
+        else:
+            self.size = size
+        self.source = source
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self.boundary = f"----g2melody{uuid.uuid4().hex}"
+
+        preamble = []
+        for name, value in (fields or {}).items():
+            preamble.append(
+                f"--{self.boundary}\r\n"
+                f"Content-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n"
+            )
+        preamble.append(
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+        self.preamble = "".join(preamble).encode()
+        self.epilogue = f"\r\n--{self.boundary}--\r\n".encode()
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def content_length(self):
+        return len(self.preamble) + self.size + len(self.epilogue)
+
+    def headers(self):
+        return {"Content-Type": self.content_type, "Content-Length": str(self.content_length)}
+
+    def _file_chunks(self):
+        if self.source is None:
+            filler = memoryview(b"\xa5" * self.chunk_size)
+            remaining = self.size
+            while remaining > 0:
+                n = min(remaining, self.chunk_size)
+                yield filler[:n]
+                remaining -= n
+        elif isinstance(self.source, memoryview):
+            for offset in range(0, self.size, self.chunk_size):
+                yield self.source[offset:offset + self.chunk_size]
+        else:
+            with open(self.source, "rb") as f:
+                while True:
+                    chunk = f.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def __iter__(self):
+        start = time.perf_counter()
+        sent = 0
+        for chunk in self._parts():
+            if self.rate:
+                wait = start + sent / self.rate - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            sent += len(chunk)
+            yield chunk
+
+    def _parts(self):
+        yield self.preamble
+        yield from self._file_chunks()
+        yield self.epilogue
+
+    def request_kwargs(self):
+        """Keyword arguments for posting the stream through ApiClient"""
+        return {"data": iter(self), "headers": self.headers()}
+
+
+def _read_response(conn):
+    response = conn.getresponse()
+    raw = response.read()
+    try:
+        return response.status, json.loads(raw)
+    except ValueError:
+        return response.status, raw.decode("utf-8", "replace")
+
+
+def stream_upload(url, stream, timeout=120):
+    """POST a MultipartStream and measure how early the server answers.
+
+    Returns status, body, bytes sent, total body size, time to the first
+    response byte and total elapsed time.
+    """
+    parts = urlsplit(url)
+    conn_class = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+    conn = conn_class(parts.hostname, parts.port, timeout=timeout)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+    start = time.perf_counter()
+    sent = 0
+    answered_at = None
+    status, body, error = None, None, None
+    try:
+        conn.putrequest("POST", path)
+        for name, value in stream.headers().items():
+            conn.putheader(name, value)
+        conn.endheaders()
+        sock = conn.sock
+        for chunk in stream:
+            readable, _, _ = select.select([sock], [], [], 0)
+            if readable or getattr(sock, "pending", lambda: 0)():
+                answered_at = time.perf_counter()
+                break
+            try:
+                sock.sendall(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                answered_at = time.perf_counter()
+                break
+            sent += len(chunk)
+        status, body = _read_response(conn)
+        if answered_at is None:
+            answered_at = time.perf_counter()
+    except OSError as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        elapsed = time.perf_counter() - start
+        conn.close()
+
+    return {
+        "status": status,
+        "body": body,
+        "error": error,
+        "bytes_sent": sent,
+        "total_bytes": stream.content_length,
+        "rejected_early": status is not None and sent < stream.content_length,
+        "time_to_response": (answered_at - start) if answered_at else None,
+        "elapsed": elapsed,
+    }
@@ -0,0 +1,86 @@
+"""
+Database connection pool sampling for the load suites
+Polls GET /admin/db-pool (lib/prisma.js getPoolMetrics) on a background
+thread while load runs, so a stage can be classified as connection-bound
+(every connection busy, queries queueing for one) or not
+"""
+
+import threading
+import time
+
+from tests.http_client import client
+
+
+def fetch_pool_metrics(base_url):
+    """Current pool metrics, or None when the endpoint is unavailable"""
+    try:
+        response = client.get(f"{base_url}/admin/db-pool")
+    except Exception:
+        return None
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+class PoolSampler:
+    """Samples pool metrics every `interval` seconds between start() and stop()"""
+
+    def __init__(self, base_url, interval=0.1):
+        self.base_url = base_url
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self.samples = []
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        # A closing sample so the wait histogram covers the whole run
+        self._sample()
+
+    def _sample(self):
+        metrics = fetch_pool_metrics(self.base_url)
+        if metrics is not None:
+            self.samples.append((time.perf_counter(), metrics))
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def summary(self):
+        """Peak and mean saturation over the sampled window, or None"""
+        if len(self.samples) < 2:
+            return None
+        first, last = self.samples[0][1], self.samples[-1][1]
+        limit = last["pool"].get("connectionLimit")
+        busy = [m["connections"]["busy"] for _, m in self.samples]
+        waiting = [m["queries"]["waiting"] for _, m in self.samples]
+        # The wait histogram is cumulative: diff the ends for this window
+        waits = last["waitMs"]["count"] - first["waitMs"]["count"]
+        wait_sum = last["waitMs"]["sum"] - first["waitMs"]["sum"]
+        return {
+            "limit": limit,
+            "peak_busy": max(busy),
+            "mean_busy": sum(busy) / len(busy),
+            # Share of samples with no idle connection left
+            "saturated": sum(b >= limit for b in busy) / len(busy) if limit else None,
+            "peak_waiting": max(waiting),
+            "mean_waiting": sum(waiting) / len(waiting),
+            "queries": last["queries"]["total"] - first["queries"]["total"],
+            "mean_wait_ms": wait_sum / waits if waits else 0.0,
+        }
@@ -0,0 +1,146 @@
+"""
+Local SMTP sink for the mail suites
+Accepts every message on a local port and records it, so a suite can
+check what the API delivered without a real relay. It can
+make the greeting slow to stand in for a remote relay's TCP/TLS
+handshake, and can answer the first deliveries with a temporary 451 to
+exercise retries.
+
+Point the API at it with SMTP_HOST=127.0.0.1 SMTP_PORT=<port>
+"""
+
+import socketserver
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def _read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b"..") else line)
+        return b"".join(lines)
+
+    def handle(self):
+        sink = self.server.sink
+        sink._connected()
+        if sink.handshake_delay:
+            time.sleep(sink.handshake_delay)
+        self._reply("220 smtp-sink ESMTP")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self._reply("250-smtp-sink")
+                self._reply("250-8BITMIME")
+                self._reply("250 AUTH PLAIN LOGIN")
+            elif verb == "HELO":
+                self._reply("250 smtp-sink")
+            elif verb == "AUTH":
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip().strip("<>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = self._read_data()
+                if sink._should_fail():
+                    self._reply("451 4.3.0 Temporary failure, try again later")
+                else:
+                    sink._record(sender, recipients, data)
+                    self._reply("250 OK queued")
+                sender, recipients = None, []
+            elif verb in ("RSET", "NOOP"):
+                sender, recipients = None, []
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SmtpSink:
+    """Records delivered messages; use as a context manager"""
+
+    def __init__(self, host="127.0.0.1", port=0, handshake_delay=0.0, fail_first=0):
+        self.handshake_delay = handshake_delay
+        self.fail_first = fail_first
+        self.messages = []
+        self.connections = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _SmtpHandler)
+        self._server.sink = self
+
+    @property
+    def address(self):
+        return self._server.server_address[:2]
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _connected(self):
+        with self._lock:
+            self.connections += 1
+
+    def _should_fail(self):
+        with self._lock:
+            if self.failed < self.fail_first:
+                self.failed += 1
+                return True
+            return False
+
+    def _record(self, sender, recipients, data):
+        message = BytesParser(policy=default_policy).parsebytes(data)
+        with self._lock:
+            self.messages.append({
+                "from": sender,
+                "to": recipients,
+                "subject": str(message["subject"] or ""),
+                "received": time.perf_counter(),
+            })
+
+    def received_by(self):
+        """Messages grouped by recipient"""
+        with self._lock:
+            grouped = {}
+            for message in self.messages:
+                for recipient in message["to"]:
+                    grouped.setdefault(recipient, []).append(message)
+            return grouped
+
+    def wait_for(self, recipients, timeout):
+        """Wait until every address in `recipients` got a message; returns the missing ones"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            missing = set(recipients) - set(self.received_by())
+            if not missing or time.perf_counter() >= deadline:
+                return missing
+            time.sleep(0.05)
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the G2 Melody API
+Mirrors the contract of the catch-all route (app/api/[[...path]]/route.js)
+for /upload, /projects and /donations so the Python suites can run and be
+benchmarked without the preview host, Postgres or Cloudinary.
+
+Modes:
+  model   in-memory implementation of the routes (default)
+  record  proxy every request to --upstream and save it to --cassette
+  replay  answer from a cassette recorded earlier
+
+Latency is modelled per route so throughput and regression numbers are
+reproducible:  --latency "upload=150:50,projects=15:5,default=5"
+means 150ms + an exponential tail with a 50ms mean for /upload, and so on.
+"--latency recorded" replays the upstream timings stored in the cassette.
+
+The stand-in covers the request and response contract only: fixtures for
+the routes above and the transport the upload suites depend on, such as
+answering an oversized upload from its Content-Length. Suites that measure
+what the app does behind a route (batching, caching, pools, counters,
+search, mail) run against the real app instead; tests/app_server.py starts
+it on a scratch database when G2_API_SCRATCH_DB is set.
+
+Usage:
+  python -m tests.stub_server --port 8765
+  G2_API_BASE_URL=http://127.0.0.1:8765/api python backend_test.py
+"""
+
+import argparse
+import base64
+import email.parser
+import email.policy
+import io
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MAX_UPLOAD_SIZE = 2 * 1024 * 1024
+# Slack for multipart boundaries and part headers, as in the route
+MULTIPART_OVERHEAD = 16 * 1024
+ALLOWED_IMAGE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+
+
+class LatencyModel:
+    """Per-route service time: a fixed base plus an exponential tail"""
+
+    def __init__(self, spec=None, seed=0):
+        self.routes = {}
+        self.recorded = spec == "recorded"
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        if spec and not self.recorded:
+            for item in spec.split(","):
+                route, _, timing = item.partition("=")
+                base, _, tail = timing.partition(":")
+                self.routes[route.strip()] = (float(base) / 1000, float(tail or 0) / 1000)
+
+    def sample(self, route_key, recorded=None):
+        if self.recorded:
+            return recorded or 0.0
+        base, tail = self.routes.get(route_key, self.routes.get("default", (0.0, 0.0)))
+        if not tail:
+            return base
+        with self._lock:
+            return base + self._rng.expovariate(1 / tail)
+
+
+class Cassette:
+    """Recorded request/response exchanges keyed by method and path.
+
+    Repeated requests to the same key are replayed in recording order so
+    create-then-read sequences come back as they happened; the last
+    recording is reused once a key's sequence is exhausted.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.interactions = []
+        self._cursor = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        with open(self.path) as f:
+            self.interactions = json.load(f)["interactions"]
+        return self
+
+    def save(self):
+        with self._lock:
+            with open(self.path, "w") as f:
+                json.dump({"interactions": self.interactions}, f, indent=1)
+
+    def add(self, method, path, status, content_type, body, elapsed):
+        with self._lock:
+            self.interactions.append({
+                "method": method,
+                "path": path,
+                "status": status,
+                "contentType": content_type,
+                "body": base64.b64encode(body).decode("ascii"),
+                "elapsed": elapsed,
+            })
+
+    def match(self, method, path):
+        with self._lock:
+            candidates = [i for i in self.interactions if i["method"] == method and i["path"] == path]
+            if not candidates:
+                return None
+            index = self._cursor.get((method, path), 0)
+            self._cursor[(method, path)] = index + 1
+            return candidates[min(index, len(candidates) - 1)]
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class ApiModel:
+    """In-memory implementation of the /upload, /projects and /donations routes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.projects = {}
+        self.donations = []
+        self.uploads = 0
+        for project_id, title, goal, current in (
+            ("proj-meloverse", "G2 Meloverse - Multi-purpose Facility", 267766773, 15000000),
+            ("proj-land", "G2 Land Acquisition", 20000000, 5000000),
+            ("proj-studio", "G2 Recording Studio", 33000000, 2500000),
+        ):
+            self._create_project({
+                "id": project_id,
+                "title": title,
+                "description": title,
+                "goalAmount": goal,
+                "currentAmount": current,
+                "status": "CURRENT",
+            })
+
+    def _create_project(self, data):
+        now = _now()
+        project = {
+            "id": data.get("id") or str(uuid.uuid4()),
+            "title": data.get("title"),
+            "description": data.get("description"),
+            "image": data.get("image"),
+            "goalAmount": float(data.get("goalAmount") or 0),
+            "currentAmount": float(data.get("currentAmount") or 0),
+            "status": data.get("status") or "CURRENT",
+            "deadline": data.get("deadline"),
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        self.projects[project["id"]] = project
+        return project
+
+    def handle(self, method, route, query, headers, body):
+        """Return (status, payload) for a request, mirroring handleRoute"""
+        parts = [p for p in route.split("/") if p]
+        if route == "/upload" and method == "POST":
+            return self.upload(headers, body)
+        if route == "/projects" and method == "GET":
+            return self.list_projects(query)
+        if route == "/projects" and method == "POST":
+            return self.create_project(json.loads(body or b"{}"))
+        if len(parts) == 2 and parts[0] == "projects":
+            if method == "GET":
+                return self.get_project(parts[1])
+            if method == "PUT":
+                return self.update_project(parts[1], json.loads(body or b"{}"))
+            if method == "DELETE":
+                return self.delete_project(parts[1])
+        if route == "/donations" and method == "POST":
+            return self.create_donation(json.loads(body or b"{}"))
+        if route == "/donations" and method == "GET":
+            return self.list_donations(query)
+        return 404, {"error": f"Route {route} not found"}
+
+    def list_projects(self, query):
+        status = query.get("status")
+        with self.lock:
+            projects = [p for p in self.projects.values() if not status or p["status"] == status.upper()]
+            counts = {}
+            for d in self.donations:
+                counts[d["projectId"]] = counts.get(d["projectId"], 0) + 1
+            result = [dict(p, _count={"donations": counts.get(p["id"], 0)}) for p in projects]
+        result.sort(key=lambda p: p["createdAt"], reverse=True)
+        return 200, result
+
+    def create_project(self, data):
+        with self.lock:
+            data = dict(data, id=None)
+            return 200, self._create_project(data)
+
+    def get_project(self, project_id):
+        with self.lock:
+            project = self.projects.get(project_id)
+            if not project:
+                return 404, {"error": "Project not found"}
+            donations = [
+                {k: d[k] for k in ("id", "amount", "donorName", "anonymous", "createdAt", "message")}
+                for d in reversed(self.donations)
+                if d["projectId"] == project_id and d["status"] == "COMPLETED"
+            ][:20]
+            return 200, dict(project, donations=donations)
+
+    def update_project(self, project_id, data):
+        with self.lock:
+            project = self.projects.get(project_id)
+            if not project:
+                return 500, {"error": "Record to update not found."}
+            for key in ("title", "description", "image", "status"):
+                if data.get(key) is not None:
+                    project[key] = data[key]
+            for key in ("goalAmount", "currentAmount"):
+                if data.get(key):
+                    project[key] = float(data[key])
+            project["deadline"] = data.get("deadline")
+            project["updatedAt"] = _now()
+            return 200, dict(project)
+
+    def delete_project(self, project_id):
+        with self.lock:
+            if project_id not in self.projects:
+                return 500, {"error": "Record to delete does not exist."}
+            del self.projects[project_id]
+            self.donations = [d for d in self.donations if d["projectId"] != project_id]
+            return 200, {"success": True}
+
+    def create_donation(self, data):
+        if not data.get("projectId") or not isinstance(data["projectId"], str):
+            return 400, {"error": "projectId required"}
+        try:
+            amount = float(data.get("amount"))
+        except (TypeError, ValueError):
+            amount = float("nan")
+        if not math.isfinite(amount) or amount <= 0:
+            return 400, {"error": "amount must be a positive number"}
+        with self.lock:
+            project = self.projects.get(data.get("projectId"))
+            if not project:
+                return 500, {"error": "Foreign key constraint failed on the field: `Donation_projectId_fkey (index)`"}
+            donation = {
+                "id": str(uuid.uuid4()),
+                "amount": amount,
+                "currency": data.get("currency") or "XAF",
+                "donorName": "Anonymous" if data.get("anonymous") else data.get("donorName"),
+                "donorEmail": data.get("donorEmail"),
+                "message": data.get("message"),
+                "anonymous": data.get("anonymous") or False,
+                "status": "COMPLETED",
+                "projectId": project["id"],
+                "userId": data.get("userId") or None,
+                "createdAt": _now(),
+            }
+            self.donations.append(donation)
+            project["currentAmount"] += amount
+            return 200, donation
+
+    def list_donations(self, query):
+        with self.lock:
+            result = [
+                dict(d, project={"title": self.projects[d["projectId"]]["title"]})
+                for d in reversed(self.donations)
+                if (not query.get("projectId") or d["projectId"] == query["projectId"])
+                and (not query.get("userId") or d["userId"] == query["userId"])
+            ]
+        return 200, result
+
+    def upload(self, headers, body):
+        content_type = headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/form-data"):
+            return 500, {"error": "Failed to upload file: Could not parse content as FormData."}
+        file_part = None
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+        )
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                file_part = part
+                break
+        if file_part is None or file_part.get_filename() is None:
+            return 400, {"error": "No file provided"}
+        # The route checks the part's type before streaming its bytes
+        if file_part.get_content_type() not in ALLOWED_IMAGE_TYPES:
+            return 400, {"error": "Invalid file type. Only JPEG, PNG, GIF, and WebP are allowed."}
+        data = file_part.get_payload(decode=True) or b""
+        if len(data) > MAX_UPLOAD_SIZE:
+            return 400, {"error": "File too large. Maximum size is 2MB."}
+        width = height = None
+        try:
+            from PIL import Image
+            width, height = Image.open(io.BytesIO(data)).size
+        except Exception:
+            pass
+        with self.lock:
+            self.uploads += 1
+        public_id = f"g2melody/{uuid.uuid4().hex[:20]}"
+        return 200, {
+            "url": f"https://res.cloudinary.com/stub/image/upload/{public_id}",
+            "publicId": public_id,
+            "width": width,
+            "height": height,
+            "size": len(data),
+        }
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, mode="model", cassette=None, upstream=None, latency=None, seed=0):
+        super().__init__(address, StubHandler)
+        if mode not in ("model", "record", "replay"):
+            raise ValueError(f"Unknown stub mode: {mode}")
+        if mode != "model" and not cassette:
+            raise ValueError(f"{mode} mode needs a cassette file")
+        if mode == "record" and not upstream:
+            raise ValueError("record mode needs an upstream URL")
+        self.mode = mode
+        self.model = ApiModel()
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.latency = LatencyModel(latency, seed)
+        self.cassette = Cassette(cassette) if cassette else None
+        if mode == "replay":
+            self.cassette.load()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY a
+    # keep-alive client stalls ~40ms per request on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self):
+        server = self.server
+        split = urlsplit(self.path)
+        route = split.path[len("/api"):] if split.path.startswith("/api") else split.path
+        route = route.rstrip("/") or "/"
+        route_key = route.strip("/").split("/")[0] or "root"
+        if server.mode == "model" and self.command == "POST" and route == "/upload":
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+                # Like the route, answer from the declared length without
+                # reading the body, then drop the connection
+                self.close_connection = True
+                self._send(400, json.dumps({"error": "File too large. Maximum size is 2MB."}).encode())
+                return
+        body = self._read_body()
+        started = time.perf_counter()
+
+        if server.mode == "record":
+            status, content_type, payload, elapsed = self._forward(route, split.query, body)
+            server.cassette.add(self.command, self.path, status, content_type, payload, elapsed)
+            server.cassette.save()
+            self._send(status, payload, content_type)
+            return
+
+        recorded_elapsed = None
+        if server.mode == "replay":
+            interaction = server.cassette.match(self.command, self.path)
+            if interaction is None:
+                status, content_type = 404, "application/json"
+                payload = json.dumps({"error": f"No recording for {self.command} {self.path}"}).encode()
+            else:
+                status, content_type = interaction["status"], interaction["contentType"]
+                payload = base64.b64decode(interaction["body"])
+                recorded_elapsed = interaction["elapsed"]
+        else:
+            query = {k: v[0] for k, v in parse_qs(split.query).items()}
+            try:
+                status, result = server.model.handle(self.command, route, query, self.headers, body)
+            except Exception as e:
+                status, result = 500, {"error": str(e) or "Internal server error"}
+            content_type = "application/json"
+            payload = json.dumps(result).encode()
+
+        delay = server.latency.sample(route_key, recorded_elapsed) - (time.perf_counter() - started)
+        if delay > 0:
+            time.sleep(delay)
+        self._send(status, payload, content_type)
+
+    def _forward(self, route, query, body):
+        url = f"{self.server.upstream}{route}" + (f"?{query}" if query else "")
+        headers = {k: v for k, v in self.headers.items() if k.lower() in ("content-type", "authorization")}
+        request = urllib.request.Request(url, data=body or None, method=self.command, headers=headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                payload = response.read()
+                status = response.status
+                content_type = response.headers.get("Content-Type", "application/json")
+        except urllib.error.HTTPError as e:
+            payload = e.read()
+            status = e.code
+            content_type = e.headers.get("Content-Type", "application/json")
+        return status, content_type, payload, time.perf_counter() - started
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = _dispatch
+
+    def do_OPTIONS(self):
+        self._send(200, b"")
+
+
+def start_background(mode="model", host="127.0.0.1", port=0, **kwargs):
+    """Start a stub server on a daemon thread and return it"""
+    server = StubServer((host, port), mode=mode, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the G2 Melody API")
+    parser.add_argument("--mode", choices=("model", "record", "replay"), default="model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cassette", help="cassette file for record/replay")
+    parser.add_argument("--upstream", help="API base URL to proxy in record mode")
+    parser.add_argument("--latency", help='e.g. "upload=150:50,default=5" or "recorded"')
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubServer(
+        (args.host, args.port),
+        mode=args.mode,
+        cassette=args.cassette,
+        upstream=args.upstream,
+        latency=args.latency,
+        seed=args.seed,
+    )
+    print(f"G2 Melody stub API ({args.mode}) listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Synthetic datasets for the benchmark suites
+POST /seed creates a few dozen demo rows, too few for performance problems
+to show. This module bulk-loads a realistic dataset at a chosen scale
+straight into Postgres with COPY, so every benchmark can start from a known
+state:
+- users
+- projects, with donations skewed towards a few projects and supporters
+- music tracks and purchases
+- a payment for each donation and purchase
+- courses, lessons, enrollments and lesson progress, with UserStats
+- gallery items
+
+Each table draws from its own RNG, seeded from the dataset seed and the
+table name. The same seed and counts always give the same rows, and
+changing one table's count only changes the rows of the tables that refer
+to it. Rows are
+streamed, so a million donations never sit in memory. Derived rows and
+columns are filled in with set-based SQL after the copies: payments,
+Project.currentAmount, Course.totalLessons and UserStats. Everything goes
+in one transaction.
+
+Every id starts with PREFIX, so a dataset can be found, replaced or
+deleted without touching other rows. The materialized stats (lib/stats.js)
+do not see COPY, so the command line rebuilds them through
+POST /admin/stats/reconcile when the API is up.
+
+  python -m tests.synthetic --scale large                  # 1M donations, 100k users, 50k lessons
+  python -m tests.synthetic --scale small --donations 50000
+  python -m tests.synthetic --delete
+
+Needs psycopg and a DATABASE_URL, like the other database suites
+(tests/database.py). Use a local or scratch database.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from tests.database import DatabaseUnavailable, connect, copy_rows
+
+PREFIX = "synth-"
+YEARS = 3
+
+SCALES = {
+    "small": dict(users=2000, projects=50, tracks=2000, donations=20000, purchases=10000, courses=20,
+                  lessons=500, enrollments=2000, gallery=500),
+    "medium": dict(users=20000, projects=200, tracks=5000, donations=200000, purchases=50000, courses=100,
+                   lessons=5000, enrollments=10000, gallery=5000),
+    "large": dict(users=100000, projects=500, tracks=20000, donations=1000000, purchases=200000, courses=500,
+                  lessons=50000, enrollments=20000, gallery=20000),
+}
+
+# Child tables first, so deleting in this order never trips a foreign key
+TABLES = ("Payment", "Donation", "Purchase", "LessonProgress", "Enrollment", "Lesson", "Course", "UserStats",
+          "GalleryItem", "Project", "Music", "User")
+
+FIRST_NAMES = ("Ngozi", "Emmanuel", "Grace", "Samuel", "Esther", "Blaise", "Ruth", "Daniel", "Miriam", "Joel",
+               "Hannah", "Paul", "Deborah", "Caleb", "Lydia", "Tobias", "Naomi", "Isaac", "Priscilla", "Elijah")
+LAST_NAMES = ("Mbah", "Fon", "Tabi", "Ndongo", "Eko", "Nkeng", "Achu", "Fomba", "Ebai", "Ngwa",
+              "Tanyi", "Bate", "Ayuk", "Njoh", "Mokake", "Ewane", "Takang", "Besong", "Ojong", "Enow")
+WORDS = ("amazing", "grace", "glory", "holy", "praise", "light", "river", "mountain", "morning", "evening",
+         "shepherd", "kingdom", "mercy", "faithful", "blessed", "jubilee", "harvest", "promise", "anthem", "peace")
+STATUSES = ("COMPLETED",) * 95 + ("PENDING",) * 3 + ("FAILED",) * 2
+PROJECT_STATUSES = ("CURRENT",) * 3 + ("PAST",) * 6 + ("DRAFT",)
+LEVELS = ("Beginner", "Intermediate", "Advanced")
+GALLERY_CATEGORIES = ("Concerts", "Rehearsals", "Events", "Community")
+
+
+def skewed(rng, count):
+    """An index into `count` items, where low indexes are much more likely"""
+    return int(count * rng.random() ** 3)
+
+
+class Dataset:
+    """Row generators for one (seed, counts) dataset"""
+
+    def __init__(self, seed=0, **counts):
+        self.seed = seed
+        self.counts = counts
+        self.now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)  # timestamp(3) columns hold UTC
+        self.span = int(timedelta(days=365 * YEARS).total_seconds())
+
+    def rng(self, table):
+        return random.Random(f"{self.seed}:{table}")
+
+    def moment(self, rng):
+        return self.now - timedelta(seconds=rng.randrange(self.span))
+
+    def title(self, rng, words=3):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, words))).title()
+
+    def person(self, rng):
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def user_id(self, rng, share=0.6):
+        """A skewed user for `share` of the rows, otherwise None (a guest)"""
+        return f"{PREFIX}user-{skewed(rng, self.counts['users'])}" if rng.random() < share else None
+
+    def users(self):
+        rng = self.rng("User")
+        columns = ("id", "email", "name", "role", "createdAt", "updatedAt")
+        rows = ((f"{PREFIX}user-{i}", f"{PREFIX}user-{i}@example.com", self.person(rng), "USER", self.moment(rng),
+                 self.now) for i in range(self.counts['users']))
+        return "User", columns, rows
+
+    def projects(self):
+        rng = self.rng("Project")
+        columns = ("id", "title", "description", "goalAmount", "currentAmount", "status", "createdAt", "updatedAt")
+        rows = ((f"{PREFIX}project-{i}", self.title(rng, 4), "Synthetic project", float(rng.choice((1, 5, 20))) * 1e6,
+                 0.0, rng.choice(PROJECT_STATUSES), self.moment(rng), self.now)
+                for i in range(self.counts['projects']))
+        return "Project", columns, rows
+
+    def music(self):
+        rng = self.rng("Music")
+        columns = ("id", "title", "artist", "genre", "duration", "price", "currency", "isHymn", "plays", "createdAt",
+                   "updatedAt")
+        rows = ((f"{PREFIX}music-{i}", self.title(rng), self.person(rng), rng.choice(("Hymn", "Gospel", "Choral")),
+                 rng.randint(120, 420), float(rng.choice((500, 1000, 1500))), "XAF", rng.random() < 0.4,
+                 skewed(rng, 5000), self.moment(rng), self.now) for i in range(self.counts['tracks']))
+        return "Music", columns, rows
+
+    def donations(self):
+        rng = self.rng("Donation")
+        columns = ("id", "amount", "currency", "donorName", "anonymous", "status", "projectId", "userId", "createdAt")
+
+        def rows():
+            for i in range(self.counts['donations']):
+                anonymous = rng.random() < 0.2
+                yield (f"{PREFIX}donation-{i}", float(rng.choice((1000, 5000, 10000, 25000, 100000))), "XAF",
+                       None if anonymous else self.person(rng), anonymous, rng.choice(STATUSES),
+                       f"{PREFIX}project-{skewed(rng, self.counts['projects'])}", self.user_id(rng), self.moment(rng))
+        return "Donation", columns, rows()
+
+    def purchases(self):
+        rng = self.rng("Purchase")
+        columns = ("id", "amount", "currency", "status", "musicId", "userId", "downloadCount", "createdAt")
+        rows = ((f"{PREFIX}purchase-{i}", float(rng.choice((500, 1000, 1500))), "XAF", rng.choice(STATUSES),
+                 f"{PREFIX}music-{skewed(rng, self.counts['tracks'])}", self.user_id(rng, 0.7), rng.randint(0, 5),
+                 self.moment(rng)) for i in range(self.counts['purchases']))
+        return "Purchase", columns, rows
+
+    def courses(self):
+        rng = self.rng("Course")
+        columns = ("id", "title", "level", "isPublished", "order", "createdAt", "updatedAt")
+        rows = ((f"{PREFIX}course-{i}", self.title(rng), rng.choice(LEVELS), rng.random() < 0.9, i,
+                 self.moment(rng), self.now) for i in range(self.counts['courses']))
+        return "Course", columns, rows
+
+    def lessons_per_course(self):
+        return max(1, self.counts['lessons'] // max(1, self.counts['courses']))
+
+    def lessons(self):
+        rng = self.rng("Lesson")
+        per = self.lessons_per_course()
+        columns = ("id", "courseId", "title", "content", "duration", "order", "isPublished", "createdAt", "updatedAt")
+        rows = ((f"{PREFIX}lesson-{i}", f"{PREFIX}course-{i // per}", self.title(rng), "Synthetic lesson " * 20,
+                 rng.randint(5, 30), i % per, True, self.now, self.now)
+                for i in range(per * self.counts['courses']))
+        return "Lesson", columns, rows
+
+    def learners(self):
+        """(enrollment index, user, course, lessons completed, lesson in progress) per enrollment"""
+        rng = self.rng("Enrollment")
+        users, courses, per = self.counts['users'], self.counts['courses'], self.lessons_per_course()
+        for i in range(min(self.counts['enrollments'], users * courses)):
+            user = i % users
+            # Distinct courses for each user: user u's k-th enrollment is course (u * 7 + k) % courses
+            course = (user * 7 + i // users) % courses
+            completed = rng.randint(0, per)
+            yield i, user, course, completed, completed < per and rng.random() < 0.5
+
+    def enrollments(self):
+        per = self.lessons_per_course()
+        columns = ("id", "userId", "courseId", "progress", "completedLessons", "completedAt", "startedAt",
+                   "lastAccessedAt")
+        rows = ((f"{PREFIX}enrollment-{i}", f"{PREFIX}user-{user}", f"{PREFIX}course-{course}",
+                 completed * 100 // per, completed, self.now if completed == per else None, self.now, self.now)
+                for i, user, course, completed, _ in self.learners())
+        return "Enrollment", columns, rows
+
+    def lesson_progress(self):
+        rng = self.rng("LessonProgress")
+        per = self.lessons_per_course()
+        columns = ("id", "userId", "lessonId", "completed", "watchTime", "completedAt", "createdAt", "updatedAt")
+
+        def rows():
+            for i, user, course, completed, partial in self.learners():
+                for j in range(completed + partial):
+                    done = j < completed
+                    yield (f"{PREFIX}progress-{i}-{j}", f"{PREFIX}user-{user}", f"{PREFIX}lesson-{course * per + j}",
+                           done, rng.randint(300, 1800) if done else rng.randint(30, 300),
+                           self.now if done else None, self.now, self.now)
+        return "LessonProgress", columns, rows()
+
+    def gallery(self):
+        rng = self.rng("GalleryItem")
+        columns = ("id", "title", "imageUrl", "year", "category", "order", "isFeatured", "createdAt", "updatedAt")
+        rows = ((f"{PREFIX}gallery-{i}", self.title(rng), f"https://example.com/gallery/{i}.jpg",
+                 self.now.year - rng.randrange(15), rng.choice(GALLERY_CATEGORIES), rng.randrange(100),
+                 rng.random() < 0.05, self.moment(rng), self.now) for i in range(self.counts['gallery']))
+        return "GalleryItem", columns, rows
+
+    def tables(self):
+        """(table, columns, rows) in insert order"""
+        return (self.users(), self.projects(), self.music(), self.donations(), self.purchases(), self.courses(),
+                self.lessons(), self.enrollments(), self.lesson_progress(), self.gallery())
+
+
+# Rows and columns that follow from the copied ones, filled in set-based
+DERIVED = (
+    ("Payment", f"""
+        INSERT INTO "Payment" (id, amount, currency, type, status, "userId", "donationId", "createdAt")
+        SELECT '{PREFIX}payment-' || id, amount, currency, 'DONATION', status, "userId", id, "createdAt"
+        FROM "Donation" WHERE id LIKE '{PREFIX}%'"""),
+    ("Payment", f"""
+        INSERT INTO "Payment" (id, amount, currency, type, status, "userId", "purchaseId", "createdAt")
+        SELECT '{PREFIX}payment-' || id, amount, currency, 'PURCHASE', status, "userId", id, "createdAt"
+        FROM "Purchase" WHERE id LIKE '{PREFIX}%'"""),
+    ("Project", f"""
+        UPDATE "Project" AS p SET "currentAmount" = d.total
+        FROM (SELECT "projectId", sum(amount) AS total FROM "Donation"
+              WHERE id LIKE '{PREFIX}%' AND status = 'COMPLETED' GROUP BY "projectId") AS d
+        WHERE p.id = d."projectId" """),
+    ("Course", f"""
+        UPDATE "Course" AS c SET "totalLessons" = l.total
+        FROM (SELECT "courseId", count(*) AS total FROM "Lesson" WHERE id LIKE '{PREFIX}%' GROUP BY "courseId") AS l
+        WHERE c.id = l."courseId" """),
+    ("UserStats", f"""
+        INSERT INTO "UserStats" (id, "userId", "totalLessonsCompleted", "totalPracticeMinutes", "updatedAt")
+        SELECT '{PREFIX}stats-' || "userId", "userId", count(*) FILTER (WHERE completed), sum("watchTime") / 60, now()
+        FROM "LessonProgress" WHERE id LIKE '{PREFIX}%' GROUP BY "userId" """),
+)
+
+
+def seeded_counts(conn):
+    """Rows per table that belong to a synthetic dataset"""
+    counts = {}
+    with conn.cursor() as cur:
+        for table in TABLES:
+            cur.execute(f'SELECT count(*) FROM "{table}" WHERE id LIKE %s', (f"{PREFIX}%",))
+            counts[table] = cur.fetchone()[0]
+    return counts
+
+
+def delete(conn):
+    """Delete every synthetic row, in one transaction"""
+    with conn.transaction(), conn.cursor() as cur:
+        for table in TABLES:
+            cur.execute(f'DELETE FROM "{table}" WHERE id LIKE %s', (f"{PREFIX}%",))
+
+
+def load(conn, dataset, progress=None):
+    """COPY a dataset and fill in its derived rows in one transaction.
+    Calls progress(table, rows, seconds) after each step."""
+    with conn.transaction():
+        for table, columns, rows in dataset.tables():
+            started = time.perf_counter()
+            count = copy_rows(conn, table, columns, rows)
+            if progress:
+                progress(table, count, time.perf_counter() - started)
+        for table, sql in DERIVED:
+            started = time.perf_counter()
+            count = conn.execute(sql).rowcount
+            if progress:
+                progress(table, count, time.perf_counter() - started)
+
+
+def vacuum_analyze(conn):
+    """Fresh planner statistics and visibility map after a load; needs an autocommit connection"""
+    for table in TABLES:
+        conn.execute(f'VACUUM ANALYZE "{table}"')
+
+
+def ensure(conn, scale="medium", seed=0, reseed=False, **overrides):
+    """Load the dataset unless synthetic rows are already there, on an autocommit
+    connection; returns the synthetic donations present"""
+    existing = seeded_counts(conn)["Donation"]
+    if existing and not reseed:
+        return existing
+    if existing:
+        delete(conn)
+    load(conn, Dataset(seed, **{**SCALES[scale], **overrides}))
+    vacuum_analyze(conn)
+    return seeded_counts(conn)["Donation"]
+
+
+def reconcile_stats():
+    """Rebuild the materialized stats through the API; returns an error message or None"""
+    from tests.config import BASE_URL
+    from tests.http_client import client
+    try:
+        response = client.post(f"{BASE_URL}/admin/stats/reconcile", json={})
+    except Exception as e:
+        return f"API unreachable at {BASE_URL} ({type(e).__name__})"
+    return None if response.status_code == 200 else f"reconcile returned {response.status_code}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a synthetic dataset into Postgres")
+    parser.add_argument('--database-url', help="defaults to DATABASE_URL")
+    parser.add_argument('--scale', choices=SCALES, default="medium")
+    parser.add_argument('--seed', type=int, default=0, help="RNG seed; the same seed gives the same rows")
+    for table in SCALES["medium"]:
+        parser.add_argument(f'--{table}', type=int, help=f"override the scale's {table} count")
+    parser.add_argument('--delete', action='store_true', help="only delete the synthetic rows")
+    parser.add_argument('--no-reconcile', action='store_true', help="leave the materialized stats alone")
+    args = parser.parse_args()
+
+    try:
+        conn = connect(args.database_url, autocommit=True)
+    except DatabaseUnavailable as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    with conn:
+        existing = sum(seeded_counts(conn).values())
+        if existing:
+            started = time.perf_counter()
+            delete(conn)
+            print(f"Deleted {existing} synthetic rows in {time.perf_counter() - started:.1f}s")
+        if not args.delete:
+            counts = {**SCALES[args.scale], **{k: v for k, v in vars(args).items() if k in SCALES[args.scale]
+                                               and v is not None}}
+            print(f"Loading the {args.scale} dataset (seed {args.seed}): "
+                  f"{', '.join(f'{name} {count}' for name, count in counts.items())}")
+            started = time.perf_counter()
+            load(conn, Dataset(args.seed, **counts), progress=lambda table, rows, seconds: print(
+                f"  {table:<16}{rows:>10} rows {seconds:>7.1f}s {rows / seconds if seconds else 0:>10.0f}/s"))
+            vacuum_analyze(conn)
+            print(f"Loaded {sum(seeded_counts(conn).values())} rows in {time.perf_counter() - started:.1f}s")
+
+    if not args.no_reconcile:
+        error = reconcile_stats()
+        print(f"⚠️  Stats not reconciled: {error}; POST /admin/stats/reconcile once the API is up" if error else
+              "Rebuilt the materialized stats")
+
+
+if __name__ == "__main__":
+    main()